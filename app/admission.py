@@ -0,0 +1,196 @@
+"""Admission control for chat sessions and concurrency caps for LLM and MCP calls.
+
+The web server admits at most ``max_sessions`` agent runs at a time; further
+requests wait in a FIFO queue of at most ``max_queue`` entries and are
+rejected with :class:`QueueFull` (HTTP 429 with ``Retry-After``) beyond
+that. Independently, every LLM request and MCP tool call in the process
+goes through :data:`llm_calls` and :data:`mcp_calls`, so the upstream APIs
+see a bounded number of requests however many sessions, flows and batch
+jobs are running.
+
+All limits are per process; with ``serve.py --workers N`` they multiply by N.
+"""
+import asyncio
+import math
+import time
+from collections import deque
+from typing import AsyncIterator, Deque, Optional
+
+from app.config import config
+
+
+class QueueFull(Exception):
+    """Raised when a session can neither start nor wait in the queue."""
+
+    def __init__(self, retry_after: int):
+        self.retry_after = retry_after
+        super().__init__(f"Server is busy, retry in {retry_after}s")
+
+
+class ConcurrencyLimit:
+    """Process-wide cap on concurrent calls, used as ``async with limit:``.
+
+    Attributes:
+        limit: Maximum number of calls in flight; 0 or less means unlimited.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._loop is not loop:
+            self._slots = asyncio.Semaphore(self.limit)
+            self._loop = loop
+        return self._slots
+
+    async def __aenter__(self) -> None:
+        if self.limit > 0:
+            await self._get_slots().acquire()
+
+    async def __aexit__(self, *exc_info) -> None:
+        if self.limit > 0:
+            self._get_slots().release()
+
+
+class Ticket:
+    """A session's place in the admission queue.
+
+    ``async with ticket:`` waits until the session is admitted and releases
+    its slot on exit; :meth:`wait` additionally reports the queue position
+    while waiting.
+    """
+
+    def __init__(self, controller: "AdmissionController"):
+        self._controller = controller
+        self._changed = asyncio.Event()
+        self.admitted = False
+        self.released = False
+        self.started: Optional[float] = None
+
+    @property
+    def position(self) -> int:
+        """1-based position in the queue, 0 once admitted or released."""
+        if self.admitted or self.released:
+            return 0
+        return self._controller._waiting.index(self) + 1
+
+    async def wait(self) -> AsyncIterator[int]:
+        """Yield the queue position every time it changes until admitted."""
+        last = None
+        while True:
+            self._changed.clear()
+            if self.admitted:
+                return
+            if self.released:
+                raise RuntimeError("Ticket was released before being admitted")
+            if self.position != last:
+                last = self.position
+                yield last
+                continue
+            await self._changed.wait()
+
+    def release(self) -> None:
+        """Free the slot, or leave the queue if not admitted yet. Idempotent."""
+        if not self.released:
+            self.released = True
+            self._controller._release(self)
+
+    async def __aenter__(self) -> "Ticket":
+        try:
+            async for _ in self.wait():
+                pass
+        except BaseException:
+            self.release()
+            raise
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.release()
+
+
+class AdmissionController:
+    """Limit on concurrent sessions with a bounded FIFO wait queue.
+
+    Attributes:
+        max_sessions: Sessions running at the same time.
+        max_queue: Sessions allowed to wait for a slot; 0 rejects as soon as
+            all slots are taken.
+    """
+
+    def __init__(self, max_sessions: int = 8, max_queue: int = 32, retry_after: int = 30):
+        self.max_sessions = max(1, max_sessions)
+        self.max_queue = max(0, max_queue)
+        self.active = 0
+        self._waiting: Deque[Ticket] = deque()
+        # Moving average of session durations, seeded with the configured
+        # Retry-After so the first rejections have a sensible estimate
+        self._mean_duration = float(max(1, retry_after))
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiting)
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free for a request arriving now."""
+        rounds = (self.queued + 1) / self.max_sessions
+        return max(1, math.ceil(self._mean_duration * rounds))
+
+    def enqueue(self) -> Ticket:
+        """Take a slot or a place in the queue.
+
+        Raises:
+            QueueFull: All slots are taken and the queue is full.
+        """
+        ticket = Ticket(self)
+        if self.active < self.max_sessions and not self._waiting:
+            self._admit(ticket)
+        elif len(self._waiting) < self.max_queue:
+            self._waiting.append(ticket)
+        else:
+            raise QueueFull(self.retry_after())
+        return ticket
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "queued": self.queued,
+            "max_sessions": self.max_sessions,
+            "max_queue": self.max_queue,
+        }
+
+    def _admit(self, ticket: Ticket) -> None:
+        ticket.admitted = True
+        ticket.started = time.monotonic()
+        self.active += 1
+        ticket._changed.set()
+
+    def _release(self, ticket: Ticket) -> None:
+        if ticket.admitted:
+            self.active -= 1
+            duration = time.monotonic() - ticket.started
+            self._mean_duration = 0.8 * self._mean_duration + 0.2 * duration
+        else:
+            self._waiting.remove(ticket)
+        while self._waiting and self.active < self.max_sessions:
+            self._admit(self._waiting.popleft())
+        # Everyone behind moved up
+        for waiting in self._waiting:
+            waiting._changed.set()
+
+
+def create_admission_controller() -> AdmissionController:
+    """Admission controller configured by the ``[admission]`` section."""
+    settings = config.admission_config
+    return AdmissionController(
+        max_sessions=settings.max_sessions,
+        max_queue=settings.max_queue,
+        retry_after=settings.retry_after,
+    )
+
+
+# Shared by every LLM instance and MCP tool in the process
+llm_calls = ConcurrencyLimit(config.admission_config.llm_concurrency)
+mcp_calls = ConcurrencyLimit(config.admission_config.mcp_concurrency)
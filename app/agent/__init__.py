@@ -1,11 +1,17 @@
-from app.agent.base import BaseAgent
-from app.agent.browser import BrowserAgent
-from app.agent.mcp import MCPAgent
-from app.agent.react import ReActAgent
-from app.agent.swe import SWEAgent
-from app.agent.toolcall import ToolCallAgent
+from app.lazy import lazy_exports
 
 
+_EXPORTS = {
+    "BaseAgent": "app.agent.base",
+    "BrowserAgent": "app.agent.browser",
+    "MCPAgent": "app.agent.mcp",
+    "ReActAgent": "app.agent.react",
+    "SWEAgent": "app.agent.swe",
+    "ToolCallAgent": "app.agent.toolcall",
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
 __all__ = [
     "BaseAgent",
     "BrowserAgent",
@@ -14,6 +14,8 @@ from app.tool import BrowserUseTool, Terminate, ToolCollection
 if TYPE_CHECKING:
     from app.agent.base import BaseAgent  # Or wherever memory is defined
 
+# Looked up without instantiating the tool (which creates an LLM client)
+_BROWSER_TOOL_NAME = BrowserUseTool.model_fields["name"].default
 
 class BrowserContextHelper:
     def __init__(self, agent: "BaseAgent"):
@@ -21,7 +23,7 @@ class BrowserContextHelper:
         self._current_base64_image: Optional[str] = None
 
     async def get_browser_state(self) -> Optional[dict]:
-        browser_tool = self.agent.available_tools.get_tool(BrowserUseTool().name)
+        browser_tool = self.agent.available_tools.get_tool(_BROWSER_TOOL_NAME)
         if not browser_tool or not hasattr(browser_tool, "get_current_state"):
             logger.warning("BrowserUseTool not found or doesn't have get_current_state")
             return None
@@ -74,7 +76,7 @@ class BrowserContextHelper:
         )
 
     async def cleanup_browser(self):
-        browser_tool = self.agent.available_tools.get_tool(BrowserUseTool().name)
+        browser_tool = self.agent.available_tools.get_tool(_BROWSER_TOOL_NAME)
         if browser_tool and hasattr(browser_tool, "cleanup"):
             await browser_tool.cleanup()
 
@@ -1,74 +1,308 @@
-import json
 import asyncio
-from typing import List, Optional, Union
-from openai.types.chat.chat_completion_message import ChatCompletionMessage
-from openai import OpenAIError, AuthenticationError, RateLimitError, APIError
-from app.llm import LLM  # 导入 LLM 类
-from app.exceptions import TokenLimitExceeded
-from app.logger import logger  # 假设已配置日志
-from app.prompt.reward import SYSTEM_PROMPT, EVALUATION_CRITERIA, build_evaluation_prompt
-from app.schema import (TOOL_CHOICE_TYPE, AgentState, Message, ToolCall,
-                        ToolChoice)
+import hashlib
+import random
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
 from openai import (
-    OpenAI,
-    APIError,
-    AsyncAzureOpenAI,
+    APIConnectionError,
+    APIStatusError,
     AsyncOpenAI,
     AuthenticationError,
     OpenAIError,
     RateLimitError,
 )
 
-REASONING_MODELS = ["o1", "o3-mini"]
-MULTIMODAL_MODELS = [
-    "gpt-4-vision-preview",
-    "gpt-4o",
-    "gpt-4o-mini",
-    "claude-3-opus-20240229",
-    "claude-3-sonnet-20240229",
-    "claude-3-haiku-20240307",
-]
+from app import codec
+from app.config import LLMSettings, config
+from app.exceptions import TokenLimitExceeded
+from app.logger import logger  # 假设已配置日志
+from app.prompt.reward import SYSTEM_PROMPT, EVALUATION_CRITERIA, build_evaluation_prompt
+
+
+class RewardParseError(ValueError):
+    """评分模型的输出中找不到 weighted_total"""
+
+
+# JSON 修复用到的模式
+_THINK = re.compile(r"<think>[\s\S]*?</think>")
+# 提示词中的输出示例在 weighted_total 后少了逗号，模型常常照抄
+_MISSING_COMMA = re.compile(r'([0-9"\]}el])(\s*\n\s*")')
+_TRAILING_COMMA = re.compile(r",(\s*[}\]])")
+_WEIGHTED_TOTAL = re.compile(r'"?weighted_total"?\s*[:：]\s*"?(-?\d+(?:\.\d+)?)')
+
+
+def parse_reward(content: str, criteria: Dict = EVALUATION_CRITERIA) -> Dict[str, Any]:
+    """
+    解析评分模型的输出，必要时修复 JSON
+    :return: 评分结果字典，其中 weighted_total 为浮点数
+    :raises RewardParseError: 无法得到加权总分
+    """
+    text = _THINK.sub("", content or "")
+    start, end = text.find("{"), text.rfind("}")
+    result: Dict[str, Any] = {}
+    if start >= 0 and end > start:
+        body = text[start:end + 1]
+        for candidate in (body, _TRAILING_COMMA.sub(r"\1", _MISSING_COMMA.sub(r"\1,\2", body))):
+            try:
+                parsed = codec.loads(candidate)
+            except codec.JSONDecodeError:
+                continue
+            if isinstance(parsed, dict):
+                result = parsed
+                break
+
+    total = result.get("weighted_total")
+    if isinstance(total, str):
+        match = _WEIGHTED_TOTAL.search(f'"weighted_total": {total}')
+        total = match.group(1) if match else None
+    if total is None and isinstance(result.get("scores"), dict):
+        # 缺少总分时按评估标准的权重计算
+        scores = result["scores"]
+        try:
+            total = sum(float(scores[name]) * item["weight"] for name, item in criteria.items())
+        except (KeyError, TypeError, ValueError):
+            total = None
+    if total is None:
+        match = _WEIGHTED_TOTAL.search(text)
+        total = match.group(1) if match else None
+    try:
+        result["weighted_total"] = float(total)
+    except (TypeError, ValueError):
+        raise RewardParseError(f"weighted_total not found in: {text[:200]}")
+    return result
+
+
+def solution_text(messages) -> str:
+    """
+    取出待评估的方案：字符串原样返回，消息列表序列化整条轨迹
+    评分模型能看到中间步骤和工具调用，而不只是最后的回答；图片数据不送去评分
+    """
+    if isinstance(messages, str):
+        return messages
+    trajectory = []
+    for message in messages or []:
+        if not isinstance(message, dict):
+            if hasattr(message, "to_dict"):
+                message = message.to_dict()
+            elif hasattr(message, "model_dump"):
+                message = message.model_dump(exclude_none=True)
+            else:
+                message = vars(message)
+        trajectory.append({k: v for k, v in message.items() if k != "base64_image"})
+    return codec.dumps(trajectory, indent=True)
+
+
+def trajectory_hash(model: str, system_prompt: str, query: str, solution: str) -> str:
+    """评分缓存的键：同一模型、提示词、需求和方案只评一次"""
+    key = codec.dumps([model, system_prompt, query, solution])
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+class RewardCache:
+    """
+    sqlite 持久化的评分缓存，键为轨迹哈希
+    只在事件循环线程中调用，每次都是很短的同步事务
+    """
+
+    def __init__(self, path: Path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS rewards ("
+            "key TEXT PRIMARY KEY, result TEXT NOT NULL, created REAL NOT NULL)"
+        )
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        row = self._db.execute("SELECT result FROM rewards WHERE key = ?", (key,)).fetchone()
+        return codec.loads(row[0]) if row else None
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        self._db.execute(
+            "INSERT OR REPLACE INTO rewards VALUES (?, ?, ?)",
+            (key, codec.dumps(result), time.time()),
+        )
+
+    def close(self) -> None:
+        self._db.close()
+
+
+def _retryable(error: Exception) -> bool:
+    if isinstance(error, (RewardParseError, APIConnectionError, RateLimitError)):
+        return True
+    return isinstance(error, APIStatusError) and error.status_code >= 500
+
+
+class RewardEngine:
+    """
+    批量轨迹评分引擎
+    所有请求共用一个带连接池的客户端，信号量限制同时在途的请求数；
+    接口错误或输出无法解析时按指数退避重试；结果按轨迹哈希缓存，
+    并发评分同一条轨迹时只发一次请求
+    """
+
+    def __init__(
+        self,
+        llm_config: LLMSettings,
+        concurrency: int = 8,
+        max_retries: int = 3,
+        timeout: int = 300,
+        cache: Optional[RewardCache] = None,
+        system_prompt: str = SYSTEM_PROMPT,
+        criteria: Dict = EVALUATION_CRITERIA,
+        temperature: float = 0,
+    ):
+        self.model = llm_config.model
+        # 重试由引擎自己处理，客户端不再重试
+        self.client = AsyncOpenAI(
+            api_key=llm_config.api_key, base_url=llm_config.base_url, max_retries=0
+        )
+        self.max_retries = max(0, max_retries)
+        self.timeout = timeout
+        self.cache = cache
+        self.system_prompt = system_prompt
+        self.criteria = criteria
+        self.temperature = temperature
+        self.concurrency = max(1, concurrency)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def key(self, query: str, solution: str) -> str:
+        return trajectory_hash(self.model, self.system_prompt, query, solution)
+
+    async def complete(self, query: str, solution: str, system_prompt: Optional[str] = None) -> str:
+        """发送一次评分请求，返回模型的原始输出"""
+        system_msgs = (system_prompt or self.system_prompt) + "\n" + "用户需求: " + query
+        reward_messages = [
+            # 系统消息（设定角色和任务）
+            {"role": "system", "content": system_msgs},
+            # 待评估方案
+            {"role": "user", "content": build_evaluation_prompt(solution, self.criteria)},
+        ]
+        async with self._semaphore:
+            response = await self.client.chat.completions.create(
+                model=self.model,
+                messages=reward_messages,
+                temperature=self.temperature,
+                timeout=self.timeout,
+                response_format={"type": "json_object"},
+            )
+        if not response.choices or not response.choices[0].message:
+            raise RewardParseError("Empty response from reward model")
+        return response.choices[0].message.content
+
+    async def score(self, query: str, solution: str) -> Dict[str, Any]:
+        """
+        给一条轨迹打分
+        :return: 评分结果字典，包含 weighted_total、scores、comments
+        """
+        key = self.key(query, solution)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await self._score_with_retries(query, solution)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # 没有其他等待者时避免 "exception was never retrieved" 警告
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+        if self.cache is not None:
+            self.cache.put(key, result)
+        future.set_result(result)
+        return result
+
+    async def _score_with_retries(self, query: str, solution: str) -> Dict[str, Any]:
+        for attempt in range(self.max_retries + 1):
+            try:
+                content = await self.complete(query, solution)
+                return parse_reward(content, self.criteria)
+            except Exception as e:
+                if attempt == self.max_retries or not _retryable(e):
+                    raise
+                delay = min(2 ** attempt, 30) * (0.5 + random.random())
+                logger.warning(f"Reward scoring failed ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    async def close(self) -> None:
+        await self.client.close()
+        if self.cache is not None:
+            self.cache.close()
+
+
+def create_reward_engine(use_cache: bool = True, **overrides) -> RewardEngine:
+    """按 [reward] 配置创建评分引擎，overrides 覆盖配置中的同名参数"""
+    settings = config.reward_config
+    llm_config = config.llm.get(settings.llm, config.llm["default"])
+    cache = None
+    if use_cache:
+        cache_path = settings.cache_path or config.workspace_root / "reward_cache.db"
+        cache = RewardCache(cache_path)
+    options = {
+        "concurrency": settings.concurrency,
+        "max_retries": settings.max_retries,
+        "timeout": settings.timeout,
+        **overrides,
+    }
+    return RewardEngine(llm_config, cache=cache, **options)
+
+
+_engine: Optional[RewardEngine] = None
+
+
+def get_reward_engine() -> RewardEngine:
+    """进程内共用的评分引擎"""
+    global _engine
+    if _engine is None:
+        _engine = create_reward_engine()
+    return _engine
+
 
 class ContentValidator:
-    def __init__(self):
+    def __init__(self, engine: Optional[RewardEngine] = None):
         """
-        初始化验证器类（需注入 LLM 实例）
-        :param llm: LLM 实例，用于调用大语言模型接口
+        初始化验证器类
+        :param engine: 评分引擎，默认使用进程内共用的引擎
         """
         self.global_score = 0
         self.system_prompt = SYSTEM_PROMPT
+        self._engine = engine
+
+    @property
+    def engine(self) -> RewardEngine:
+        if self._engine is None:
+            self._engine = get_reward_engine()
+        return self._engine
 
     async def final_trajectory_score(
         self,
         user_query,
         messages
-    ) -> int:
+    ) -> float:
         """
         检验 manus 生成的最终方案并打分（调用 LLM 辅助评分）
-        :return: 合理性得分
+        :return: 合理性得分（加权总分）
         """
-        # 调用 LLM 获取评分响应
-        llm_response = await self.ask_reward(query = user_query,
-                    messages=messages,
-                    system_msgs =
-                    self.system_prompt
-                    if self.system_prompt
-                    else None
-                )
-        logger.info(f'👀👀 调用模型评估最终的输出: {llm_response}')
-        total = json.loads(llm_response)["weighted_total"]
-
-        if not llm_response:
-            return 0  # 或根据需求处理异常情况
-
-        # 假设 LLM 响应内容中包含评分字段
-        # try:
-        #     score = int(llm_response.choices)
-        #     self.global_score += score
-        #     return score
-        # except (ValueError, IndexError):
-        #     logger.error("LLM 响应格式错误，无法解析评分")
-        return total
+        result = await self.engine.score(user_query, solution_text(messages))
+        logger.info(f'👀👀 调用模型评估最终的输出: {result}')
+        return result["weighted_total"]
 
     async def ask_reward(
         self,
@@ -78,58 +312,12 @@ class ContentValidator:
         timeout: int = 300,
         temperature: int = 0,
         **kwargs,
-    ) -> ChatCompletionMessage | None:
+    ) -> Optional[str]:
         """
-        调用 LLM 给最终方案打分（整合后的方法）
+        调用 LLM 给最终方案打分，返回模型的原始输出（不缓存、不重试）
         """
-
-        # openai_api_key = "EMPTY"
-        # openai_api_base = "http://10.66.180.89:30000/v1"
-        # model = "/nfs/ofs-llab-cold/model/deepseek-ai/DeepSeek-R1-0528"
-
-        openai_api_key = "9cb0a12b-dd0c-4a0f-a26c-47f799eab8ff"
-        openai_api_base = "https://ark.cn-beijing.volces.com/api/v3"
-        model = "deepseek-r1-250528"
-
-        client = AsyncOpenAI(
-            api_key=openai_api_key,
-            base_url=openai_api_base,
-        )
-
         try:
-            # 格式化消息（通过注入的 llm 实例调用）
-            final_msg = build_evaluation_prompt(messages, EVALUATION_CRITERIA)
-
-            user_query = '用户需求: ' + query
-            system_msgs = system_msgs + "\n" + user_query
-
-            reward_messages = [
-                # 系统消息（设定角色和任务）
-                {"role": "system", "content": system_msgs},
-
-                # 用户当前问题
-                {"role": "user", "content": final_msg}
-            ]
-
-            # 构造请求参数
-            response: ChatCompletion = await client.chat.completions.create(
-            model=model,
-            messages=reward_messages,
-            temperature=temperature,
-            timeout=timeout,
-            response_format={"type": "json_object"}
-            )
-
-            # logger.info(f'👀👀 调用模型评估最终的输出: {response.choices[0].message.content}')
-            # print(type(response.choices[0].message.content))
-            # print(response.choices[0].message.content["weighted_total"])
-            # 检查响应有效性
-            # if not response.choices or not response.choices[0].message:
-            #     logger.error("LLM 返回空响应")
-            #     return None
-
-            return response.choices[0].message.content
-
+            return await self.engine.complete(query, solution_text(messages), system_msgs)
         except TokenLimitExceeded:
             raise  # 不记录日志，直接抛出
         except ValueError as ve:
@@ -141,8 +329,6 @@ class ContentValidator:
                 logger.error("认证失败，请检查 API key")
             elif isinstance(oe, RateLimitError):
                 logger.error("速率限制超限，尝试增加重试次数")
-            elif isinstance(oe, APIError):
-                logger.error(f"API 错误详情: {oe}")
             raise
         except Exception as e:
             logger.error(f"ask_reward 意外错误: {e}")
@@ -155,29 +341,3 @@ class ContentValidator:
         :return: 布尔值，表示是否满足条件
         """
         pass
-
-
-if __name__ == "__main__":
-    from app.llm import LLM
-    from app.config import LLMSettings, config
-    from app.schema import Message
-
-    # 初始化 LLM 实例
-    llm_config = LLMSettings()  # 假设 LLMSettings 可以无参数初始化
-    llm = LLM(config_name="default", llm_config=llm_config)
-
-    # 初始化 ContentValidator 实例
-    validator = ContentValidator(llm)
-
-    # 模拟消息列表
-    test_messages = [
-        Message(user="user", content="这是一个测试消息")
-    ]
-
-    try:
-        # 调用异步的 final_trajectory_score 方法
-        import asyncio
-        score = asyncio.run(validator.final_trajectory_score(test_messages))
-        print(f"最终方案的合理性得分: {score}")
-    except Exception as e:
-        print(f"测试过程中出现错误: {e}")
@@ -1,7 +1,7 @@
 import asyncio
 import json
 from typing import Any, List, Optional, Union, Dict
-from app.agent.validator import Validator
+from app import codec
 from pydantic import Field
 import time
 from app.agent.react import ReActAgent
@@ -76,11 +76,7 @@ class ToolCallAgent(ReActAgent):
                 if isinstance(content, str) and 'Observed output of cmd' in content:
                     content = content.split(':', 1)[-1].strip()
 
-                try:
-                    parsed_content = json.loads(content)
-                    formatted_content = json.dumps(parsed_content, indent=2, ensure_ascii=False)
-                except (json.JSONDecodeError, TypeError):
-                    formatted_content = str(content)
+                formatted_content = codec.pretty_json_text(content)
 
                 tool_output = f"""【{tool_name}】输出结果：
 {formatted_content}
@@ -199,13 +195,13 @@ class ToolCallAgent(ReActAgent):
             expanded_calls = []
             for call in raw_tool_calls:
                 try:
-                    arguments_obj = json.loads(call.function.arguments or '{}')
+                    arguments_obj = codec.loads(call.function.arguments or '{}')
                     if isinstance(arguments_obj, list):
                         logger.warning(f"⚠️ Expanding a bundled tool call for '{call.function.name}'...")
                         for item in arguments_obj:
                             new_call = copy.deepcopy(call)
                             new_call.id = f"call_{uuid.uuid4().hex}"
-                            new_call.function.arguments = json.dumps(item, ensure_ascii=False)
+                            new_call.function.arguments = codec.dumps(item)
                             expanded_calls.append(new_call)
                     else:
                         expanded_calls.append(call)
@@ -364,7 +360,7 @@ class ToolCallAgent(ReActAgent):
                     # 如果重连后工具仍然不存在，说明有问题
                     return ToolResult(error=f"Unknown tool '{name}' after {attempt} attempts.")
 
-                args = json.loads(args_str)
+                args = codec.loads(args_str)
 
                 args = self._validate_and_clean_tool_args(name, args, getattr(tool, 'parameters', {}))
 
@@ -1,22 +1,17 @@
 from pydantic import Field
 
 # from app.agent.browser import BrowserAgent
+from app import codec
 from app.config import config
-from app.prompt.browser import NEXT_STEP_PROMPT as BROWSER_NEXT_STEP_PROMPT
 from app.prompt.validator import NEXT_STEP_PROMPT, SYSTEM_PROMPT
-from app.tool import Terminate, ToolCollection
-from app.tool.browser_use_tool import BrowserUseTool
-from app.tool.python_execute import PythonExecute
-from app.tool.str_replace_editor import StrReplaceEditor
+from app.tool import ToolCollection
 from app.tool.hotel_search import HotelSearch
 from app.tool.flight_search import FlightSearch
 from app.tool.train_search import TrainSearch
+from app.tool.travel_results import TravelResults
+from app.tool.trip_search import TripSearch
 from app.tool.location_search import LocationSearch
 from app.tool.route_planner import RoutePlanner
-from app.tool.current_location import CurrentLocation
-from app.tool.location_around_search import LocationAroundSearch
-from app.tool.reverse_geocoding import  ReverseGeocoding
-from app.tool.around_poi_search import  AroundPOISearch
 from app.tool.web_search import WebSearch
 from app.agent.validator_toolcall import ToolCallAgent
 
@@ -45,7 +40,7 @@ class Validator(ToolCallAgent):
     # BrowserUseTool(),
     available_tools: ToolCollection = Field(
         default_factory=lambda: ToolCollection(
-        TrainSearch(), HotelSearch(), FlightSearch(), LocationSearch(), WebSearch(), RoutePlanner()
+        TrainSearch(), HotelSearch(), FlightSearch(), TripSearch(), TravelResults(), LocationSearch(), WebSearch(), RoutePlanner()
         )
     )
 
@@ -74,12 +69,7 @@ class Validator(ToolCallAgent):
                     content = content.split(':', 1)[-1].strip()
 
                 # 尝试解析JSON内容（如果内容是JSON字符串）
-                try:
-                    import json
-                    parsed_content = json.loads(content)
-                    formatted_content = json.dumps(parsed_content, indent=2, ensure_ascii=False)
-                except (json.JSONDecodeError, TypeError):
-                    formatted_content = str(content)
+                formatted_content = codec.pretty_json_text(content)
 
                 # 构建格式化输出
                 tool_output = f"""
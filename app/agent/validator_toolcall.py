@@ -3,6 +3,7 @@ import json
 from typing import Any, List, Optional, Union
 from pydantic import Field
 
+from app import codec
 from app.agent.validator_react import ReActAgent
 from app.agent.reward import ContentValidator
 from app.exceptions import TokenLimitExceeded
@@ -195,7 +196,7 @@ class ToolCallAgent(ReActAgent):
 
         try:
             # Parse arguments
-            args = json.loads(command.function.arguments or "{}")
+            args = codec.loads(command.function.arguments or "{}")
 
             # Execute the tool
             logger.info(f"🔧 Activating tool: '{name}'...")
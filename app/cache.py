@@ -0,0 +1,240 @@
+"""Cache for tool results and LLM responses.
+
+Travel and web search tools cache the raw API results of their requests,
+and the LLM can cache non-streaming completions (``[cache] llm_responses``).
+The ``sqlite`` backend is a single WAL-mode file that every server worker
+opens, so with ``serve.py --workers N`` a result fetched by one worker is a
+hit for all of them; the ``memory`` backend is private to a process.
+
+Values must be JSON serializable. Entries expire after ``ttl`` seconds and
+failures are never cached.
+"""
+import asyncio
+import functools
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+from app import codec
+from app.config import config
+from app.logger import logger
+
+
+def cache_key(*parts: Any) -> str:
+    """Stable key of JSON-serializable request parts."""
+    return hashlib.sha256(codec.dumps(parts).encode("utf-8")).hexdigest()
+
+
+class ResultCache(ABC):
+    """Key-value cache with per-namespace keys and a time to live."""
+
+    def __init__(self, ttl: float = 600):
+        self.ttl = ttl
+
+    @abstractmethod
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired."""
+
+    @abstractmethod
+    def put(self, namespace: str, key: str, value: Any) -> None:
+        """Store a value for ``ttl`` seconds."""
+
+    async def aget(self, namespace: str, key: str) -> Optional[Any]:
+        """``get`` for callers on the event loop."""
+        return self.get(namespace, key)
+
+    async def aput(self, namespace: str, key: str, value: Any) -> None:
+        """``put`` for callers on the event loop."""
+        self.put(namespace, key, value)
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryCache(ResultCache):
+    """Per-process cache keeping at most ``max_entries`` recently used values."""
+
+    def __init__(self, ttl: float = 600, max_entries: int = 10000):
+        super().__init__(ttl)
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        entry = self._entries.get((namespace, key))
+        if entry is None:
+            return None
+        if entry[0] < time.time():
+            del self._entries[(namespace, key)]
+            return None
+        self._entries.move_to_end((namespace, key))
+        return entry[1]
+
+    def put(self, namespace: str, key: str, value: Any) -> None:
+        self._entries[(namespace, key)] = (time.time() + self.ttl, value)
+        self._entries.move_to_end((namespace, key))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class SqliteCache(ResultCache):
+    """Cache in a sqlite file shared by all processes using the same path.
+
+    WAL mode lets workers read while another one writes, but a write still
+    waits for a concurrent writer in another worker. ``aget``/``aput`` run
+    the statements in a worker thread, each thread with its own connection,
+    so that wait never blocks the event loop; and a lookup or store that
+    stays locked for longer than ``busy_timeout`` counts as a miss.
+    """
+
+    # Expired rows are deleted every this many writes
+    PRUNE_EVERY = 500
+
+    def __init__(self, path: Path, ttl: float = 600, busy_timeout: float = 2):
+        super().__init__(ttl)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._writes = 0
+
+        db = self._connection()
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+            "expires REAL NOT NULL, PRIMARY KEY (namespace, key))"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        """The calling thread's connection, opened on first use."""
+        db = getattr(self._local, "db", None)
+        if db is None:
+            # Only ever used by this thread; close() may run in another one
+            db = sqlite3.connect(
+                self.path,
+                isolation_level=None,
+                timeout=self.busy_timeout,
+                check_same_thread=False,
+            )
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+            with self._lock:
+                self._connections.append(db)
+        return db
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        try:
+            row = self._connection().execute(
+                "SELECT value FROM cache WHERE namespace = ? AND key = ? AND expires > ?",
+                (namespace, key, time.time()),
+            ).fetchone()
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Cache lookup in {namespace} failed, treating as miss: {e}")
+            return None
+        return codec.loads(row[0]) if row else None
+
+    def put(self, namespace: str, key: str, value: Any) -> None:
+        now = time.time()
+        db = self._connection()
+        try:
+            db.execute(
+                "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)",
+                (namespace, key, codec.dumps(value), now + self.ttl),
+            )
+            with self._lock:
+                self._writes += 1
+                prune = self._writes % self.PRUNE_EVERY == 0
+            if prune:
+                db.execute("DELETE FROM cache WHERE expires <= ?", (now,))
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Cache store in {namespace} failed, not cached: {e}")
+
+    async def aget(self, namespace: str, key: str) -> Optional[Any]:
+        return await asyncio.to_thread(self.get, namespace, key)
+
+    async def aput(self, namespace: str, key: str, value: Any) -> None:
+        await asyncio.to_thread(self.put, namespace, key, value)
+
+    def close(self) -> None:
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for db in connections:
+            db.close()
+        self._local = threading.local()
+
+
+_cache: Optional[ResultCache] = None
+_cache_pid: Optional[int] = None
+
+
+def get_cache() -> Optional[ResultCache]:
+    """The process's cache from the ``[cache]`` configuration, or None if disabled.
+
+    Opened on first use in each process, so server workers forked from a
+    parent that already used the cache get their own sqlite connection.
+    """
+    global _cache, _cache_pid
+    if _cache_pid == os.getpid():
+        return _cache
+    settings = config.cache_config
+    if settings.backend == "sqlite":
+        _cache = SqliteCache(settings.path or config.workspace_root / "cache.db", settings.ttl)
+    elif settings.backend == "memory":
+        _cache = MemoryCache(settings.ttl, settings.max_entries)
+    else:
+        if settings.backend != "none":
+            logger.warning(f"Unknown cache backend {settings.backend!r}, caching disabled")
+        _cache = None
+    _cache_pid = os.getpid()
+    return _cache
+
+
+def cached(
+    namespace: str, validate: Optional[Callable[[Any, Any], Any]] = None
+) -> Callable:
+    """Cache the results of an async method by its arguments.
+
+    The arguments (other than ``self``) and the result must be JSON
+    serializable. Exceptions propagate and, like None results, are not
+    cached.
+
+    Args:
+        namespace: Key namespace of the method's results.
+        validate: Called as ``validate(self, result)``; a result it raises on,
+            such as an API error payload, is returned but not cached.
+    """
+
+    def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            cache = get_cache()
+            if cache is None:
+                return await func(self, *args, **kwargs)
+            key = cache_key(args, kwargs)
+            value = await cache.aget(namespace, key)
+            if value is not None:
+                logger.debug(f"Cache hit in {namespace}")
+                return value
+            value = await func(self, *args, **kwargs)
+            if value is None:
+                return value
+            if validate is not None:
+                try:
+                    validate(self, value)
+                except Exception as e:
+                    logger.debug(f"Not caching invalid result in {namespace}: {e}")
+                    return value
+            await cache.aput(namespace, key, value)
+            return value
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,83 @@
+"""JSON encoding and decoding for hot serialization paths.
+
+Tool-call arguments, tool outputs, trajectory logs and SSE chunks are encoded
+and decoded several times per agent step. This module routes them through
+orjson when it is installed (``pip install orjson``) and falls back to the
+standard library otherwise, so callers never depend on the backend.
+
+Output is always compact (no spaces after separators) and keeps non-ASCII
+characters as is, unless ``ensure_ascii`` is requested. ``JSONDecodeError``
+is the standard library class; orjson's decode error subclasses it, so
+existing ``except json.JSONDecodeError`` handlers keep working.
+"""
+import json
+from functools import lru_cache
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+JSONDecodeError = json.JSONDecodeError
+
+# Name of the active backend, for logs and benchmarks
+BACKEND = "orjson" if orjson is not None else "json"
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_NON_STR_KEYS
+    _INDENT_OPTIONS = _OPTIONS | orjson.OPT_INDENT_2
+
+
+def loads(data: Union[str, bytes, bytearray]) -> Any:
+    """Decode a JSON document.
+
+    Raises:
+        JSONDecodeError: If ``data`` is not valid JSON.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any, *, indent: bool = False, ensure_ascii: bool = False) -> str:
+    """Encode ``obj`` as JSON text.
+
+    Args:
+        obj: Value to encode.
+        indent: Pretty-print with two-space indentation.
+        ensure_ascii: Escape non-ASCII characters (always uses the standard
+            library, which is the only backend supporting it).
+
+    Raises:
+        TypeError: If ``obj`` contains a value that cannot be encoded.
+    """
+    if orjson is not None and not ensure_ascii:
+        try:
+            return orjson.dumps(obj, option=_INDENT_OPTIONS if indent else _OPTIONS).decode()
+        except TypeError:
+            # Values orjson rejects but json accepts, e.g. integers over 64 bits
+            pass
+    if indent:
+        return json.dumps(obj, ensure_ascii=ensure_ascii, indent=2)
+    return json.dumps(obj, ensure_ascii=ensure_ascii, separators=(",", ":"))
+
+
+@lru_cache(maxsize=512)
+def _pretty(text: str) -> str:
+    try:
+        return dumps(loads(text), indent=True)
+    except (JSONDecodeError, TypeError, ValueError):
+        return text
+
+
+def pretty_json_text(content: Any) -> str:
+    """Pretty-print JSON text, returning anything else as ``str(content)``.
+
+    Results are cached because agents re-render the same tool outputs on
+    every step of a conversation.
+    """
+    if not isinstance(content, str):
+        return str(content)
+    return _pretty(content)
@@ -58,12 +58,32 @@ class SearchSettings(BaseModel):
         default="us",
         description="Country code for search results (e.g., us, cn, uk)",
     )
+    engine_workers: int = Field(
+        default=4,
+        description="Size of the dedicated thread pool for each search engine",
+    )
+    engine_timeout: float = Field(
+        default=30.0,
+        description="Seconds before a single search engine call is abandoned",
+    )
 
 
 class RunflowSettings(BaseModel):
     use_data_analysis_agent: bool = Field(
         default=False, description="Enable data analysis agent in run flow"
     )
+    max_parallel_steps: int = Field(
+        default=3,
+        description="Maximum number of independent plan steps executed at the same time",
+    )
+    plan_store_path: Optional[str] = Field(
+        default=None,
+        description="sqlite file persisting plans so long flows can be resumed "
+        "(plans are kept in memory only if unset)",
+    )
+    max_cached_plans: int = Field(
+        default=64, description="Plans kept in memory per flow, least recently used first out"
+    )
 
 
 class BrowserSettings(BaseModel):
@@ -103,6 +123,91 @@ class SandboxSettings(BaseModel):
     network_enabled: bool = Field(
         False, description="Whether network access is allowed"
     )
+    pool_size: int = Field(
+        0, description="Pre-warmed sandboxes kept ready per image (0 disables)"
+    )
+
+
+class JobSettings(BaseModel):
+    """Configuration for the offline batch job queue"""
+
+    concurrency: int = Field(
+        4, description="Maximum number of prompts processed at the same time"
+    )
+    data_dir: Optional[str] = Field(
+        None,
+        description="Directory for the job database and per-job result files "
+        "(defaults to <workspace>/jobs)",
+    )
+    max_attempts: int = Field(
+        2, description="Attempts per prompt before it is recorded as failed"
+    )
+
+
+class RewardSettings(BaseModel):
+    """Configuration for trajectory reward scoring"""
+
+    llm: str = Field(
+        "reward",
+        description="Name of the [llm.<name>] section used for scoring "
+        "(falls back to the default llm)",
+    )
+    concurrency: int = Field(8, description="Maximum number of scoring requests in flight")
+    max_retries: int = Field(
+        3, description="Retries per trajectory on API errors or unparseable scores"
+    )
+    timeout: int = Field(300, description="Timeout of one scoring request in seconds")
+    cache_path: Optional[str] = Field(
+        None,
+        description="sqlite file caching scores by trajectory hash "
+        "(defaults to <workspace>/reward_cache.db)",
+    )
+
+
+class CacheSettings(BaseModel):
+    """Configuration for the tool-result and LLM-response cache"""
+
+    backend: str = Field(
+        "none",
+        description="none, memory (per process) or sqlite (one file shared by "
+        "all server workers)",
+    )
+    path: Optional[str] = Field(
+        None, description="sqlite cache file (defaults to <workspace>/cache.db)"
+    )
+    ttl: int = Field(600, description="Seconds a cached result stays valid")
+    max_entries: int = Field(
+        10000, description="Entries kept by the memory backend, least recently used first out"
+    )
+    llm_responses: bool = Field(
+        False,
+        description="Also cache non-streaming LLM completions, so identical "
+        "requests get identical answers",
+    )
+
+
+class AdmissionSettings(BaseModel):
+    """Configuration for chat session admission and upstream concurrency caps"""
+
+    max_sessions: int = Field(
+        8, description="Chat sessions running at the same time in one server process"
+    )
+    max_queue: int = Field(
+        32,
+        description="Chat sessions waiting for a slot; further requests get "
+        "429 Too Many Requests",
+    )
+    retry_after: int = Field(
+        30,
+        description="Retry-After seconds suggested before any session has "
+        "finished (later estimated from session durations)",
+    )
+    llm_concurrency: int = Field(
+        16, description="LLM requests in flight per process (0 = unlimited)"
+    )
+    mcp_concurrency: int = Field(
+        16, description="MCP tool calls in flight per process (0 = unlimited)"
+    )
 
 
 class MCPServerConfig(BaseModel):
@@ -167,6 +272,18 @@ class AppConfig(BaseModel):
     run_flow_config: Optional[RunflowSettings] = Field(
         None, description="Run flow configuration"
     )
+    job_config: Optional[JobSettings] = Field(
+        None, description="Batch job queue configuration"
+    )
+    reward_config: Optional[RewardSettings] = Field(
+        None, description="Reward scoring configuration"
+    )
+    cache_config: Optional[CacheSettings] = Field(
+        None, description="Tool-result and LLM-response cache configuration"
+    )
+    admission_config: Optional[AdmissionSettings] = Field(
+        None, description="Session admission and concurrency cap configuration"
+    )
 
     class Config:
         arbitrary_types_allowed = True
@@ -283,6 +400,25 @@ class Config:
             run_flow_settings = RunflowSettings(**run_flow_config)
         else:
             run_flow_settings = RunflowSettings()
+
+        job_config = raw_config.get("jobs", {})
+        job_settings = JobSettings(**job_config) if job_config else JobSettings()
+
+        reward_config = raw_config.get("reward", {})
+        reward_settings = (
+            RewardSettings(**reward_config) if reward_config else RewardSettings()
+        )
+
+        cache_config = raw_config.get("cache", {})
+        cache_settings = CacheSettings(**cache_config) if cache_config else CacheSettings()
+
+        admission_config = raw_config.get("admission", {})
+        admission_settings = (
+            AdmissionSettings(**admission_config)
+            if admission_config
+            else AdmissionSettings()
+        )
+
         config_dict = {
             "llm": {
                 "default": default_settings,
@@ -296,6 +432,10 @@ class Config:
             "search_config": search_settings,
             "mcp_config": mcp_settings,
             "run_flow_config": run_flow_settings,
+            "job_config": job_settings,
+            "reward_config": reward_settings,
+            "cache_config": cache_settings,
+            "admission_config": admission_settings,
         }
 
         self._config = AppConfig(**config_dict)
@@ -326,6 +466,26 @@ class Config:
         """Get the Run Flow configuration"""
         return self._config.run_flow_config
 
+    @property
+    def job_config(self) -> JobSettings:
+        """Get the batch job queue configuration"""
+        return self._config.job_config
+
+    @property
+    def reward_config(self) -> RewardSettings:
+        """Get the reward scoring configuration"""
+        return self._config.reward_config
+
+    @property
+    def cache_config(self) -> CacheSettings:
+        """Get the tool-result and LLM-response cache configuration"""
+        return self._config.cache_config
+
+    @property
+    def admission_config(self) -> AdmissionSettings:
+        """Get the session admission and concurrency cap configuration"""
+        return self._config.admission_config
+
     @property
     def workspace_root(self) -> Path:
         """Get the workspace root directory"""
@@ -1,16 +1,20 @@
+import asyncio
 import json
-import time
+import re
+import uuid
 from enum import Enum
-from typing import Dict, List, Optional, Union
+from typing import Dict, Iterable, List, Optional, Set, Union
 
-from pydantic import Field
+from pydantic import Field, PrivateAttr
 
 from app.agent.base import BaseAgent
+from app.config import config
 from app.flow.base import BaseFlow
 from app.llm import LLM
 from app.logger import logger
 from app.schema import AgentState, Message, ToolChoice
 from app.tool import PlanningTool
+from app.tool.plan_store import create_plan_store
 
 
 class PlanStepStatus(str, Enum):
@@ -42,14 +46,33 @@ class PlanStepStatus(str, Enum):
         }
 
 
+def _result_note(result: str, limit: int = 300) -> str:
+    # agent.run() ends its output with the final answer
+    note = re.split(r"\n\s*\n", result.strip())[-1].strip()
+    return note if len(note) <= limit else "..." + note[-limit:]
+
+
 class PlanningFlow(BaseFlow):
     """A flow that manages planning and execution of tasks using agents."""
 
     llm: LLM = Field(default_factory=lambda: LLM())
     planning_tool: PlanningTool = Field(default_factory=PlanningTool)
     executor_keys: List[str] = Field(default_factory=list)
-    active_plan_id: str = Field(default_factory=lambda: f"plan_{int(time.time())}")
+    # Namespace of this flow's plans in the plan store
+    flow_id: str = Field(default_factory=lambda: uuid.uuid4().hex)
+    active_plan_id: str = Field(default_factory=lambda: f"plan_{uuid.uuid4().hex}")
     current_step_index: Optional[int] = None
+    max_parallel_steps: int = Field(
+        default_factory=lambda: config.run_flow_config.max_parallel_steps
+    )
+
+    # Results of executed steps and the executor that produced each of them
+    _step_results: Dict[int, str] = PrivateAttr(default_factory=dict)
+    _step_executors: Dict[int, int] = PrivateAttr(default_factory=dict)
+    # Executors currently running a step, and extra executors created so
+    # that steps needing a busy agent can run in parallel
+    _busy_executors: Set[int] = PrivateAttr(default_factory=set)
+    _spare_executors: Dict[int, List[BaseAgent]] = PrivateAttr(default_factory=dict)
 
     def __init__(
         self, agents: Union[BaseAgent, List[BaseAgent], Dict[str, BaseAgent]], **data
@@ -62,9 +85,11 @@ class PlanningFlow(BaseFlow):
         if "plan_id" in data:
             data["active_plan_id"] = data.pop("plan_id")
 
-        # Initialize the planning tool if not provided
+        # Initialize the planning tool with a store private to this flow;
+        # pass the flow_id and plan_id of an earlier flow to resume its plan
+        data.setdefault("flow_id", uuid.uuid4().hex)
         if "planning_tool" not in data:
-            planning_tool = PlanningTool()
+            planning_tool = PlanningTool(store=create_plan_store(data["flow_id"]))
             data["planning_tool"] = planning_tool
 
         # Call parent's init with the processed data
@@ -97,8 +122,10 @@ class PlanningFlow(BaseFlow):
             if not self.primary_agent:
                 raise ValueError("No primary agent available")
 
-            # Create initial plan if input provided
-            if input_text:
+            # Create initial plan if input provided, unless resuming a stored plan
+            if self.active_plan_id in self.planning_tool.plans:
+                logger.info(f"Resuming stored plan {self.active_plan_id}")
+            elif input_text:
                 await self._create_initial_plan(input_text)
 
                 # Verify plan was created successfully
@@ -108,30 +135,104 @@ class PlanningFlow(BaseFlow):
                     )
                     return f"Failed to create plan for: {input_text}"
 
-            result = ""
+            result = await self._execute_plan()
+            return result
+        except Exception as e:
+            logger.error(f"Error in PlanningFlow: {str(e)}")
+            return f"Execution failed: {str(e)}"
+
+    async def _execute_plan(self) -> str:
+        """Execute the plan, running steps whose dependencies are met concurrently.
+
+        Steps are started as soon as every step they depend on is completed,
+        with at most ``max_parallel_steps`` running at the same time. A step
+        that fails is marked blocked and the steps depending on it are not run.
+        """
+        semaphore = asyncio.Semaphore(max(1, self.max_parallel_steps))
+        running: Dict[asyncio.Task, int] = {}
+        finished = False
+        try:
             while True:
-                # Get current step to execute
-                self.current_step_index, step_info = await self._get_current_step_info()
+                if not finished:
+                    for step_info in self._get_ready_steps(running.values()):
+                        task = asyncio.create_task(self._run_step(semaphore, step_info))
+                        running[task] = step_info["index"]
 
-                # Exit if no more steps or plan completed
-                if self.current_step_index is None:
-                    result += await self._finalize_plan()
+                if not running:
                     break
 
-                # Execute current step with appropriate agent
-                step_type = step_info.get("type") if step_info else None
-                executor = self.get_executor(step_type)
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    running.pop(task)
+                    executor = task.result()
+
+                    # Check if agent wants to terminate
+                    if hasattr(executor, "state") and executor.state == AgentState.FINISHED:
+                        finished = True
+        finally:
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+            await self._cleanup_spare_executors()
+
+        # Merge step results in plan order
+        result = "".join(
+            self._step_results[index] + "\n" for index in sorted(self._step_results)
+        )
+        if not finished:
+            result += await self._finalize_plan()
+        return result
+
+    async def _run_step(self, semaphore: asyncio.Semaphore, step_info: dict) -> BaseAgent:
+        """Run one step on a free executor once a parallel slot is available."""
+        async with semaphore:
+            executor = self._checkout_executor(step_info.get("type"))
+            try:
+                self.current_step_index = step_info["index"]
+                await self._mark_step(step_info["index"], PlanStepStatus.IN_PROGRESS)
                 step_result = await self._execute_step(executor, step_info)
-                result += step_result + "\n"
+                self._step_results[step_info["index"]] = step_result
+                self._step_executors[step_info["index"]] = id(executor)
+                return executor
+            finally:
+                self._busy_executors.discard(id(executor))
 
-                # Check if agent wants to terminate
-                if hasattr(executor, "state") and executor.state == AgentState.FINISHED:
-                    break
+    def _checkout_executor(self, step_type: Optional[str] = None) -> BaseAgent:
+        """Get an idle executor for a step, creating a spare one if needed.
 
-            return result
-        except Exception as e:
-            logger.error(f"Error in PlanningFlow: {str(e)}")
-            return f"Execution failed: {str(e)}"
+        The configured agent is used whenever it is idle, so plans without
+        parallel steps keep running on a single agent with shared memory.
+        """
+        agent = self.get_executor(step_type)
+        candidates = [agent] + self._spare_executors.get(id(agent), [])
+        for candidate in candidates:
+            if id(candidate) not in self._busy_executors:
+                break
+        else:
+            candidate = self._spawn_executor(agent)
+            self._spare_executors.setdefault(id(agent), []).append(candidate)
+            logger.info(f"Created an extra {agent.name} executor for a parallel step")
+        self._busy_executors.add(id(candidate))
+        return candidate
+
+    def _spawn_executor(self, agent: BaseAgent) -> BaseAgent:
+        """Create another executor like ``agent`` for a step running in parallel.
+
+        Agents keep per-run state (memory, current step), so a busy agent
+        cannot run a second step at the same time. Override this to customize
+        how extra executors are built.
+        """
+        return type(agent)()
+
+    async def _cleanup_spare_executors(self) -> None:
+        for spares in self._spare_executors.values():
+            for spare in spares:
+                if hasattr(spare, "cleanup"):
+                    try:
+                        await spare.cleanup()
+                    except Exception as e:
+                        logger.warning(f"Error cleaning up executor: {e}")
+        self._spare_executors.clear()
 
     async def _create_initial_plan(self, request: str) -> None:
         """Create an initial plan based on the request using the flow's LLM and PlanningTool."""
@@ -140,7 +241,9 @@ class PlanningFlow(BaseFlow):
         system_message_content = (
             "You are a planning assistant. Create a concise, actionable plan with clear steps. "
             "Focus on key milestones rather than detailed sub-steps. "
-            "Optimize for clarity and efficiency."
+            "Optimize for clarity and efficiency. "
+            "Use `step_dependencies` to list, for each step, the earlier steps it needs; "
+            "steps that do not depend on each other (e.g. searching hotels and searching flights) are executed in parallel."
         )
         agents_description = []
         for key in self.executor_keys:
@@ -210,83 +313,76 @@ class PlanningFlow(BaseFlow):
             }
         )
 
-    async def _get_current_step_info(self) -> tuple[Optional[int], Optional[dict]]:
+    def _get_ready_steps(self, running: Iterable[int] = ()) -> List[dict]:
         """
-        Parse the current plan to identify the first non-completed step's index and info.
-        Returns (None, None) if no active step is found.
+        Find the steps that can start now: not completed, not blocked, not
+        already running, and with all their dependencies completed.
         """
         if (
             not self.active_plan_id
             or self.active_plan_id not in self.planning_tool.plans
         ):
             logger.error(f"Plan with ID {self.active_plan_id} not found")
-            return None, None
-
-        try:
-            # Direct access to plan data from planning tool storage
-            plan_data = self.planning_tool.plans[self.active_plan_id]
-            steps = plan_data.get("steps", [])
-            step_statuses = plan_data.get("step_statuses", [])
-
-            # Find first non-completed step
-            for i, step in enumerate(steps):
-                if i >= len(step_statuses):
-                    status = PlanStepStatus.NOT_STARTED.value
-                else:
-                    status = step_statuses[i]
-
-                if status in PlanStepStatus.get_active_statuses():
-                    # Extract step type/category if available
-                    step_info = {"text": step}
-
-                    # Try to extract step type from the text (e.g., [SEARCH] or [CODE])
-                    import re
-
-                    type_match = re.search(r"\[([A-Z_]+)\]", step)
-                    if type_match:
-                        step_info["type"] = type_match.group(1).lower()
-
-                    # Mark current step as in_progress
-                    try:
-                        await self.planning_tool.execute(
-                            command="mark_step",
-                            plan_id=self.active_plan_id,
-                            step_index=i,
-                            step_status=PlanStepStatus.IN_PROGRESS.value,
-                        )
-                    except Exception as e:
-                        logger.warning(f"Error marking step as in_progress: {e}")
-                        # Update step status directly if needed
-                        if i < len(step_statuses):
-                            step_statuses[i] = PlanStepStatus.IN_PROGRESS.value
-                        else:
-                            while len(step_statuses) < i:
-                                step_statuses.append(PlanStepStatus.NOT_STARTED.value)
-                            step_statuses.append(PlanStepStatus.IN_PROGRESS.value)
-
-                        plan_data["step_statuses"] = step_statuses
+            return []
+
+        plan_data = self.planning_tool.plans[self.active_plan_id]
+        steps = plan_data.get("steps", [])
+        step_statuses = plan_data.get("step_statuses", [])
+        dependencies = self.planning_tool.get_dependencies(plan_data)
+        running = set(running)
+        completed = {
+            i
+            for i, status in enumerate(step_statuses)
+            if status == PlanStepStatus.COMPLETED.value
+        }
 
-                    return i, step_info
+        ready = []
+        for i, step in enumerate(steps):
+            status = (
+                step_statuses[i]
+                if i < len(step_statuses)
+                else PlanStepStatus.NOT_STARTED.value
+            )
+            if (
+                i in running
+                or status not in PlanStepStatus.get_active_statuses()
+                or not completed.issuperset(dependencies[i])
+            ):
+                continue
 
-            return None, None  # No active step found
+            step_info = {"index": i, "text": step, "dependencies": dependencies[i]}
 
-        except Exception as e:
-            logger.warning(f"Error finding current step index: {e}")
-            return None, None
+            # Try to extract step type from the text (e.g., [SEARCH] or [CODE])
+            type_match = re.search(r"\[([A-Z_]+)\]", step)
+            if type_match:
+                step_info["type"] = type_match.group(1).lower()
+            ready.append(step_info)
+        return ready
 
     async def _execute_step(self, executor: BaseAgent, step_info: dict) -> str:
-        """Execute the current step with the specified agent using agent.run()."""
+        """Execute a step with the specified agent using agent.run()."""
         # Prepare context for the agent with current plan status
         plan_status = await self._get_plan_text()
-        step_text = step_info.get("text", f"Step {self.current_step_index}")
+        step_index = step_info.get("index", self.current_step_index)
+        step_text = step_info.get("text", f"Step {step_index}")
+
+        # Results of prerequisite steps that ran on another executor, which
+        # are not in this agent's memory
+        prerequisites = "".join(
+            f"\n        Result of step {dep}:\n        {self._step_results[dep]}\n"
+            for dep in step_info.get("dependencies", [])
+            if dep in self._step_results and self._step_executors.get(dep) != id(executor)
+        )
+        if prerequisites:
+            prerequisites = f"\n        RESULTS OF PREREQUISITE STEPS:{prerequisites}"
 
         # Create a prompt for the agent to execute the current step
         step_prompt = f"""
         CURRENT PLAN STATUS:
         {plan_status}
-
+        {prerequisites}
         YOUR CURRENT TASK:
-        You are now working on step {self.current_step_index}: "{step_text}"
+        You are now working on step {step_index}: "{step_text}"
 
         Please only execute this current step using the appropriate tools. When you're done, provide a summary of what you accomplished.
         """
@@ -295,44 +391,33 @@ class PlanningFlow(BaseFlow):
         try:
             step_result = await executor.run(step_prompt)
 
-            # Mark the step as completed after successful execution
-            await self._mark_step_completed()
+            # Mark the step as completed after successful execution, keeping
+            # the end of its result (the agent's final answer) in the plan
+            await self._mark_step(
+                step_index, PlanStepStatus.COMPLETED, notes=_result_note(step_result)
+            )
 
             return step_result
         except Exception as e:
-            logger.error(f"Error executing step {self.current_step_index}: {e}")
-            return f"Error executing step {self.current_step_index}: {str(e)}"
-
-    async def _mark_step_completed(self) -> None:
-        """Mark the current step as completed."""
-        if self.current_step_index is None:
-            return
-
+            logger.error(f"Error executing step {step_index}: {e}")
+            # Steps depending on this one cannot run
+            await self._mark_step(step_index, PlanStepStatus.BLOCKED, notes=str(e)[:200])
+            return f"Error executing step {step_index}: {str(e)}"
+
+    async def _mark_step(
+        self, step_index: int, status: PlanStepStatus, notes: Optional[str] = None
+    ) -> None:
+        """Set the status (and optionally notes) of a step in the active plan."""
         try:
-            # Mark the step as completed
-            await self.planning_tool.execute(
-                command="mark_step",
-                plan_id=self.active_plan_id,
-                step_index=self.current_step_index,
-                step_status=PlanStepStatus.COMPLETED.value,
+            # Only the step changes; the plan is rendered when it is shown
+            self.planning_tool.set_step_status(
+                self.active_plan_id, step_index, status.value, notes
             )
             logger.info(
-                f"Marked step {self.current_step_index} as completed in plan {self.active_plan_id}"
+                f"Marked step {step_index} as {status.value} in plan {self.active_plan_id}"
             )
         except Exception as e:
             logger.warning(f"Failed to update plan status: {e}")
-            # Update step status directly in planning tool storage
-            if self.active_plan_id in self.planning_tool.plans:
-                plan_data = self.planning_tool.plans[self.active_plan_id]
-                step_statuses = plan_data.get("step_statuses", [])
-
-                # Ensure the step_statuses list is long enough
-                while len(step_statuses) <= self.current_step_index:
-                    step_statuses.append(PlanStepStatus.NOT_STARTED.value)
-
-                # Update the status
-                step_statuses[self.current_step_index] = PlanStepStatus.COMPLETED.value
-                plan_data["step_statuses"] = step_statuses
 
     async def _get_plan_text(self) -> str:
         """Get the current plan as formatted text."""
@@ -0,0 +1,477 @@
+"""Persistent batch job queue for offline trajectory generation.
+
+A job is a list of prompts submitted in one request. Jobs and their prompts
+are stored in sqlite so queued work survives a server restart, and a fixed
+pool of workers runs the prompts through an agent with a global concurrency
+cap. Each finished prompt, including the full message trajectory, is appended
+to the job's JSONL result file as soon as it completes.
+
+Several server workers (``serve.py --workers N``) can share one job
+directory: each prompt is claimed by exactly one worker, and the prompts of
+a worker that dies are requeued by the next worker to start.
+"""
+import asyncio
+import functools
+import json
+import os
+import sqlite3
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from app.config import config
+from app.logger import logger
+
+
+# Runs one prompt and returns (final answer, message trajectory)
+PromptRunner = Callable[[str], Awaitable[Tuple[str, List[dict]]]]
+
+T = TypeVar("T")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    created REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    prompt TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    owner TEXT,
+    PRIMARY KEY (job_id, idx)
+);
+CREATE INDEX IF NOT EXISTS tasks_pending ON tasks (status, job_id, idx);
+"""
+
+
+def parse_prompts(body: str) -> List[str]:
+    """Parse a JSONL body into prompts.
+
+    Each non-empty line may be a JSON object with a ``prompt`` (or
+    ``problem``) field, a JSON string, or plain text as used by the prompt
+    files of ``client_multi.py``.
+    """
+    prompts = []
+    for line in body.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            item = json.loads(line)
+        except json.JSONDecodeError:
+            item = line
+        if isinstance(item, dict):
+            item = item.get("prompt") or item.get("problem")
+        if not isinstance(item, str) or not item.strip():
+            raise ValueError(f"Invalid prompt line: {line[:80]}")
+        prompts.append(item.strip())
+    return prompts
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # Exists but belongs to another user
+    return True
+
+
+class JobStore:
+    """sqlite-backed storage for jobs, their prompts and result files.
+
+    Each method is a short transaction on one connection, run on the store's
+    own thread: with several server processes sharing the database, a
+    transaction can wait up to the busy timeout for another process's write
+    lock, and that wait must not block the event loop serving chat requests.
+    """
+
+    def __init__(self, data_dir: Path):
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        # One thread keeps the connection's transactions serialized
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="job-store")
+        self._db = sqlite3.connect(
+            self.data_dir / "jobs.db",
+            isolation_level=None,
+            timeout=10,
+            check_same_thread=False,
+        )
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        columns = {row["name"] for row in self._db.execute("PRAGMA table_info(tasks)")}
+        if "owner" not in columns:
+            # Databases created before prompts recorded the claiming process
+            self._db.execute("ALTER TABLE tasks ADD COLUMN owner TEXT")
+        # Identifies this process's claims; the suffix tells a restarted
+        # process apart from an earlier one that had the same pid
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        self._db.close()
+
+    async def _call(self, func: Callable[..., T], *args: Any) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args))
+
+    def output_path(self, job_id: str) -> Path:
+        return self.data_dir / f"{job_id}.jsonl"
+
+    async def recover(self) -> int:
+        """Requeue prompts left running by processes that no longer exist.
+
+        Prompts claimed by other live workers sharing the job directory are
+        left alone.
+        """
+        return await self._call(self._recover)
+
+    def _recover(self) -> int:
+        owners = [
+            row["owner"]
+            for row in self._db.execute(
+                "SELECT DISTINCT owner FROM tasks WHERE status = 'running'"
+            )
+        ]
+        dead = [owner for owner in owners if not self._owner_alive(owner)]
+        requeued = 0
+        for owner in dead:
+            cursor = self._db.execute(
+                "UPDATE tasks SET status = 'pending', owner = NULL "
+                "WHERE status = 'running' AND owner IS ?",
+                (owner,),
+            )
+            requeued += cursor.rowcount
+        return requeued
+
+    async def create(self, prompts: List[str]) -> str:
+        return await self._call(self._create, prompts)
+
+    def _create(self, prompts: List[str]) -> str:
+        job_id = f"job-{uuid.uuid4().hex[:12]}"
+        now = time.time()
+        with self._db:
+            self._db.execute("BEGIN")
+            self._db.execute(
+                "INSERT INTO jobs VALUES (?, 'queued', ?, ?, ?)",
+                (job_id, len(prompts), now, now),
+            )
+            self._db.executemany(
+                "INSERT INTO tasks (job_id, idx, prompt, status) VALUES (?, ?, ?, 'pending')",
+                [(job_id, i, prompt) for i, prompt in enumerate(prompts)],
+            )
+        self.output_path(job_id).touch()
+        return job_id
+
+    def _owner_alive(self, owner: Optional[str]) -> bool:
+        if owner is None:
+            return False
+        pid = int(owner.split("-")[0])
+        if pid == os.getpid():
+            return owner == self.owner
+        return _process_alive(pid)
+
+    async def claim(self) -> Optional[sqlite3.Row]:
+        """Mark the oldest pending prompt as running and return it.
+
+        The write lock is taken before reading, so two processes sharing the
+        database never claim the same prompt.
+        """
+        return await self._call(self._claim)
+
+    def _claim(self) -> Optional[sqlite3.Row]:
+        with self._db:
+            self._db.execute("BEGIN IMMEDIATE")
+            row = self._db.execute(
+                "SELECT t.job_id, t.idx, t.prompt, t.attempts FROM tasks t "
+                "JOIN jobs j ON j.id = t.job_id "
+                "WHERE t.status = 'pending' AND j.status != 'cancelled' "
+                "ORDER BY j.created, t.idx LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute(
+                "UPDATE tasks SET status = 'running', attempts = attempts + 1, owner = ? "
+                "WHERE job_id = ? AND idx = ?",
+                (self.owner, row["job_id"], row["idx"]),
+            )
+            self._db.execute(
+                "UPDATE jobs SET status = 'running', updated = ? WHERE id = ? AND status = 'queued'",
+                (time.time(), row["job_id"]),
+            )
+        return row
+
+    async def finish(
+        self, job_id: str, idx: int, status: str, error: Optional[str] = None
+    ) -> None:
+        """Record the outcome of a prompt: done, failed, or pending to retry.
+
+        A retry of a prompt whose job was cancelled while it ran is recorded
+        as cancelled instead.
+        """
+        await self._call(self._finish, job_id, idx, status, error)
+
+    def _finish(self, job_id: str, idx: int, status: str, error: Optional[str]) -> None:
+        if status == "pending":
+            self._db.execute(
+                "UPDATE tasks SET error = ?, status = CASE WHEN "
+                "(SELECT status FROM jobs WHERE id = ?) = 'cancelled' "
+                "THEN 'cancelled' ELSE 'pending' END WHERE job_id = ? AND idx = ?",
+                (error, job_id, job_id, idx),
+            )
+            return
+        self._db.execute(
+            "UPDATE tasks SET status = ?, error = ? WHERE job_id = ? AND idx = ?",
+            (status, error, job_id, idx),
+        )
+        remaining = self._db.execute(
+            "SELECT COUNT(*) FROM tasks WHERE job_id = ? AND status IN ('pending', 'running')",
+            (job_id,),
+        ).fetchone()[0]
+        self._db.execute(
+            "UPDATE jobs SET updated = ?, status = CASE WHEN ? = 0 THEN 'completed' "
+            "ELSE status END WHERE id = ? AND status != 'cancelled'",
+            (time.time(), remaining, job_id),
+        )
+
+    async def cancel(self, job_id: str) -> bool:
+        return await self._call(self._cancel, job_id)
+
+    def _cancel(self, job_id: str) -> bool:
+        with self._db:
+            self._db.execute("BEGIN")
+            cursor = self._db.execute(
+                "UPDATE jobs SET status = 'cancelled', updated = ? "
+                "WHERE id = ? AND status IN ('queued', 'running')",
+                (time.time(), job_id),
+            )
+            self._db.execute(
+                "UPDATE tasks SET status = 'cancelled' WHERE job_id = ? AND status = 'pending'",
+                (job_id,),
+            )
+        return cursor.rowcount > 0
+
+    async def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self._call(self._status, job_id)
+
+    def _status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if job is None:
+            return None
+        counts = dict(
+            self._db.execute(
+                "SELECT status, COUNT(*) FROM tasks WHERE job_id = ? GROUP BY status",
+                (job_id,),
+            ).fetchall()
+        )
+        return {
+            "job_id": job["id"],
+            "status": job["status"],
+            "total": job["total"],
+            "pending": counts.get("pending", 0),
+            "running": counts.get("running", 0),
+            "done": counts.get("done", 0),
+            "failed": counts.get("failed", 0),
+            "cancelled": counts.get("cancelled", 0),
+            "created": job["created"],
+            "updated": job["updated"],
+        }
+
+
+class JobRunner:
+    """Worker pool that drains the job store with a concurrency cap.
+
+    Args:
+        store: Job storage.
+        run_prompt: Coroutine running one prompt, returning the final answer
+            and the message trajectory.
+        concurrency: Number of workers, i.e. prompts in flight at once.
+        max_attempts: Attempts per prompt before it is recorded as failed.
+        poll_interval: Seconds between checks for prompts submitted to other
+            server processes sharing the job store.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        run_prompt: PromptRunner,
+        concurrency: int = 4,
+        max_attempts: int = 2,
+        poll_interval: float = 2.0,
+    ):
+        self.store = store
+        self.run_prompt = run_prompt
+        self.concurrency = max(1, concurrency)
+        self.max_attempts = max(1, max_attempts)
+        self.poll_interval = poll_interval
+        self._wakeup = asyncio.Event()
+        self._workers: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        recovered = await self.store.recover()
+        if recovered:
+            logger.info(f"Requeued {recovered} interrupted job prompts")
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"job-worker-{i}")
+            for i in range(self.concurrency)
+        ]
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def submit(self, prompts: List[str]) -> str:
+        job_id = await self.store.create(prompts)
+        logger.info(f"Queued job {job_id} with {len(prompts)} prompts")
+        self._wakeup.set()
+        return job_id
+
+    async def _worker(self) -> None:
+        # Store errors (e.g. "database is locked" while another server process
+        # holds the write lock) are logged and retried, never end the worker
+        while True:
+            try:
+                task = await self.store.claim()
+            except Exception as e:
+                logger.error(f"Job worker failed to claim a prompt, retrying: {e}")
+                await asyncio.sleep(self.poll_interval)
+                continue
+            if task is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            # Let other idle workers pick up the rest of a new job
+            self._wakeup.set()
+            try:
+                await self._run(task)
+            except Exception as e:
+                # The prompt is still claimed by this live process, which
+                # recover() would never requeue: hand it back now
+                logger.error(f"Job {task['job_id']} prompt {task['idx']} was interrupted: {e}")
+                await self._finish(task["job_id"], task["idx"], "pending", str(e))
+
+    async def _run(self, task: sqlite3.Row) -> None:
+        job_id, idx, prompt = task["job_id"], task["idx"], task["prompt"]
+        started = time.monotonic()
+        try:
+            response, trajectory = await self.run_prompt(prompt)
+        except asyncio.CancelledError:
+            # Server shutdown: leave the prompt to be requeued on restart
+            raise
+        except Exception as e:
+            logger.error(f"Job {job_id} prompt {idx} failed: {e}")
+            if task["attempts"] + 1 < self.max_attempts:
+                await self._finish(job_id, idx, "pending", str(e))
+                return
+            self._append(job_id, {"index": idx, "problem": prompt, "status": "failed", "error": str(e)})
+            await self._finish(job_id, idx, "failed", str(e))
+            return
+
+        self._append(
+            job_id,
+            {
+                "index": idx,
+                "problem": prompt,
+                "status": "success",
+                "response": response,
+                "trajectory": trajectory,
+                "elapsed": round(time.monotonic() - started, 3),
+            },
+        )
+        await self._finish(job_id, idx, "done")
+
+    async def _finish(
+        self, job_id: str, idx: int, status: str, error: Optional[str] = None
+    ) -> None:
+        """Record the outcome of a prompt, retrying while the store fails."""
+        while True:
+            try:
+                await self.store.finish(job_id, idx, status, error)
+                return
+            except Exception as e:
+                logger.error(f"Failed to record job {job_id} prompt {idx} as {status}, retrying: {e}")
+                await asyncio.sleep(self.poll_interval)
+
+    def _append(self, job_id: str, record: Dict[str, Any]) -> None:
+        # No await between write and flush, so records never interleave
+        with open(self.store.output_path(job_id), "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    async def stream_results(
+        self, job_id: str, offset: int = 0, follow: bool = True, poll_interval: float = 1.0
+    ) -> AsyncIterator[str]:
+        """Yield result lines from ``offset``, waiting for new ones while the job runs."""
+        path = self.store.output_path(job_id)
+        with open(path, "r", encoding="utf-8") as f:
+            skipped = 0
+            buffer = ""
+            while True:
+                chunk = f.readline()
+                if chunk:
+                    buffer += chunk
+                    if not buffer.endswith("\n"):
+                        continue
+                    if skipped < offset:
+                        skipped += 1
+                    else:
+                        yield buffer
+                    buffer = ""
+                    continue
+
+                status = await self.store.status(job_id)
+                if not follow or status is None or status["status"] not in ("queued", "running"):
+                    # One last read for lines written just before completion
+                    rest = f.read()
+                    for line in (buffer + rest).splitlines(keepends=True):
+                        if skipped < offset:
+                            skipped += 1
+                        else:
+                            yield line
+                    return
+                await asyncio.sleep(poll_interval)
+
+
+async def run_with_manus(prompt: str) -> Tuple[str, List[dict]]:
+    """Run one prompt through a fresh Manus agent."""
+    from app.agent.manus import Manus
+
+    agent = Manus()
+    response = await agent.run(prompt)
+    return response, agent.memory.to_dict_list()
+
+
+def create_job_runner(run_prompt: PromptRunner = run_with_manus) -> JobRunner:
+    """Build a job runner from the ``[jobs]`` configuration."""
+    settings = config.job_config
+    data_dir = Path(settings.data_dir) if settings.data_dir else config.workspace_root / "jobs"
+    return JobRunner(
+        JobStore(data_dir),
+        run_prompt,
+        concurrency=settings.concurrency,
+        max_attempts=settings.max_attempts,
+    )
@@ -0,0 +1,43 @@
+"""Lazy package exports.
+
+Importing ``app.tool`` or ``app.agent`` used to import every tool and agent
+module, and with them browser_use, playwright, docker and the search engine
+SDKs, even when the caller needed a single class. Packages now declare their
+exports by name and import the defining module on first access::
+
+    _EXPORTS = {"Bash": "app.tool.bash", "Terminate": "app.tool.terminate"}
+    __getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+``from app.tool import Bash`` then imports ``app.tool.bash`` only.
+"""
+import importlib
+import sys
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def lazy_exports(
+    package: str, exports: Dict[str, str]
+) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """Build the module ``__getattr__`` and ``__dir__`` of a package.
+
+    Args:
+        package: ``__name__`` of the package.
+        exports: Exported name -> module that defines it.
+
+    Returns:
+        The ``__getattr__`` and ``__dir__`` functions (PEP 562).
+    """
+
+    def __getattr__(name: str) -> Any:
+        module_name = exports.get(name)
+        if module_name is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module_name), name)
+        # Later lookups find the name in the package namespace directly
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(vars(sys.modules[package])) | set(exports))
+
+    return __getattr__, __dir__
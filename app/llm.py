@@ -1,4 +1,3 @@
-import json
 import math
 from typing import Dict, List, Optional, Union
 import re
@@ -16,6 +15,7 @@ from openai import (
     OpenAIError,
     RateLimitError,
 )
+from openai.types.chat import ChatCompletion
 from openai.types.chat.chat_completion_message import ChatCompletionMessage
 from tenacity import (
     retry,
@@ -24,6 +24,9 @@ from tenacity import (
     wait_random_exponential,
 )
 
+from app import codec
+from app.admission import llm_calls
+from app.cache import cache_key, get_cache
 from app.config import LLMSettings, config
 from app.exceptions import TokenLimitExceeded
 from app.logger import logger  # Assuming a logger is set up in your app
@@ -34,6 +37,7 @@ from app.schema import (
     Message,
     ToolChoice,
 )
+from app.tool_call_parser import ParsedToolCall, parse_tool_calls
 
 REASONING_MODELS = ["o1", "o3-mini"]
 MULTIMODAL_MODELS = [
@@ -59,47 +63,27 @@ class ChatCompletionMessageToolCall(BaseModel):
 
 def extract_tool_calls(text: str) -> List[ChatCompletionMessageToolCall]:
     """
-    从文本中提取所有有效的工具调用JSON块
+    从文本中提取所有有效的工具调用（```json 代码块、裸 JSON 或 <tool_call> 标签）
     返回标准化的ChatCompletionMessageToolCall列表
     如果没有有效JSON或格式不符，则返回空列表[]
     """
-    # 检查是否存在可能的json代码块
-    if not re.search(r'```json\n', text):
-        return []
+    return to_message_tool_calls(parse_tool_calls(text).calls)
 
-    tool_calls = []
 
-    # 提取和解析
-    for block in re.findall(r'```json\n([\s\S]*?)\n```', text):
-        try:
-            data = json.loads(block)
-            items = [data] if isinstance(data, dict) else data
-
-            for item in items:
-                # 检查必需字段
-                if not (isinstance(item, dict) and all(k in item for k in ['function', 'parameters'])):
-                    continue
-
-                tool_calls.append(
-                    ChatCompletionMessageToolCall(
-                        id=str(uuid.uuid4()),  # 生成唯一ID
-                        function=Function(
-                            name=item['function'],
-                            arguments=json.dumps(
-                                item['parameters'],
-                                ensure_ascii=False,
-                                separators=(',', ':')
-                            )
-                        ),
-                        type='function',
-                        index=len(tool_calls)  # 递增索引
-                    )
-                )
-        except json.JSONDecodeError:
-            continue
+def to_message_tool_calls(calls: List[ParsedToolCall]) -> List[ChatCompletionMessageToolCall]:
+    return [
+        ChatCompletionMessageToolCall(
+            id=f"call_{uuid.uuid4().hex}",
+            function=Function(name=call.name, arguments=call.arguments),
+            type='function',
+            index=index,
+        )
+        for index, call in enumerate(calls)
+    ]
 
-    return tool_calls  # 可能为空
 
+# 连续空行
+_BLANK_LINES = re.compile(r'(\n\s*){2,}')
 
 
 class TokenCounter:
@@ -416,6 +400,31 @@ class LLM:
 
         return formatted_messages
 
+    async def _create_completion(self, params: dict) -> ChatCompletion:
+        """
+        Send a non-streaming completion request.
+
+        With ``[cache] llm_responses`` enabled, completions are served from the
+        shared cache when the same request (model, messages, tools and sampling
+        parameters) was answered before, by this or another server worker.
+        """
+        cache = get_cache() if config.cache_config.llm_responses else None
+        if cache is None:
+            async with llm_calls:
+                return await self.client.chat.completions.create(**params, stream=False)
+
+        key = cache_key({k: v for k, v in params.items() if k != "timeout"})
+        cached = await cache.aget("llm", key)
+        if cached is not None:
+            logger.info("Using cached LLM response")
+            return ChatCompletion.model_validate(cached)
+
+        async with llm_calls:
+            response = await self.client.chat.completions.create(**params, stream=False)
+        if response.choices and response.choices[0].message:
+            await cache.aput("llm", key, response.model_dump(mode="json"))
+        return response
+
     @retry(
         wait=wait_random_exponential(min=1, max=60),
         stop=stop_after_attempt(6),
@@ -483,9 +492,7 @@ class LLM:
 
             if not stream:
                 # Non-streaming request
-                response = await self.client.chat.completions.create(
-                    **params, stream=False
-                )
+                response = await self._create_completion(params)
 
                 if not response.choices or not response.choices[0].message.content:
                     raise ValueError("Empty or invalid response from LLM")
@@ -500,15 +507,16 @@ class LLM:
             # Streaming request, For streaming, update estimated token count before making the request
             self.update_token_count(input_tokens)
 
-            response = await self.client.chat.completions.create(**params, stream=True)
-
             collected_messages = []
             completion_text = ""
-            async for chunk in response:
-                chunk_message = chunk.choices[0].delta.content or ""
-                collected_messages.append(chunk_message)
-                completion_text += chunk_message
-                print(chunk_message, end="", flush=True)
+            # The slot is held until the whole stream has been read
+            async with llm_calls:
+                response = await self.client.chat.completions.create(**params, stream=True)
+                async for chunk in response:
+                    chunk_message = chunk.choices[0].delta.content or ""
+                    collected_messages.append(chunk_message)
+                    completion_text += chunk_message
+                    print(chunk_message, end="", flush=True)
 
             print()  # Newline after streaming
             full_response = "".join(collected_messages).strip()
@@ -653,7 +661,8 @@ class LLM:
 
             # Handle non-streaming request
             if not stream:
-                response = await self.client.chat.completions.create(**params)
+                async with llm_calls:
+                    response = await self.client.chat.completions.create(**params)
 
                 if not response.choices or not response.choices[0].message.content:
                     raise ValueError("Empty or invalid response from LLM")
@@ -663,13 +672,13 @@ class LLM:
 
             # Handle streaming request
             self.update_token_count(input_tokens)
-            response = await self.client.chat.completions.create(**params)
-
             collected_messages = []
-            async for chunk in response:
-                chunk_message = chunk.choices[0].delta.content or ""
-                collected_messages.append(chunk_message)
-                print(chunk_message, end="", flush=True)
+            async with llm_calls:
+                response = await self.client.chat.completions.create(**params)
+                async for chunk in response:
+                    chunk_message = chunk.choices[0].delta.content or ""
+                    collected_messages.append(chunk_message)
+                    print(chunk_message, end="", flush=True)
 
             print()  # Newline after streaming
             full_response = "".join(collected_messages).strip()
@@ -795,9 +804,7 @@ class LLM:
                     temperature if temperature is not None else self.temperature
                 )
 
-            response = await self.client.chat.completions.create(
-                **params, stream=False
-            )
+            response = await self._create_completion(params)
 
             # Check if response is valid
             if not response.choices or not response.choices[0].message:
@@ -810,67 +817,22 @@ class LLM:
                 response.usage.prompt_tokens, response.usage.completion_tokens
             )
 
-            content = response.choices[0].message.content
-            tool_calls = (
-                response.choices[0].message.tool_calls
-                if response and response.choices[0].message.tool_calls
-                else extract_tool_calls(content) # 加了验证机制，如果tool_calls以json的格式出现在 content 中，则提取出来，否则返回[]空列表
-            )
-            response.choices[0].message.tool_calls = tool_calls # 把正确的格式的tool_calls赋值给response.choices[0].message.tool_calls
-
-            # 增加备用解析逻辑，并确保将解析结果转换为标准ChatCompletionMessageToolCall对象
+            message = response.choices[0].message
+            content = message.content
+            tool_calls = message.tool_calls or []
             if not tool_calls:
-                all_tool_calls = []
-
-                # 定义用于查找和移除的正则表达式模式
-                # 这个模式会匹配整个markdown代码块
-                pattern = r"```json\s*([\s\S]*?)\s*```"
-
-                # 步骤 1: 使用 re.findall 提取所有 JSON 字符串
-                # 因为模式中有捕获组 `(...)`，findall只返回捕获组内的内容
-                found_json_strings = re.findall(pattern, content)
-
-                if found_json_strings:
-                    logger.info(f"Found {len(found_json_strings)} JSON block(s) to parse.")
-
-                    for json_str in found_json_strings:
-                        try:
-                            parsed_json = json.loads(json_str.strip())
-                            items = [parsed_json] if isinstance(parsed_json, dict) else parsed_json
-
-                            for item in items:
-                                # 验证解析出的字典是否符合工具调用的基本结构
-                                if not (isinstance(item, dict) and 'function' in item and 'parameters' in item):
-                                    logger.warning(f"Skipping malformed tool call item from JSON block: {item}")
-                                    continue
-
-                                # 将字典转换为 ChatCompletionMessageToolCall 对象
-                                new_tool_call_obj = ChatCompletionMessageToolCall(
-                                    id=f"call_{uuid.uuid4().hex}",
-                                    function=Function(
-                                        name=item['function'],
-                                        # 确保 `arguments` 是一个 JSON 字符串
-                                        arguments=json.dumps(item.get('parameters', {}), ensure_ascii=False)
-                                    ),
-                                    type='function',
-                                    index=len(all_tool_calls)
-                                )
-                                all_tool_calls.append(new_tool_call_obj)
-                        except json.JSONDecodeError as e:
-                            logger.warning(f"Failed to decode JSON from block. Error: {e}")
-
-                    # 如果成功解析出工具调用，则更新 tool_calls 列表
-                    if all_tool_calls:
-                        tool_calls = all_tool_calls
-                        # 从原始 content 中移除 JSON 代码块，避免重复显示
-                        content = re.sub(pattern, "", content or "").strip()
-                        response.choices[0].message.content = content
-                        response.choices[0].message.tool_calls = tool_calls
-                        # 清理可能留下的多余空行
-                        content = re.sub(r'(\n\s*){2,}', '\n', content).strip()
-                else:
-                    print("No '```json ... ```' blocks found in content.")
-
+                # 模型把工具调用写在了 content 中（```json 代码块、裸 JSON 或 <tool_call> 标签），
+                # 一次扫描提取出来并转换为标准ChatCompletionMessageToolCall对象
+                parsed = parse_tool_calls(content)
+                if parsed.calls:
+                    logger.info(f"Parsed {len(parsed.calls)} tool call(s) from content.")
+                    tool_calls = to_message_tool_calls(parsed.calls)
+                    # 从原始 content 中移除工具调用，避免重复显示
+                    content = parsed.content
+                    message.content = content
+                    # 清理可能留下的多余空行
+                    content = _BLANK_LINES.sub('\n', content).strip()
+            message.tool_calls = tool_calls # 把正确的格式的tool_calls赋值给response.choices[0].message.tool_calls
 
             if len(tool_calls) > 1:
                new_tool_calls = []
@@ -891,7 +853,7 @@ class LLM:
             # print("==train_data start===")
 
             messages.append(assistant_msg)
-            logger.info("train_data:" + json.dumps(messages, ensure_ascii=False) + "\n")
+            logger.info("train_data:" + codec.dumps(messages) + "\n")
             # print("==train_data end===")
 
             return response.choices[0].message
@@ -7,12 +7,12 @@ logging.basicConfig(level=logging.INFO, handlers=[logging.StreamHandler(sys.stde
 import argparse
 import asyncio
 import atexit
-import json
 from inspect import Parameter, Signature
 from typing import Any, Dict, Optional
 
 from mcp.server.fastmcp import FastMCP
 
+from app import codec
 from app.logger import logger
 from app.tool.base import BaseTool
 from app.tool.bash import Bash
@@ -49,9 +49,9 @@ class MCPServer:
 
             # Handle different types of results (match original logic)
             if hasattr(result, "model_dump"):
-                return json.dumps(result.model_dump())
+                return codec.dumps(result.model_dump())
             elif isinstance(result, dict):
-                return json.dumps(result)
+                return codec.dumps(result)
             return result
 
         # Set method metadata
@@ -4,6 +4,7 @@ Docker Sandbox Module
 Provides secure containerized execution environment with resource limits
 and isolation for running untrusted code.
 """
+from app.lazy import lazy_exports
 from app.sandbox.client import (
     BaseSandboxClient,
     LocalSandboxClient,
@@ -14,13 +15,22 @@ from app.sandbox.core.exceptions import (
     SandboxResourceError,
     SandboxTimeoutError,
 )
-from app.sandbox.core.manager import SandboxManager
-from app.sandbox.core.sandbox import DockerSandbox
 
 
+# These import the docker SDK
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "DockerSandbox": "app.sandbox.core.sandbox",
+        "SandboxManager": "app.sandbox.core.manager",
+        "SandboxPool": "app.sandbox.core.pool",
+    },
+)
+
 __all__ = [
     "DockerSandbox",
     "SandboxManager",
+    "SandboxPool",
     "BaseSandboxClient",
     "LocalSandboxClient",
     "create_sandbox_client",
@@ -1,8 +1,13 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Optional, Protocol
+from typing import TYPE_CHECKING, Dict, List, Optional, Protocol, Tuple
 
-from app.config import SandboxSettings
-from app.sandbox.core.sandbox import DockerSandbox
+from app.config import SandboxSettings, config
+
+
+if TYPE_CHECKING:
+    # The docker SDK is imported when a sandbox is first created
+    from app.sandbox.core.pool import SandboxPool
+    from app.sandbox.core.sandbox import DockerSandbox
 
 
 class SandboxFileOperations(Protocol):
@@ -62,6 +67,12 @@ class BaseSandboxClient(ABC):
     async def run_command(self, command: str, timeout: Optional[int] = None) -> str:
         """Executes command."""
 
+    @abstractmethod
+    async def run_batch(
+        self, commands: List[str], timeout: Optional[int] = None
+    ) -> List[Tuple[int, str]]:
+        """Executes several commands in one round trip."""
+
     @abstractmethod
     async def copy_from(self, container_path: str, local_path: str) -> None:
         """Copies file from container."""
@@ -86,9 +97,14 @@ class BaseSandboxClient(ABC):
 class LocalSandboxClient(BaseSandboxClient):
     """Local sandbox client implementation."""
 
-    def __init__(self):
-        """Initializes local sandbox client."""
-        self.sandbox: Optional[DockerSandbox] = None
+    def __init__(self, pool: Optional["SandboxPool"] = None):
+        """Initializes local sandbox client.
+
+        Args:
+            pool: Optional pool of pre-warmed sandboxes to lease from.
+        """
+        self.sandbox: Optional["DockerSandbox"] = None
+        self.pool = pool
 
     async def create(
         self,
@@ -104,6 +120,12 @@ class LocalSandboxClient(BaseSandboxClient):
         Raises:
             RuntimeError: If sandbox creation fails.
         """
+        if self.pool and not volume_bindings:
+            self.sandbox = await self.pool.acquire(config)
+            return
+
+        from app.sandbox.core.sandbox import DockerSandbox
+
         self.sandbox = DockerSandbox(config, volume_bindings)
         await self.sandbox.create()
 
@@ -124,6 +146,25 @@ class LocalSandboxClient(BaseSandboxClient):
             raise RuntimeError("Sandbox not initialized")
         return await self.sandbox.run_command(command, timeout)
 
+    async def run_batch(
+        self, commands: List[str], timeout: Optional[int] = None
+    ) -> List[Tuple[int, str]]:
+        """Runs several commands in sandbox in one round trip.
+
+        Args:
+            commands: Commands to execute.
+            timeout: Execution timeout in seconds for the whole batch.
+
+        Returns:
+            List of (exit_code, output) tuples, one per command.
+
+        Raises:
+            RuntimeError: If sandbox not initialized.
+        """
+        if not self.sandbox:
+            raise RuntimeError("Sandbox not initialized")
+        return await self.sandbox.run_batch(commands, timeout)
+
     async def copy_from(self, container_path: str, local_path: str) -> None:
         """Copies file from container to local.
 
@@ -183,19 +224,48 @@ class LocalSandboxClient(BaseSandboxClient):
         await self.sandbox.write_file(path, content)
 
     async def cleanup(self) -> None:
-        """Cleans up resources."""
+        """Cleans up resources.
+
+        A pooled sandbox is reset and returned to the pool instead of destroyed.
+        """
         if self.sandbox:
-            await self.sandbox.cleanup()
-            self.sandbox = None
+            sandbox, self.sandbox = self.sandbox, None
+            if self.pool:
+                await self.pool.release(sandbox)
+            else:
+                await sandbox.cleanup()
+
+    async def warm_up(self, config: Optional[SandboxSettings] = None) -> None:
+        """Fills the sandbox pool, if any, so first leases do not wait.
+
+        Args:
+            config: Sandbox configuration to pre-warm sandboxes for.
+        """
+        if self.pool:
+            await self.pool.warm_up(config)
+
+    async def shutdown(self) -> None:
+        """Cleans up resources and destroys all pooled sandboxes."""
+        await self.cleanup()
+        if self.pool:
+            await self.pool.shutdown()
 
 
 def create_sandbox_client() -> LocalSandboxClient:
     """Creates a sandbox client.
 
+    Uses a warm sandbox pool when ``sandbox.pool_size`` is configured.
+
     Returns:
         LocalSandboxClient: Sandbox client instance.
     """
-    return LocalSandboxClient()
+    pool_size = config.sandbox.pool_size if config.sandbox else 0
+    if pool_size <= 0:
+        return LocalSandboxClient()
+
+    from app.sandbox.core.pool import SandboxPool
+
+    return LocalSandboxClient(SandboxPool(size=pool_size))
 
 
 SANDBOX_CLIENT = create_sandbox_client()
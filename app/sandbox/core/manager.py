@@ -1,13 +1,14 @@
 import asyncio
 import uuid
 from contextlib import asynccontextmanager
-from typing import Dict, Optional, Set
+from typing import Dict, List, Optional, Set, Tuple
 
 import docker
 from docker.errors import APIError, ImageNotFound
 
 from app.config import SandboxSettings
 from app.logger import logger
+from app.sandbox.core.pool import SandboxPool
 from app.sandbox.core.sandbox import DockerSandbox
 
 
@@ -22,6 +23,7 @@ class SandboxManager:
         max_sandboxes: Maximum allowed number of sandboxes.
         idle_timeout: Sandbox idle timeout in seconds.
         cleanup_interval: Cleanup check interval in seconds.
+        pool: Optional pool of pre-warmed sandboxes.
         _sandboxes: Active sandbox instance mapping.
         _last_used: Last used time record for sandboxes.
     """
@@ -31,6 +33,7 @@ class SandboxManager:
         max_sandboxes: int = 100,
         idle_timeout: int = 3600,
         cleanup_interval: int = 300,
+        pool_size: int = 0,
     ):
         """Initializes sandbox manager.
 
@@ -38,10 +41,12 @@ class SandboxManager:
             max_sandboxes: Maximum sandbox count limit.
             idle_timeout: Idle timeout in seconds.
             cleanup_interval: Cleanup check interval in seconds.
+            pool_size: Ready sandboxes kept warm per configuration, 0 disables pooling.
         """
         self.max_sandboxes = max_sandboxes
         self.idle_timeout = idle_timeout
         self.cleanup_interval = cleanup_interval
+        self.pool = SandboxPool(size=pool_size) if pool_size > 0 else None
 
         # Docker client
         self._client = docker.from_env()
@@ -140,8 +145,11 @@ class SandboxManager:
 
             sandbox_id = str(uuid.uuid4())
             try:
-                sandbox = DockerSandbox(config, volume_bindings)
-                await sandbox.create()
+                if self.pool and not volume_bindings:
+                    sandbox = await self.pool.acquire(config)
+                else:
+                    sandbox = DockerSandbox(config, volume_bindings)
+                    await sandbox.create()
 
                 self._sandboxes[sandbox_id] = sandbox
                 self._last_used[sandbox_id] = asyncio.get_event_loop().time()
@@ -171,6 +179,25 @@ class SandboxManager:
         async with self.sandbox_operation(sandbox_id) as sandbox:
             return sandbox
 
+    async def run_batch(
+        self, sandbox_id: str, commands: List[str], timeout: Optional[int] = None
+    ) -> List[Tuple[int, str]]:
+        """Runs several commands in a sandbox under a single lock acquisition.
+
+        Args:
+            sandbox_id: Sandbox ID.
+            commands: Commands to execute.
+            timeout: Timeout in seconds for the whole batch.
+
+        Returns:
+            List of (exit_code, output) tuples, one per command.
+
+        Raises:
+            KeyError: If sandbox does not exist.
+        """
+        async with self.sandbox_operation(sandbox_id) as sandbox:
+            return await sandbox.run_batch(commands, timeout)
+
     def start_cleanup_task(self) -> None:
         """Starts automatic cleanup task."""
 
@@ -233,6 +260,9 @@ class SandboxManager:
             except asyncio.TimeoutError:
                 logger.error("Sandbox cleanup timed out")
 
+        if self.pool:
+            await self.pool.shutdown()
+
         # Clean up remaining references
         self._sandboxes.clear()
         self._last_used.clear()
@@ -264,7 +294,10 @@ class SandboxManager:
             # Get reference to sandbox object
             sandbox = self._sandboxes.get(sandbox_id)
             if sandbox:
-                await sandbox.cleanup()
+                if self.pool and not self._is_shutting_down:
+                    await self.pool.release(sandbox)
+                else:
+                    await sandbox.cleanup()
 
                 # Remove sandbox record from manager
                 async with self._global_lock:
@@ -310,4 +343,5 @@ class SandboxManager:
             "idle_timeout": self.idle_timeout,
             "cleanup_interval": self.cleanup_interval,
             "is_shutting_down": self._is_shutting_down,
+            "pool": self.pool.get_stats() if self.pool else None,
         }
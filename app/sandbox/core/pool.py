@@ -0,0 +1,238 @@
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
+from app.config import SandboxSettings
+from app.logger import logger
+from app.sandbox.core.sandbox import DockerSandbox
+
+
+PoolKey = Tuple[str, str, str, float, bool]
+
+
+class SandboxPool:
+    """Pool of pre-warmed Docker sandboxes.
+
+    Keeps ``size`` started sandboxes with initialized terminals per distinct
+    container configuration, leased ones included: released sandboxes are
+    reset (work directory wipe plus fresh shell) and put back instead of
+    destroyed, and the pool is only topped up in the background when a
+    sandbox is retired or more are leased than ``size``.
+
+    Only sandboxes without custom volume bindings are pooled, since bindings
+    are fixed when a container is created.
+
+    Attributes:
+        size: Number of sandboxes, ready or leased, kept per configuration.
+        max_leases: Leases served before a sandbox is destroyed, not reset.
+        _ready: Ready sandboxes per configuration key.
+        _leased: Number of sandboxes currently leased per configuration key.
+        _leases: Number of leases served by each sandbox.
+    """
+
+    def __init__(self, size: int = 2, max_leases: int = 50):
+        """Initializes the sandbox pool.
+
+        Args:
+            size: Number of sandboxes, ready or leased, kept per configuration.
+            max_leases: Leases served before a sandbox is replaced.
+        """
+        self.size = size
+        self.max_leases = max_leases
+
+        self._ready: Dict[PoolKey, List[DockerSandbox]] = {}
+        self._leased: Dict[PoolKey, int] = {}
+        self._leases: Dict[int, int] = {}
+        self._replenish_tasks: Dict[PoolKey, asyncio.Task] = {}
+        self._is_shutting_down = False
+
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "created": 0,
+            "resets": 0,
+            "reset_failures": 0,
+            "destroyed": 0,
+        }
+
+    @staticmethod
+    def _key(config: SandboxSettings) -> PoolKey:
+        return (
+            config.image,
+            config.work_dir,
+            config.memory_limit,
+            config.cpu_limit,
+            config.network_enabled,
+        )
+
+    async def acquire(self, config: Optional[SandboxSettings] = None) -> DockerSandbox:
+        """Leases a ready sandbox, creating one if the pool is empty.
+
+        Args:
+            config: Sandbox configuration.
+
+        Returns:
+            DockerSandbox: A started sandbox with an initialized terminal.
+
+        Raises:
+            RuntimeError: If the pool is shut down or creation fails.
+        """
+        if self._is_shutting_down:
+            raise RuntimeError("Sandbox pool is shutting down")
+
+        config = config or SandboxSettings()
+        key = self._key(config)
+        ready = self._ready.setdefault(key, [])
+        sandbox = ready.pop() if ready else None
+        # Counted before any await so a concurrent refill does not replace it
+        self._leased[key] = self._leased.get(key, 0) + 1
+
+        if sandbox is not None:
+            self._stats["hits"] += 1
+            return sandbox
+
+        self._stats["misses"] += 1
+        try:
+            return await self._create(config)
+        except BaseException:
+            self._leased[key] -= 1
+            raise
+
+    async def release(self, sandbox: DockerSandbox) -> None:
+        """Returns a leased sandbox to the pool or destroys it.
+
+        Args:
+            sandbox: Sandbox previously returned by ``acquire``.
+        """
+        key = self._key(sandbox.config)
+        ready = self._ready.setdefault(key, [])
+        leases = self._leases.get(id(sandbox), 0) + 1
+        # Stays counted as leased until it is back in ``ready`` or destroyed,
+        # so a refill running meanwhile does not create a replacement
+        others = len(ready) + self._leased.get(key, 0) - 1
+
+        if (
+            self._is_shutting_down
+            or sandbox.volume_bindings
+            or not sandbox.container
+            or others >= self.size
+            or leases >= self.max_leases
+        ):
+            await self._retire(key, sandbox)
+            return
+
+        try:
+            await sandbox.reset()
+        except Exception as e:
+            logger.warning(f"Failed to reset pooled sandbox: {e}")
+            self._stats["reset_failures"] += 1
+            await self._retire(key, sandbox)
+            return
+
+        self._stats["resets"] += 1
+        self._leases[id(sandbox)] = leases
+        self._leased[key] -= 1
+        ready.append(sandbox)
+
+    async def _retire(self, key: PoolKey, sandbox: DockerSandbox) -> None:
+        """Destroys a released sandbox and refills the pool if it falls short."""
+        self._leased[key] = max(0, self._leased.get(key, 0) - 1)
+        try:
+            await self._destroy(sandbox)
+        finally:
+            self._schedule_replenish(key, sandbox.config)
+
+    async def warm_up(self, config: Optional[SandboxSettings] = None) -> None:
+        """Fills the pool for a configuration and waits until it is ready.
+
+        Args:
+            config: Sandbox configuration.
+        """
+        config = config or SandboxSettings()
+        key = self._key(config)
+        self._ready.setdefault(key, [])
+        task = self._schedule_replenish(key, config)
+        if task:
+            await task
+
+    def _schedule_replenish(
+        self, key: PoolKey, config: SandboxSettings
+    ) -> Optional[asyncio.Task]:
+        """Starts a background refill task unless one is already running."""
+        if self._is_shutting_down:
+            return None
+
+        task = self._replenish_tasks.get(key)
+        if task is None or task.done():
+            task = asyncio.create_task(self._replenish(key, config))
+            self._replenish_tasks[key] = task
+        return task
+
+    async def _replenish(self, key: PoolKey, config: SandboxSettings) -> None:
+        ready = self._ready[key]
+        while (
+            not self._is_shutting_down
+            and len(ready) + self._leased.get(key, 0) < self.size
+        ):
+            try:
+                sandbox = await self._create(config)
+            except Exception as e:
+                logger.error(f"Failed to replenish sandbox pool: {e}")
+                return
+
+            if self._is_shutting_down:
+                await self._destroy(sandbox)
+                return
+            ready.append(sandbox)
+
+    async def _create(self, config: SandboxSettings) -> DockerSandbox:
+        sandbox = DockerSandbox(config)
+        await sandbox.create()
+        self._stats["created"] += 1
+        return sandbox
+
+    async def _destroy(self, sandbox: DockerSandbox) -> None:
+        self._leases.pop(id(sandbox), None)
+        try:
+            await sandbox.cleanup()
+        finally:
+            self._stats["destroyed"] += 1
+
+    async def shutdown(self) -> None:
+        """Stops replenishment and destroys all ready sandboxes."""
+        self._is_shutting_down = True
+
+        tasks = [task for task in self._replenish_tasks.values() if not task.done()]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._replenish_tasks.clear()
+
+        sandboxes = [sandbox for ready in self._ready.values() for sandbox in ready]
+        self._ready.clear()
+        if sandboxes:
+            await asyncio.gather(
+                *(self._destroy(sandbox) for sandbox in sandboxes),
+                return_exceptions=True,
+            )
+
+    def get_stats(self) -> Dict:
+        """Gets pool statistics.
+
+        Returns:
+            Dict: Statistics information.
+        """
+        ready_by_image: Dict[str, int] = {}
+        for key, ready in self._ready.items():
+            ready_by_image[key[0]] = ready_by_image.get(key[0], 0) + len(ready)
+
+        return {
+            "size": self.size,
+            "ready": sum(ready_by_image.values()),
+            "ready_by_image": ready_by_image,
+            "leased": sum(self._leased.values()),
+            "replenishing": sum(
+                1 for task in self._replenish_tasks.values() if not task.done()
+            ),
+            **self._stats,
+        }
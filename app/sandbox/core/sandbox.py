@@ -1,10 +1,10 @@
 import asyncio
-import io
+import base64
 import os
-import tarfile
 import tempfile
 import uuid
-from typing import Dict, Optional
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 
 import docker
 from docker.errors import NotFound
@@ -13,6 +13,12 @@ from docker.models.containers import Container
 from app.config import SandboxSettings
 from app.sandbox.core.exceptions import SandboxTimeoutError
 from app.sandbox.core.terminal import AsyncDockerizedTerminal
+from app.sandbox.core.transfer import (
+    CHUNK_SIZE,
+    extract_tar_stream,
+    read_tar_member,
+    write_tar_stream,
+)
 
 
 class DockerSandbox:
@@ -29,6 +35,9 @@ class DockerSandbox:
         terminal: Container terminal interface.
     """
 
+    # Files up to this size go through a single exec instead of a tar archive
+    SMALL_FILE_THRESHOLD = 64 * 1024
+
     def __init__(
         self,
         config: Optional[SandboxSettings] = None,
@@ -88,13 +97,7 @@ class DockerSandbox:
             await asyncio.to_thread(self.container.start)
 
             # Initialize terminal
-            self.terminal = AsyncDockerizedTerminal(
-                container["Id"],
-                self.config.work_dir,
-                env_vars={"PYTHONUNBUFFERED": "1"}
-                # Ensure Python output is not buffered
-            )
-            await self.terminal.init()
+            await self._init_terminal()
 
             return self
 
@@ -102,6 +105,43 @@ class DockerSandbox:
             await self.cleanup()  # Ensure resources are cleaned up
             raise RuntimeError(f"Failed to create sandbox: {e}") from e
 
+    async def _init_terminal(self) -> None:
+        """Opens a fresh interactive terminal session in the container."""
+        self.terminal = AsyncDockerizedTerminal(
+            self.container,
+            self.config.work_dir,
+            env_vars={"PYTHONUNBUFFERED": "1"}
+            # Ensure Python output is not buffered
+        )
+        await self.terminal.init()
+
+    async def reset(self) -> None:
+        """Restores the sandbox to a clean state for reuse.
+
+        Wipes the working directory and replaces the terminal session, which
+        is much cheaper than destroying and recreating the container.
+
+        Raises:
+            RuntimeError: If sandbox not initialized or the reset fails.
+        """
+        if not self.container:
+            raise RuntimeError("Sandbox not initialized")
+
+        if self.terminal:
+            await self.terminal.close()
+            self.terminal = None
+
+        result = await asyncio.to_thread(
+            self.container.exec_run,
+            ["find", self.config.work_dir, "-mindepth", "1", "-delete"],
+        )
+        if result.exit_code != 0:
+            raise RuntimeError(
+                f"Failed to wipe working directory: {result.output.decode('utf-8', 'replace')}"
+            )
+
+        await self._init_terminal()
+
     def _prepare_volume_bindings(self) -> Dict[str, Dict[str, str]]:
         """Prepares volume binding configuration.
 
@@ -163,9 +203,40 @@ class DockerSandbox:
                 f"Command execution timed out after {timeout or self.config.timeout} seconds"
             )
 
+    async def run_batch(
+        self, cmds: List[str], timeout: Optional[int] = None
+    ) -> List[Tuple[int, str]]:
+        """Runs several commands in the sandbox in one terminal round trip.
+
+        Args:
+            cmds: Commands to execute.
+            timeout: Timeout in seconds for the whole batch.
+
+        Returns:
+            List of (exit_code, output) tuples, one per command.
+
+        Raises:
+            RuntimeError: If sandbox not initialized or command execution fails.
+            SandboxTimeoutError: If the batch times out.
+        """
+        if not self.terminal:
+            raise RuntimeError("Sandbox not initialized")
+
+        try:
+            return await self.terminal.run_batch(
+                cmds, timeout=timeout or self.config.timeout
+            )
+        except TimeoutError:
+            raise SandboxTimeoutError(
+                f"Command execution timed out after {timeout or self.config.timeout} seconds"
+            )
+
     async def read_file(self, path: str) -> str:
         """Reads a file from the container.
 
+        Small files are read with a single exec; larger ones are streamed
+        out of a tar archive.
+
         Args:
             path: File path.
 
@@ -180,17 +251,13 @@ class DockerSandbox:
             raise RuntimeError("Sandbox not initialized")
 
         try:
-            # Get file archive
             resolved_path = self._safe_resolve_path(path)
-            tar_stream, _ = await asyncio.to_thread(
-                self.container.get_archive, resolved_path
-            )
-
-            # Read file content from tar stream
-            content = await self._read_from_tar(tar_stream)
+            content = await self._read_small_file(resolved_path)
+            if content is None:
+                content = await self._read_large_file(resolved_path)
             return content.decode("utf-8")
 
-        except NotFound:
+        except (NotFound, FileNotFoundError):
             raise FileNotFoundError(f"File not found: {path}")
         except Exception as e:
             raise RuntimeError(f"Failed to read file: {e}")
@@ -198,6 +265,9 @@ class DockerSandbox:
     async def write_file(self, path: str, content: str) -> None:
         """Writes content to a file in the container.
 
+        Small files are written with a single exec; larger ones are streamed
+        in as a tar archive.
+
         Args:
             path: Target path.
             content: File content.
@@ -210,24 +280,116 @@ class DockerSandbox:
 
         try:
             resolved_path = self._safe_resolve_path(path)
-            parent_dir = os.path.dirname(resolved_path)
+            data = content.encode("utf-8")
+            if len(data) <= self.SMALL_FILE_THRESHOLD:
+                await self._write_small_file(resolved_path, data)
+            else:
+                await self._put_tar_stream(resolved_path, content=data)
 
-            # Create parent directory
-            if parent_dir:
-                await self.run_command(f"mkdir -p {parent_dir}")
+        except Exception as e:
+            raise RuntimeError(f"Failed to write file: {e}")
 
-            # Prepare file data
-            tar_stream = await self._create_tar_stream(
-                os.path.basename(path), content.encode("utf-8")
-            )
+    async def _exec(self, cmd: List[str]) -> Tuple[int, bytes, bytes]:
+        """Runs a one-off command outside the terminal session.
 
-            # Write file
-            await asyncio.to_thread(
-                self.container.put_archive, parent_dir or "/", tar_stream
-            )
+        Returns:
+            Tuple of (exit_code, stdout, stderr).
+        """
+        result = await asyncio.to_thread(self.container.exec_run, cmd, demux=True)
+        stdout, stderr = result.output
+        return result.exit_code, stdout or b"", stderr or b""
 
-        except Exception as e:
-            raise RuntimeError(f"Failed to write file: {e}")
+    async def _read_small_file(self, resolved_path: str) -> Optional[bytes]:
+        """Reads a file with ``cat`` if it is within the small-file threshold.
+
+        Returns:
+            File content, or None if the file is too large for this path.
+
+        Raises:
+            FileNotFoundError: If file does not exist.
+            RuntimeError: If the read fails.
+        """
+        exit_code, stdout, stderr = await self._exec(
+            [
+                "sh",
+                "-c",
+                '[ -e "$1" ] || exit 2; '
+                '[ "$(stat -c %s "$1")" -le "$2" ] || exit 3; '
+                'exec cat "$1"',
+                "sh",
+                resolved_path,
+                str(self.SMALL_FILE_THRESHOLD),
+            ]
+        )
+        if exit_code == 0:
+            return stdout
+        if exit_code == 2:
+            raise FileNotFoundError(resolved_path)
+        if exit_code == 3:
+            return None
+        raise RuntimeError(stderr.decode("utf-8", errors="replace").strip())
+
+    async def _write_small_file(self, resolved_path: str, data: bytes) -> None:
+        """Writes a small file with a single base64-decoding exec."""
+        exit_code, _, stderr = await self._exec(
+            [
+                "sh",
+                "-c",
+                'mkdir -p "$(dirname "$1")" && printf %s "$2" | base64 -d > "$1"',
+                "sh",
+                resolved_path,
+                base64.b64encode(data).decode("ascii"),
+            ]
+        )
+        if exit_code != 0:
+            raise RuntimeError(stderr.decode("utf-8", errors="replace").strip())
+
+    async def _read_large_file(self, resolved_path: str) -> bytes:
+        """Reads a file by streaming it out of a tar archive."""
+        stream, _ = await asyncio.to_thread(
+            self.container.get_archive, resolved_path, CHUNK_SIZE
+        )
+        return await asyncio.to_thread(read_tar_member, stream)
+
+    async def _put_tar_stream(
+        self,
+        resolved_path: str,
+        src_path: Optional[str] = None,
+        content: Optional[bytes] = None,
+    ) -> None:
+        """Streams a tar archive into the container.
+
+        The archive is generated into a pipe by one worker thread while
+        docker-py uploads from the other end in another. Entries are rooted
+        at ``/`` so missing parent directories are created by extraction.
+
+        Args:
+            resolved_path: Absolute destination path in the container.
+            src_path: Host file or directory to upload.
+            content: In-memory file content to upload instead of src_path.
+        """
+        read_fd, write_fd = os.pipe()
+        reader = os.fdopen(read_fd, "rb")
+        writer = os.fdopen(write_fd, "wb")
+
+        def produce() -> None:
+            try:
+                with writer:
+                    write_tar_stream(
+                        writer, resolved_path.lstrip("/"), src_path, content
+                    )
+            except BrokenPipeError:
+                pass  # The upload failed and closed the reading end
+
+        def upload() -> bool:
+            with reader:
+                return self.container.put_archive("/", reader)
+
+        _, uploaded = await asyncio.gather(
+            asyncio.to_thread(produce), asyncio.to_thread(upload)
+        )
+        if not uploaded:
+            raise RuntimeError(f"Failed to upload archive to {resolved_path}")
 
     def _safe_resolve_path(self, path: str) -> str:
         """Safely resolves container path, preventing path traversal.
@@ -269,45 +431,21 @@ class DockerSandbox:
             if parent_dir:
                 os.makedirs(parent_dir, exist_ok=True)
 
-            # Get file stream
             resolved_src = self._safe_resolve_path(src_path)
-            stream, stat = await asyncio.to_thread(
-                self.container.get_archive, resolved_src
+
+            # Small single files skip the tar round trip
+            if not os.path.isdir(dst_path):
+                content = await self._read_small_file(resolved_src)
+                if content is not None:
+                    await asyncio.to_thread(Path(dst_path).write_bytes, content)
+                    return
+
+            stream, _ = await asyncio.to_thread(
+                self.container.get_archive, resolved_src, CHUNK_SIZE
             )
+            await asyncio.to_thread(extract_tar_stream, stream, src_path, dst_path)
 
-            # Create temporary directory to extract file
-            with tempfile.TemporaryDirectory() as tmp_dir:
-                # Write stream to temporary file
-                tar_path = os.path.join(tmp_dir, "temp.tar")
-                with open(tar_path, "wb") as f:
-                    for chunk in stream:
-                        f.write(chunk)
-
-                # Extract file
-                with tarfile.open(tar_path) as tar:
-                    members = tar.getmembers()
-                    if not members:
-                        raise FileNotFoundError(f"Source file is empty: {src_path}")
-
-                    # If destination is a directory, we should preserve relative path structure
-                    if os.path.isdir(dst_path):
-                        tar.extractall(dst_path)
-                    else:
-                        # If destination is a file, we only extract the source file's content
-                        if len(members) > 1:
-                            raise RuntimeError(
-                                f"Source path is a directory but destination is a file: {src_path}"
-                            )
-
-                        with open(dst_path, "wb") as dst:
-                            src_file = tar.extractfile(members[0])
-                            if src_file is None:
-                                raise RuntimeError(
-                                    f"Failed to extract file: {src_path}"
-                                )
-                            dst.write(src_file.read())
-
-        except docker.errors.NotFound:
+        except (docker.errors.NotFound, FileNotFoundError):
             raise FileNotFoundError(f"Source file not found: {src_path}")
         except Exception as e:
             raise RuntimeError(f"Failed to copy file: {e}")
@@ -327,100 +465,22 @@ class DockerSandbox:
             if not os.path.exists(src_path):
                 raise FileNotFoundError(f"Source file not found: {src_path}")
 
-            # Create destination directory in container
             resolved_dst = self._safe_resolve_path(dst_path)
-            container_dir = os.path.dirname(resolved_dst)
-            if container_dir:
-                await self.run_command(f"mkdir -p {container_dir}")
-
-            # Create tar file to upload
-            with tempfile.TemporaryDirectory() as tmp_dir:
-                tar_path = os.path.join(tmp_dir, "temp.tar")
-                with tarfile.open(tar_path, "w") as tar:
-                    # Handle directory source path
-                    if os.path.isdir(src_path):
-                        os.path.basename(src_path.rstrip("/"))
-                        for root, _, files in os.walk(src_path):
-                            for file in files:
-                                file_path = os.path.join(root, file)
-                                arcname = os.path.join(
-                                    os.path.basename(dst_path),
-                                    os.path.relpath(file_path, src_path),
-                                )
-                                tar.add(file_path, arcname=arcname)
-                    else:
-                        # Add single file to tar
-                        tar.add(src_path, arcname=os.path.basename(dst_path))
-
-                # Read tar file content
-                with open(tar_path, "rb") as f:
-                    data = f.read()
-
-                # Upload to container
-                await asyncio.to_thread(
-                    self.container.put_archive,
-                    os.path.dirname(resolved_dst) or "/",
-                    data,
-                )
-
-                # Verify file was created successfully
-                try:
-                    await self.run_command(f"test -e {resolved_dst}")
-                except Exception:
-                    raise RuntimeError(f"Failed to verify file creation: {dst_path}")
+
+            if (
+                os.path.isfile(src_path)
+                and os.path.getsize(src_path) <= self.SMALL_FILE_THRESHOLD
+            ):
+                data = await asyncio.to_thread(Path(src_path).read_bytes)
+                await self._write_small_file(resolved_dst, data)
+            else:
+                await self._put_tar_stream(resolved_dst, src_path=src_path)
 
         except FileNotFoundError:
             raise
         except Exception as e:
             raise RuntimeError(f"Failed to copy file: {e}")
 
-    @staticmethod
-    async def _create_tar_stream(name: str, content: bytes) -> io.BytesIO:
-        """Creates a tar file stream.
-
-        Args:
-            name: Filename.
-            content: File content.
-
-        Returns:
-            Tar file stream.
-        """
-        tar_stream = io.BytesIO()
-        with tarfile.open(fileobj=tar_stream, mode="w") as tar:
-            tarinfo = tarfile.TarInfo(name=name)
-            tarinfo.size = len(content)
-            tar.addfile(tarinfo, io.BytesIO(content))
-        tar_stream.seek(0)
-        return tar_stream
-
-    @staticmethod
-    async def _read_from_tar(tar_stream) -> bytes:
-        """Reads file content from a tar stream.
-
-        Args:
-            tar_stream: Tar file stream.
-
-        Returns:
-            File content.
-
-        Raises:
-            RuntimeError: If read operation fails.
-        """
-        with tempfile.NamedTemporaryFile() as tmp:
-            for chunk in tar_stream:
-                tmp.write(chunk)
-            tmp.seek(0)
-
-            with tarfile.open(fileobj=tmp) as tar:
-                member = tar.next()
-                if not member:
-                    raise RuntimeError("Empty tar archive")
-
-                file_content = tar.extractfile(member)
-                if not file_content:
-                    raise RuntimeError("Failed to extract file content")
-
-                return file_content.read()
 
     async def cleanup(self) -> None:
         """Cleans up sandbox resources."""
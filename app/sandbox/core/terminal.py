@@ -6,9 +6,11 @@ allowing interactive command execution with timeout control.
 """
 
 import asyncio
+import codecs
 import re
 import socket
-from typing import Dict, Optional, Tuple, Union
+import uuid
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
 
 import docker
 from docker import APIClient
@@ -17,6 +19,18 @@ from docker.models.containers import Container
 
 
 class DockerSession:
+    """Interactive bash session inside a container.
+
+    The exec socket is non-blocking and read through the event loop, so
+    waiting for output never blocks the loop or sleeps on a fixed interval.
+    Every command is followed by a unique end marker carrying its exit code,
+    which makes completion detection independent of the prompt and of the
+    command's own output.
+    """
+
+    MARKER_PREFIX = b"__OPENMANUS_DONE_"
+    READ_SIZE = 65536
+
     def __init__(self, container_id: str) -> None:
         """Initializes a Docker session.
 
@@ -27,6 +41,8 @@ class DockerSession:
         self.container_id = container_id
         self.exec_id = None
         self.socket = None
+        self.last_exit_code: Optional[int] = None
+        self._buffer = bytearray()
 
     async def create(self, working_dir: str, env_vars: Dict[str, str]) -> None:
         """Creates an interactive session with the container.
@@ -47,7 +63,8 @@ class DockerSession:
             "exec bash --norc --noprofile",
         ]
 
-        exec_data = self.api.exec_create(
+        exec_data = await asyncio.to_thread(
+            self.api.exec_create,
             self.container_id,
             startup_command,
             stdin=True,
@@ -60,17 +77,34 @@ class DockerSession:
         )
         self.exec_id = exec_data["Id"]
 
-        socket_data = self.api.exec_start(
-            self.exec_id, socket=True, tty=True, stream=True, demux=True
+        socket_data = await asyncio.to_thread(
+            self.api.exec_start,
+            self.exec_id,
+            socket=True,
+            tty=True,
+            stream=True,
+            demux=True,
         )
 
         if hasattr(socket_data, "_sock"):
-            self.socket = socket_data._sock
-            self.socket.setblocking(False)
+            await self._attach(socket_data._sock)
         else:
             raise RuntimeError("Failed to get socket connection")
 
+    async def _attach(self, sock: socket.socket) -> None:
+        """Registers the shell socket with the loop and quiets the terminal.
+
+        Terminal echo, output CR translation and prompts are turned off so
+        that everything read after a command is exactly its output followed
+        by the end marker.
+        """
+        self.socket = sock
+        self.socket.setblocking(False)
+        self._buffer.clear()
+
         await self._read_until_prompt()
+        await self._send(b"stty -echo -onlcr 2>/dev/null; PS1=''; PS2=''\n")
+        await self._sync()
 
     async def close(self) -> None:
         """Cleans up session resources.
@@ -84,8 +118,6 @@ class DockerSession:
                 # Send exit command to close bash session
                 try:
                     self.socket.sendall(b"exit\n")
-                    # Allow time for command execution
-                    await asyncio.sleep(0.1)
                 except:
                     pass  # Ignore sending errors, continue cleanup
 
@@ -97,11 +129,14 @@ class DockerSession:
 
                 self.socket.close()
                 self.socket = None
+                self._buffer.clear()
 
             if self.exec_id:
                 try:
                     # Check exec instance status
-                    exec_inspect = self.api.exec_inspect(self.exec_id)
+                    exec_inspect = await asyncio.to_thread(
+                        self.api.exec_inspect, self.exec_id
+                    )
                     if exec_inspect.get("Running", False):
                         # If still running, wait for it to complete
                         await asyncio.sleep(0.5)
@@ -114,6 +149,18 @@ class DockerSession:
             # Log error but don't raise, ensure cleanup continues
             print(f"Warning: Error during session cleanup: {e}")
 
+    async def _send(self, data: bytes) -> None:
+        await asyncio.get_running_loop().sock_sendall(self.socket, data)
+
+    async def _recv(self) -> None:
+        """Waits for the socket to become readable and appends to the buffer."""
+        chunk = await asyncio.get_running_loop().sock_recv(
+            self.socket, self.READ_SIZE
+        )
+        if not chunk:
+            raise RuntimeError("Session closed by container")
+        self._buffer += chunk
+
     async def _read_until_prompt(self) -> str:
         """Reads output until prompt is found.
 
@@ -123,28 +170,77 @@ class DockerSession:
         Raises:
             socket.error: If socket communication fails.
         """
-        buffer = b""
-        while b"$ " not in buffer:
-            try:
-                chunk = self.socket.recv(4096)
-                if chunk:
-                    buffer += chunk
-            except socket.error as e:
-                if e.errno == socket.EWOULDBLOCK:
-                    await asyncio.sleep(0.1)
-                    continue
-                raise
-        return buffer.decode("utf-8")
-
-    async def execute(self, command: str, timeout: Optional[int] = None) -> str:
-        """Executes a command and returns cleaned output.
+        while b"$ " not in self._buffer:
+            await self._recv()
+        end = self._buffer.index(b"$ ") + 2
+        output = bytes(self._buffer[:end])
+        del self._buffer[:end]
+        return output.decode("utf-8", errors="replace")
+
+    def _marker_command(self, token: str) -> bytes:
+        # The marker is split in two printf arguments so that an echoed copy
+        # of this line can never be mistaken for the marker itself.
+        prefix = self.MARKER_PREFIX.decode()
+        return f"printf '\\n%s%s:%d\\n' '{prefix}' '{token}__' \"$?\"\n".encode()
+
+    async def _sync(self) -> None:
+        """Discards pending output up to a fresh marker."""
+        async for _ in self._stream_until_marker(uuid.uuid4().hex):
+            pass
+
+    async def _stream_until_marker(
+        self, token: str, send: bool = True
+    ) -> AsyncIterator[bytes]:
+        """Sends the end marker for ``token`` and yields output until it arrives.
+
+        The exit code of the preceding command is stored in ``last_exit_code``.
+        With ``send=False`` the marker command must already have been sent.
+        """
+        marker = re.compile(
+            b"\n?" + re.escape(self.MARKER_PREFIX + token.encode() + b"__:")
+            + rb"(\d+)\r?\n"
+        )
+        if send:
+            await self._send(self._marker_command(token))
+
+        # A marker split across reads starts at the last newline; hold that back
+        marker_start = b"\n" + self.MARKER_PREFIX + token.encode() + b"__:"
+        holdback = len(marker_start) + 16
+        scan_from = 0
+        while True:
+            match = marker.search(self._buffer, max(0, scan_from - holdback))
+            if match:
+                start, end = match.span()
+                self.last_exit_code = int(match.group(1))
+                output = bytes(self._buffer[:start])
+                del self._buffer[:end]
+                if output:
+                    yield output
+                return
+
+            safe = len(self._buffer)
+            newline = self._buffer.rfind(b"\n", max(0, safe - holdback))
+            if newline != -1 and marker_start.startswith(
+                self._buffer[newline : newline + len(marker_start)]
+            ):
+                safe = newline
+            if safe > 0:
+                yield bytes(self._buffer[:safe])
+                del self._buffer[:safe]
+            scan_from = len(self._buffer)
+            await self._recv()
+
+    async def stream(
+        self, command: str, timeout: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """Executes a command and yields its output as it arrives.
 
         Args:
             command: Shell command to execute.
             timeout: Maximum execution time in seconds.
 
-        Returns:
-            Command output as string with prompt markers removed.
+        Yields:
+            Decoded output chunks; the exit code is then in ``last_exit_code``.
 
         Raises:
             RuntimeError: If session not initialized or execution fails.
@@ -153,68 +249,146 @@ class DockerSession:
         if not self.socket:
             raise RuntimeError("Session not initialized")
 
+        # Sanitize command to prevent shell injection
+        sanitized_command = self._sanitize_command(command)
+        self._buffer.clear()
+        self.last_exit_code = None
+        await self._send(f"{sanitized_command}\n".encode())
+
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        deadline = (
+            asyncio.get_running_loop().time() + timeout if timeout else None
+        )
+        chunks = self._stream_until_marker(uuid.uuid4().hex)
         try:
-            # Sanitize command to prevent shell injection
-            sanitized_command = self._sanitize_command(command)
-            full_command = f"{sanitized_command}\necho $?\n"
-            self.socket.sendall(full_command.encode())
+            while True:
+                try:
+                    if deadline is None:
+                        chunk = await chunks.__anext__()
+                    else:
+                        remaining = deadline - asyncio.get_running_loop().time()
+                        chunk = await asyncio.wait_for(
+                            chunks.__anext__(), max(remaining, 0)
+                        )
+                except StopAsyncIteration:
+                    break
+                text = decoder.decode(chunk)
+                if text:
+                    yield text.replace("\r\n", "\n")
+        except asyncio.TimeoutError:
+            await self._interrupt()
+            raise TimeoutError(f"Command execution timed out after {timeout} seconds")
+        finally:
+            await chunks.aclose()
 
-            async def read_output() -> str:
-                buffer = b""
-                result_lines = []
-                command_sent = False
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
 
-                while True:
-                    try:
-                        chunk = self.socket.recv(4096)
-                        if not chunk:
-                            break
+    async def _interrupt(self) -> None:
+        """Interrupts a timed-out command and resynchronizes the session."""
+        try:
+            await self._send(b"\x03")
+            await asyncio.wait_for(self._sync(), 5)
+        except Exception:
+            pass
+        self._buffer.clear()
 
-                        buffer += chunk
-                        lines = buffer.split(b"\n")
+    async def run(
+        self, command: str, timeout: Optional[int] = None
+    ) -> Tuple[int, str]:
+        """Executes a command and returns its exit code and output.
 
-                        buffer = lines[-1]
-                        lines = lines[:-1]
+        Args:
+            command: Shell command to execute.
+            timeout: Maximum execution time in seconds.
 
-                        for line in lines:
-                            line = line.rstrip(b"\r")
+        Returns:
+            Tuple of (exit_code, output).
 
-                            if not command_sent:
-                                command_sent = True
-                                continue
+        Raises:
+            RuntimeError: If session not initialized or execution fails.
+            TimeoutError: If command execution exceeds timeout.
+        """
+        try:
+            output = "".join([chunk async for chunk in self.stream(command, timeout)])
+        except TimeoutError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Failed to execute command: {e}")
+        return self.last_exit_code, output.strip()
 
-                            if line.strip() == b"echo $?" or line.strip().isdigit():
-                                continue
+    async def run_batch(
+        self, commands: List[str], timeout: Optional[int] = None
+    ) -> List[Tuple[int, str]]:
+        """Executes several commands in a single round trip.
 
-                            if line.strip():
-                                result_lines.append(line)
+        All commands, each followed by its own end marker, are written to the
+        shell at once and their outputs are split on the markers. Commands run
+        in order regardless of earlier failures, like lines of a script.
 
-                        if buffer.endswith(b"$ "):
-                            break
+        Args:
+            commands: Shell commands to execute.
+            timeout: Maximum execution time in seconds for the whole batch.
 
-                    except socket.error as e:
-                        if e.errno == socket.EWOULDBLOCK:
-                            await asyncio.sleep(0.1)
-                            continue
-                        raise
+        Returns:
+            List of (exit_code, output) tuples, one per command.
 
-                output = b"\n".join(result_lines).decode("utf-8")
-                output = re.sub(r"\n\$ echo \$\$?.*$", "", output)
+        Raises:
+            RuntimeError: If session not initialized or execution fails.
+            TimeoutError: If the batch exceeds timeout.
+        """
+        if not self.socket:
+            raise RuntimeError("Session not initialized")
 
-                return output
+        try:
+            tokens = [uuid.uuid4().hex for _ in commands]
+            payload = b"".join(
+                f"{self._sanitize_command(command)}\n".encode()
+                + self._marker_command(token)
+                for command, token in zip(commands, tokens)
+            )
+            self._buffer.clear()
+            await self._send(payload)
+
+            async def collect() -> List[Tuple[int, str]]:
+                results = []
+                for token in tokens:
+                    chunks = [
+                        chunk
+                        async for chunk in self._stream_until_marker(token, send=False)
+                    ]
+                    output = b"".join(chunks).decode("utf-8", errors="replace")
+                    results.append((self.last_exit_code, output.strip()))
+                return results
 
             if timeout:
-                result = await asyncio.wait_for(read_output(), timeout)
-            else:
-                result = await read_output()
-
-            return result.strip()
+                return await asyncio.wait_for(collect(), timeout)
+            return await collect()
 
         except asyncio.TimeoutError:
+            await self._interrupt()
             raise TimeoutError(f"Command execution timed out after {timeout} seconds")
         except Exception as e:
             raise RuntimeError(f"Failed to execute command: {e}")
 
+    async def execute(self, command: str, timeout: Optional[int] = None) -> str:
+        """Executes a command and returns cleaned output.
+
+        Args:
+            command: Shell command to execute.
+            timeout: Maximum execution time in seconds.
+
+        Returns:
+            Command output as string with prompt markers removed.
+
+        Raises:
+            RuntimeError: If session not initialized or execution fails.
+            TimeoutError: If command execution exceeds timeout.
+        """
+        _, output = await self.run(command, timeout)
+        return output
+
     def _sanitize_command(self, command: str) -> str:
         """Sanitizes the command string to prevent shell injection.
 
@@ -331,6 +505,52 @@ class AsyncDockerizedTerminal:
 
         return await self.session.execute(cmd, timeout=timeout or self.default_timeout)
 
+    async def run_batch(
+        self, cmds: List[str], timeout: Optional[int] = None
+    ) -> List[Tuple[int, str]]:
+        """Runs several commands in one terminal round trip.
+
+        Args:
+            cmds: Shell commands to execute.
+            timeout: Maximum execution time in seconds for the whole batch.
+
+        Returns:
+            List of (exit_code, output) tuples, one per command.
+
+        Raises:
+            RuntimeError: If terminal not initialized.
+        """
+        if not self.session:
+            raise RuntimeError("Terminal not initialized")
+
+        return await self.session.run_batch(
+            cmds, timeout=timeout or self.default_timeout
+        )
+
+    async def stream_command(
+        self, cmd: str, timeout: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """Runs a command and yields its output chunks as they arrive.
+
+        Args:
+            cmd: Shell command to execute.
+            timeout: Maximum execution time in seconds.
+
+        Yields:
+            Decoded output chunks.
+
+        Raises:
+            RuntimeError: If terminal not initialized.
+            TimeoutError: If command execution exceeds timeout.
+        """
+        if not self.session:
+            raise RuntimeError("Terminal not initialized")
+
+        async for chunk in self.session.stream(
+            cmd, timeout=timeout or self.default_timeout
+        ):
+            yield chunk
+
     async def close(self) -> None:
         """Closes the terminal session."""
         if self.session:
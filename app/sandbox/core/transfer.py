@@ -0,0 +1,127 @@
+"""Streaming tar helpers for moving files in and out of sandbox containers.
+
+Archives are produced and consumed chunk by chunk, so large transfers never
+hold a whole tarball in memory. All functions here are blocking and meant to
+be run in an executor.
+"""
+
+import io
+import os
+import shutil
+import tarfile
+from typing import BinaryIO, Iterable, Iterator, Optional
+
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class ChunkReader(io.RawIOBase):
+    """Read-only file object over an iterator of byte chunks."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks: Iterator[bytes] = iter(chunks)
+        self._pending = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            try:
+                self._pending = memoryview(next(self._chunks))
+            except StopIteration:
+                return 0
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+def open_tar_stream(chunks: Iterable[bytes]) -> tarfile.TarFile:
+    """Opens a chunk iterator as a sequential (non-seekable) tar archive."""
+    return tarfile.open(
+        fileobj=io.BufferedReader(ChunkReader(chunks), CHUNK_SIZE), mode="r|"
+    )
+
+
+def read_tar_member(chunks: Iterable[bytes]) -> bytes:
+    """Reads the content of the first file in a streamed tar archive.
+
+    Raises:
+        RuntimeError: If the archive is empty or the entry is not a file.
+    """
+    with open_tar_stream(chunks) as tar:
+        member = tar.next()
+        if not member:
+            raise RuntimeError("Empty tar archive")
+
+        file_content = tar.extractfile(member)
+        if not file_content:
+            raise RuntimeError("Failed to extract file content")
+
+        return file_content.read()
+
+
+def extract_tar_stream(chunks: Iterable[bytes], src_path: str, dst_path: str) -> None:
+    """Extracts a streamed tar archive to a host path.
+
+    A directory destination receives the archive with its relative structure;
+    a file destination receives the content of the single archived file.
+
+    Raises:
+        FileNotFoundError: If the archive is empty.
+        RuntimeError: If a directory is extracted to a file destination.
+    """
+    with open_tar_stream(chunks) as tar:
+        if os.path.isdir(dst_path):
+            extracted = False
+            for member in tar:
+                tar.extract(member, dst_path)
+                extracted = True
+            if not extracted:
+                raise FileNotFoundError(f"Source file is empty: {src_path}")
+            return
+
+        member = tar.next()
+        if not member:
+            raise FileNotFoundError(f"Source file is empty: {src_path}")
+        if member.isdir():
+            raise RuntimeError(
+                f"Source path is a directory but destination is a file: {src_path}"
+            )
+
+        src_file = tar.extractfile(member)
+        if src_file is None:
+            raise RuntimeError(f"Failed to extract file: {src_path}")
+        with open(dst_path, "wb") as dst:
+            shutil.copyfileobj(src_file, dst, CHUNK_SIZE)
+
+        # A sequential archive can only be checked for more entries afterwards
+        if tar.next() is not None:
+            os.remove(dst_path)
+            raise RuntimeError(
+                f"Source path is a directory but destination is a file: {src_path}"
+            )
+
+
+def write_tar_stream(
+    fileobj: BinaryIO,
+    arcname: str,
+    src_path: Optional[str] = None,
+    content: Optional[bytes] = None,
+) -> None:
+    """Writes a tar archive of a host path or in-memory content to ``fileobj``.
+
+    Args:
+        fileobj: Writable stream, typically the write end of a pipe.
+        arcname: Path of the entry inside the archive.
+        src_path: Host file or directory to archive.
+        content: Bytes to archive as a single file when no src_path is given.
+    """
+    with tarfile.open(fileobj=fileobj, mode="w|", bufsize=CHUNK_SIZE) as tar:
+        if src_path is not None:
+            tar.add(src_path, arcname=arcname)
+        else:
+            tarinfo = tarfile.TarInfo(name=arcname)
+            tarinfo.size = len(content)
+            tar.addfile(tarinfo, io.BytesIO(content))
@@ -1,14 +1,22 @@
-from app.tool.base import BaseTool
-from app.tool.bash import Bash
-from app.tool.browser_use_tool import BrowserUseTool
-from app.tool.create_chat_completion import CreateChatCompletion
-from app.tool.planning import PlanningTool
-from app.tool.str_replace_editor import StrReplaceEditor
-from app.tool.terminate import Terminate
-from app.tool.tool_collection import ToolCollection
-from app.tool.web_search import WebSearch
+from app.lazy import lazy_exports
 
 
+# Tools are imported on first use, so importing one does not pull in the
+# dependencies of all the others (browser_use, search engine SDKs, ...)
+_EXPORTS = {
+    "BaseTool": "app.tool.base",
+    "Bash": "app.tool.bash",
+    "BrowserUseTool": "app.tool.browser_use_tool",
+    "CreateChatCompletion": "app.tool.create_chat_completion",
+    "PlanningTool": "app.tool.planning",
+    "StrReplaceEditor": "app.tool.str_replace_editor",
+    "Terminate": "app.tool.terminate",
+    "ToolCollection": "app.tool.tool_collection",
+    "WebSearch": "app.tool.web_search",
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
 __all__ = [
     "BaseTool",
     "Bash",
@@ -1,6 +1,7 @@
 import asyncio
 import os
-from typing import Optional
+import re
+from typing import List, Optional, Tuple
 
 from app.exceptions import ToolError
 from app.tool.base import BaseTool, CLIResult
@@ -10,6 +11,7 @@ _BASH_DESCRIPTION = """Execute a bash command in the terminal.
 * Long running commands: For commands that may run indefinitely, it should be run in the background and the output should be redirected to a file, e.g. command = `python3 app.py > server.log 2>&1 &`.
 * Interactive: If a bash command returns exit code `-1`, this means the process is not yet finished. The assistant must then send a second call to terminal with an empty `command` (which will retrieve any additional logs), or it can send additional text (set `command` to the text) to STDIN of the running process, or it can send command=`ctrl+c` to interrupt the process.
 * Timeout: If a command execution result says "Command timed out. Sending SIGINT to the process", the assistant should retry running the command in the background.
+* Batching: Several independent commands can be sent at once with `commands` instead of `command`. They run one after another in the same shell and each reports its own output and exit code.
 """
 
 
@@ -112,6 +114,88 @@ class _BashSession:
 
         return CLIResult(output=output, error=error)
 
+    async def run_batch(self, commands: List[str]) -> List[Tuple[int, str, str]]:
+        """Execute several commands with a single write to the bash shell.
+
+        Returns:
+            One (exit_code, stdout, stderr) tuple per command.
+        """
+        if not self._started:
+            raise ToolError("Session has not started.")
+        if self._process.returncode is not None:
+            raise ToolError(
+                f"bash has exited with returncode {self._process.returncode}, tool must be restarted"
+            )
+        if self._timed_out:
+            raise ToolError(
+                f"timed out: bash has not returned in {self._timeout} seconds and must be restarted",
+            )
+
+        assert self._process.stdin
+        assert self._process.stdout
+        assert self._process.stderr
+
+        # each command is followed by a stderr marker, then a stdout marker
+        # carrying its exit code, so both streams can be split per command
+        payload = "".join(
+            f"{command}\n__rc=$?; echo '{self._sentinel}' >&2; echo '{self._sentinel}'$__rc\n"
+            for command in commands
+        )
+        self._process.stdin.write(payload.encode())
+        await self._process.stdin.drain()
+
+        stdout_pattern = re.compile(re.escape(self._sentinel) + r"(\d+)\n")
+        stderr_marker = self._sentinel + "\n"
+        try:
+            async with asyncio.timeout(self._timeout):
+                while True:
+                    await asyncio.sleep(self._output_delay)
+                    output = (
+                        self._process.stdout._buffer.decode()
+                    )  # pyright: ignore[reportAttributeAccessIssue]
+                    error = (
+                        self._process.stderr._buffer.decode()
+                    )  # pyright: ignore[reportAttributeAccessIssue]
+                    if len(stdout_pattern.findall(output)) >= len(
+                        commands
+                    ) and error.count(stderr_marker) >= len(commands):
+                        break
+        except asyncio.TimeoutError:
+            self._timed_out = True
+            raise ToolError(
+                f"timed out: bash has not returned in {self._timeout} seconds and must be restarted",
+            ) from None
+
+        self._process.stdout._buffer.clear()  # pyright: ignore[reportAttributeAccessIssue]
+        self._process.stderr._buffer.clear()  # pyright: ignore[reportAttributeAccessIssue]
+
+        # split() alternates output chunks and captured exit codes
+        parts = stdout_pattern.split(output)
+        errors = error.split(stderr_marker)
+        results = []
+        for i in range(len(commands)):
+            out, exit_code = parts[2 * i], int(parts[2 * i + 1])
+            results.append(
+                (exit_code, out.removesuffix("\n"), errors[i].removesuffix("\n"))
+            )
+        return results
+
+
+def _format_batch(
+    commands: List[str], results: List[Tuple[int, str, str]]
+) -> CLIResult:
+    """Render per-command batch results as a single tool result."""
+    blocks = []
+    for command, (exit_code, output, error) in zip(commands, results):
+        block = [f"$ {command}"]
+        if output:
+            block.append(output)
+        if error:
+            block.append(f"[stderr]\n{error}")
+        block.append(f"[exit code: {exit_code}]")
+        blocks.append("\n".join(block))
+    return CLIResult(output="\n\n".join(blocks))
+
 
 class Bash(BaseTool):
     """A tool for executing bash commands"""
@@ -125,14 +209,23 @@ class Bash(BaseTool):
                 "type": "string",
                 "description": "The bash command to execute. Can be empty to view additional logs when previous exit code is `-1`. Can be `ctrl+c` to interrupt the currently running process.",
             },
+            "commands": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "(optional) Several commands to run one after another in a single call, used instead of `command`. Each command's output and exit code is reported separately.",
+            },
         },
-        "required": ["command"],
+        "required": [],
     }
 
     _session: Optional[_BashSession] = None
 
     async def execute(
-        self, command: str | None = None, restart: bool = False, **kwargs
+        self,
+        command: str | None = None,
+        restart: bool = False,
+        commands: List[str] | None = None,
+        **kwargs,
     ) -> CLIResult:
         if restart:
             if self._session:
@@ -146,6 +239,11 @@ class Bash(BaseTool):
             self._session = _BashSession()
             await self._session.start()
 
+        # Batches share the session with single commands, so cwd and
+        # environment changes made by either form are seen by the other
+        if commands:
+            return _format_batch(commands, await self._session.run_batch(commands))
+
         if command is not None:
             return await self._session.run(command)
 
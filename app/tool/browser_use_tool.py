@@ -1,12 +1,8 @@
 import asyncio
 import base64
 import json
-from typing import Generic, Optional, TypeVar
+from typing import TYPE_CHECKING, Any, Generic, Optional, TypeVar
 
-from browser_use import Browser as BrowserUseBrowser
-from browser_use import BrowserConfig
-from browser_use.browser.context import BrowserContext, BrowserContextConfig
-from browser_use.dom.service import DomService
 from pydantic import Field, field_validator
 from pydantic_core.core_schema import ValidationInfo
 
@@ -16,6 +12,11 @@ from app.tool.base import BaseTool, ToolResult
 from app.tool.web_search import WebSearch
 
 
+if TYPE_CHECKING:
+    # browser_use (and playwright) are imported when the browser first starts
+    from browser_use.browser.context import BrowserContext
+
+
 _BROWSER_DESCRIPTION = """\
 A powerful browser automation tool that allows interaction with web pages through various actions.
 * This tool provides commands for controlling a browser session, navigating web pages, and extracting information
@@ -122,9 +123,10 @@ class BrowserUseTool(BaseTool, Generic[Context]):
     }
 
     lock: asyncio.Lock = Field(default_factory=asyncio.Lock)
-    browser: Optional[BrowserUseBrowser] = Field(default=None, exclude=True)
-    context: Optional[BrowserContext] = Field(default=None, exclude=True)
-    dom_service: Optional[DomService] = Field(default=None, exclude=True)
+    # browser_use Browser, BrowserContext and DomService, created on first use
+    browser: Optional[Any] = Field(default=None, exclude=True)
+    context: Optional[Any] = Field(default=None, exclude=True)
+    dom_service: Optional[Any] = Field(default=None, exclude=True)
     web_search_tool: WebSearch = Field(default_factory=WebSearch, exclude=True)
 
     # Context for generic functionality
@@ -138,8 +140,13 @@ class BrowserUseTool(BaseTool, Generic[Context]):
             raise ValueError("Parameters cannot be empty")
         return v
 
-    async def _ensure_browser_initialized(self) -> BrowserContext:
+    async def _ensure_browser_initialized(self) -> "BrowserContext":
         """Ensure browser and context are initialized."""
+        from browser_use import Browser as BrowserUseBrowser
+        from browser_use import BrowserConfig
+        from browser_use.browser.context import BrowserContextConfig
+        from browser_use.dom.service import DomService
+
         if self.browser is None:
             browser_config_kwargs = {"headless": False, "disable_security": True}
 
@@ -477,7 +484,7 @@ Page content:
                 return ToolResult(error=f"Browser action '{action}' failed: {str(e)}")
 
     async def get_current_state(
-        self, context: Optional[BrowserContext] = None
+        self, context: Optional["BrowserContext"] = None
     ) -> ToolResult:
         """
         Get the current browser state as a ToolResult.
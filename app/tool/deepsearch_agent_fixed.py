@@ -5,6 +5,7 @@ import re
 import logging
 from datetime import datetime
 from typing import Dict, List, Optional, Union, Any, TYPE_CHECKING
+from urllib.parse import urlsplit
 
 from app.tool.base import BaseTool, ToolResult
 
@@ -15,6 +16,24 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# 每次深度搜索最多使用的关键词数量及并发搜索数
+MAX_SEARCH_QUERIES = 3
+MAX_CONCURRENT_SEARCHES = 3
+
+_web_search = None
+
+
+def _get_web_search():
+    """
+    获取共享的WebSearch实例，延迟导入以避免循环导入
+    """
+    global _web_search
+    if _web_search is None:
+        from app.tool.web_search import WebSearch
+        _web_search = WebSearch()
+    return _web_search
+
+
 class DeepSearchAgent(BaseTool):
     """
     改进的深度搜索代理，使用多种搜索策略提供深度分析
@@ -79,45 +98,72 @@ class DeepSearchAgent(BaseTool):
 
     async def _perform_multi_search(self, query: str) -> List[Dict]:
         """
-        使用多种搜索策略收集信息
+        使用多种搜索策略收集信息，多个搜索关键词并发执行
         """
         try:
-            # 导入web搜索工具
-            from app.tool.web_search import WebSearch
-            web_search = WebSearch()
-            
+            web_search = _get_web_search()
+
             # 生成多个搜索关键词
-            search_queries = self._generate_search_queries(query)
-            
-            all_results = []
-            for search_query in search_queries[:3]:  # 限制搜索次数
-                try:
-                    logger.info(f"Searching for: {search_query}")
-                    result = await web_search.execute(
-                        query=search_query,
-                        num_results=5,
-                        lang="zh",
-                        country="cn"
-                    )
-                    
-                    if hasattr(result, 'results') and result.results:
-                        for item in result.results:
-                            all_results.append({
-                                "title": item.title,
-                                "url": item.url,
-                                "description": item.description,
-                                "search_query": search_query
-                            })
-                except Exception as e:
-                    logger.warning(f"Search failed for query '{search_query}': {e}")
-                    continue
-                    
-            return all_results
-            
+            search_queries = self._generate_search_queries(query)[:MAX_SEARCH_QUERIES]
+            semaphore = asyncio.Semaphore(MAX_CONCURRENT_SEARCHES)
+
+            async def search_one(search_query: str) -> List[Dict]:
+                async with semaphore:
+                    try:
+                        logger.info(f"Searching for: {search_query}")
+                        result = await web_search.execute(
+                            query=search_query,
+                            num_results=5,
+                            lang="zh",
+                            country="cn"
+                        )
+                    except Exception as e:
+                        logger.warning(f"Search failed for query '{search_query}': {e}")
+                        return []
+
+                if not (hasattr(result, 'results') and result.results):
+                    return []
+                return [
+                    {
+                        "title": item.title,
+                        "url": item.url,
+                        "description": item.description,
+                        "search_query": search_query
+                    }
+                    for item in result.results
+                ]
+
+            # 结果按关键词顺序合并，延迟取决于最慢的一次搜索
+            batches = await asyncio.gather(*(search_one(q) for q in search_queries))
+            return self._deduplicate_results(
+                [item for batch in batches for item in batch]
+            )
+
         except Exception as e:
             logger.error(f"Multi-search failed: {e}")
             return []
 
+    @staticmethod
+    def _deduplicate_results(results: List[Dict]) -> List[Dict]:
+        """
+        按URL去重，保留首次出现的结果
+        """
+        seen = set()
+        unique_results = []
+        for result in results:
+            url = result.get("url") or ""
+            parts = urlsplit(url.strip())
+            key = (
+                parts.netloc.lower(),
+                parts.path.rstrip("/"),
+                parts.query,
+            ) if parts.netloc else url
+            if key in seen:
+                continue
+            seen.add(key)
+            unique_results.append(result)
+        return unique_results
+
     def _generate_search_queries(self, query: str) -> List[str]:
         """
         根据原始查询生成多个搜索关键词
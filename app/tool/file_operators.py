@@ -2,7 +2,7 @@
 
 import asyncio
 from pathlib import Path
-from typing import Optional, Protocol, Tuple, Union, runtime_checkable
+from typing import List, Optional, Protocol, Tuple, Union, runtime_checkable
 
 from app.config import SandboxSettings
 from app.exceptions import ToolError
@@ -32,12 +32,22 @@ class FileOperator(Protocol):
         """Check if path exists."""
         ...
 
+    async def path_status(self, path: PathLike) -> Tuple[bool, bool]:
+        """Check whether path exists and whether it is a directory."""
+        ...
+
     async def run_command(
         self, cmd: str, timeout: Optional[float] = 120.0
     ) -> Tuple[int, str, str]:
         """Run a shell command and return (return_code, stdout, stderr)."""
         ...
 
+    async def run_batch(
+        self, cmds: List[str], timeout: Optional[float] = 120.0
+    ) -> List[Tuple[int, str, str]]:
+        """Run several shell commands and return one (return_code, stdout, stderr) each."""
+        ...
+
 
 class LocalFileOperator(FileOperator):
     """File operations implementation for local filesystem."""
@@ -66,6 +76,11 @@ class LocalFileOperator(FileOperator):
         """Check if path exists."""
         return Path(path).exists()
 
+    async def path_status(self, path: PathLike) -> Tuple[bool, bool]:
+        """Check whether path exists and whether it is a directory."""
+        path = Path(path)
+        return path.exists(), path.is_dir()
+
     async def run_command(
         self, cmd: str, timeout: Optional[float] = 120.0
     ) -> Tuple[int, str, str]:
@@ -92,6 +107,12 @@ class LocalFileOperator(FileOperator):
                 f"Command '{cmd}' timed out after {timeout} seconds"
             ) from exc
 
+    async def run_batch(
+        self, cmds: List[str], timeout: Optional[float] = 120.0
+    ) -> List[Tuple[int, str, str]]:
+        """Run several shell commands locally, one after another."""
+        return [await self.run_command(cmd, timeout) for cmd in cmds]
+
 
 class SandboxFileOperator(FileOperator):
     """File operations implementation for sandbox environment."""
@@ -136,6 +157,14 @@ class SandboxFileOperator(FileOperator):
         )
         return result.strip() == "true"
 
+    async def path_status(self, path: PathLike) -> Tuple[bool, bool]:
+        """Check existence and directory status in one sandbox round trip."""
+        await self._ensure_sandbox_initialized()
+        (exists_code, _), (is_dir_code, _) = await self.sandbox_client.run_batch(
+            [f"test -e {path}", f"test -d {path}"]
+        )
+        return exists_code == 0, is_dir_code == 0
+
     async def run_command(
         self, cmd: str, timeout: Optional[float] = 120.0
     ) -> Tuple[int, str, str]:
@@ -156,3 +185,22 @@ class SandboxFileOperator(FileOperator):
             ) from exc
         except Exception as exc:
             return 1, "", f"Error executing command in sandbox: {str(exc)}"
+
+    async def run_batch(
+        self, cmds: List[str], timeout: Optional[float] = 120.0
+    ) -> List[Tuple[int, str, str]]:
+        """Run several commands in one sandbox round trip."""
+        await self._ensure_sandbox_initialized()
+        try:
+            results = await self.sandbox_client.run_batch(
+                cmds, timeout=int(timeout) if timeout else None
+            )
+        except TimeoutError as exc:
+            raise TimeoutError(
+                f"Command batch timed out after {timeout} seconds in sandbox"
+            ) from exc
+        except Exception as exc:
+            error = f"Error executing command in sandbox: {str(exc)}"
+            return [(1, "", error) for _ in cmds]
+        # stderr is merged into stdout by the sandbox terminal
+        return [(exit_code, output, "") for exit_code, output in results]
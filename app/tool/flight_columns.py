@@ -0,0 +1,252 @@
+"""Columnar processing of flight search results.
+
+A flight search response is flattened once into typed NumPy arrays (prices in
+fen as float64 with NaN for missing fares, flags as bool, times as int64
+minutes since the epoch), and display columns such as the codeshare airline
+label are built from those arrays as vectorized operations instead of per-row
+Python code. Only the rows and columns that are finally displayed are
+converted, to a TravelTable or (importing pandas on demand) a DataFrame;
+filtering and cheapest / fastest queries run on that DataFrame in
+``app.tool.flight_data_process``.
+"""
+import json
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from app.tool.travel_table import TravelTable
+
+
+# Sentinel for missing or unparsable timestamps (NaT cast to int64)
+MISSING_TIME = np.iinfo(np.int64).min
+
+MINUTES_PER_DAY = 24 * 60
+
+COLUMNS_ORDER = [
+    "航班号", "航空公司", "出发城市", "到达城市", "出发机场", "到达机场",
+    "出发时间", "到达时间", "机型", "舱位", "价格(元)", "折扣",
+    "基础价(元)", "燃油费(元)", "建设费(元)", "含餐食", "经停", "跨天",
+    "飞行时长(分钟)", "飞行距离(公里)", "可退", "可改签",
+    "是否共享", "主航班号", "主航空公司",
+]
+
+_STRING_FIELDS = (
+    "flight_number", "airline", "departure_city", "arrival_city",
+    "departure_airport", "arrival_airport", "departure_time", "arrival_time",
+    "equip_type", "main_flight_number", "main_airline", "cabin", "discount",
+)
+_FLOAT_FIELDS = (
+    "sale_price", "base_price", "fuel_cost", "construction_cost",
+    "duration_seconds",
+)
+# Numeric fields whose dtype (int64 or float64) follows the response
+_NUMBER_FIELDS = ("distance_km",)
+_BOOL_FIELDS = (
+    "is_share", "has_price", "returnable", "changeable", "meal_included",
+    "is_stop", "cross_day",
+)
+
+
+def to_minutes(values: np.ndarray) -> np.ndarray:
+    """Parse datetime strings into int64 minutes since the epoch."""
+    try:
+        parsed = np.array(values, dtype="datetime64[m]")
+    except (TypeError, ValueError):
+        # Some value is malformed: parse one by one, leaving failures as NaT
+        parsed = np.full(len(values), np.datetime64("NaT"), dtype="datetime64[m]")
+        for i, value in enumerate(values):
+            try:
+                parsed[i] = np.datetime64(value, "m")
+            except (TypeError, ValueError):
+                pass
+    return parsed.astype(np.int64)
+
+
+def parse_clock(value: str) -> int:
+    """Parse an HH:MM string into minutes after midnight."""
+    hours, minutes = value.split(":")[:2]
+    return int(hours) * 60 + int(minutes)
+
+
+def _yes_no(flags: np.ndarray) -> np.ndarray:
+    return np.where(flags, "是", "否").astype(object)
+
+
+class FlightColumns:
+    """Typed, column-oriented table of flights.
+
+    Every column is a NumPy array of the same length; ``take`` returns a new
+    table sharing no state with the original.
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        self.columns = columns
+
+    def __len__(self) -> int:
+        return len(self.columns["flight_number"])
+
+    @classmethod
+    def from_json(cls, json_data: Union[str, List[Dict[str, Any]]]) -> "FlightColumns":
+        """Flatten a flight search response into typed columns in one pass.
+
+        Args:
+            json_data: The ``flight_list`` of a search response, as a JSON
+                string or already parsed list.
+
+        Returns:
+            FlightColumns: One row per flight, using the first route segment
+            and the first fare of each flight.
+        """
+        data = json.loads(json_data) if isinstance(json_data, str) else json_data
+
+        raw: Dict[str, list] = {
+            name: []
+            for name in _STRING_FIELDS + _FLOAT_FIELDS + _NUMBER_FIELDS + _BOOL_FIELDS
+        }
+        for flight in data:
+            route = flight["flight_info"]["route_list"][0]
+            departure = route["departure_info"]
+            arrival = route["arrival_info"]
+            airline = route["airline_info"]
+            is_share = airline["is_share_flight"] == 1
+
+            raw["flight_number"].append(airline["flight_number"])
+            raw["airline"].append(airline["airline_simple_name"])
+            raw["departure_city"].append(departure["departure_city_name"])
+            raw["arrival_city"].append(arrival["arrival_city_name"])
+            raw["departure_airport"].append(
+                f"{departure['departure_airport_simple_name']}{departure['departure_terminal'] or ''}"
+            )
+            raw["arrival_airport"].append(
+                f"{arrival['arrival_airport_simple_name']}{arrival['arrival_terminal'] or ''}"
+            )
+            raw["departure_time"].append(departure["departure_datetime"])
+            raw["arrival_time"].append(arrival["arrival_datetime"])
+            raw["equip_type"].append(airline["air_equip_type"])
+            raw["is_share"].append(is_share)
+            raw["main_flight_number"].append(
+                airline["main_flight_number"] if is_share else ""
+            )
+            raw["main_airline"].append(
+                airline["main_airline_simple_name"] if is_share else ""
+            )
+            raw["meal_included"].append(airline.get("is_meal_included", 0) == 1)
+            raw["is_stop"].append(route["stop_info"]["is_stop"] == 1)
+            raw["cross_day"].append(route.get("cross_day", 0) == 1)
+            raw["duration_seconds"].append(airline.get("flight_duration_seconds", 0))
+            raw["distance_km"].append(airline.get("flight_distance_km", 0))
+
+            price_list = flight.get("price_list")
+            price = (
+                price_list[0]["flight_route_price_list"][0]["adult_price_info"]
+                if price_list
+                else {}
+            )
+            raw["has_price"].append(bool(price))
+            raw["cabin"].append(
+                f"{price.get('cabin_name', '')}{price.get('cabin_code', '')}"
+                if price
+                else None
+            )
+            raw["discount"].append(f"{price.get('discount', 0)}%" if price else None)
+            raw["sale_price"].append(price.get("sale_price", 0) if price else np.nan)
+            raw["base_price"].append(price.get("base_price", 0) if price else np.nan)
+            raw["fuel_cost"].append(price.get("fuel_cost", 0) if price else np.nan)
+            raw["construction_cost"].append(
+                price.get("construction_cost", 0) if price else np.nan
+            )
+            raw["returnable"].append(
+                bool(price) and price.get("return_info", {}).get("returnable", 0) == 1
+            )
+            raw["changeable"].append(
+                bool(price) and price.get("change_info", {}).get("changeable", 0) == 1
+            )
+
+        columns: Dict[str, np.ndarray] = {}
+        for name in _STRING_FIELDS:
+            columns[name] = np.array(raw[name], dtype=object)
+        for name in _FLOAT_FIELDS:
+            columns[name] = np.array(raw[name], dtype=np.float64)
+        for name in _NUMBER_FIELDS:
+            columns[name] = np.array(raw[name], dtype=None if raw[name] else np.int64)
+        for name in _BOOL_FIELDS:
+            columns[name] = np.array(raw[name], dtype=bool)
+
+        columns["departure_minutes"] = to_minutes(columns["departure_time"])
+        columns["arrival_minutes"] = to_minutes(columns["arrival_time"])
+        return cls(columns)
+
+    def take(self, indices: Union[np.ndarray, Sequence[int]]) -> "FlightColumns":
+        """Select rows by position or boolean mask."""
+        return FlightColumns(
+            {name: values[indices] for name, values in self.columns.items()}
+        )
+
+    def airline_labels(self) -> np.ndarray:
+        """Airline names with codeshare flights marked as (共享)."""
+        airline = self.columns["airline"]
+        return np.where(self.columns["is_share"], airline + "(共享)", airline)
+
+    def display_columns(
+        self, columns: Optional[Sequence[str]] = None
+    ) -> Dict[str, np.ndarray]:
+        """Build display columns, named as in ``COLUMNS_ORDER``.
+
+        Args:
+            columns: Names to build, in output order; None builds all of them.
+        """
+        cols = self.columns
+        has_price = cols["has_price"]
+
+        def price_in_yuan(name: str):
+            return lambda: np.round(cols[name] / 100, 2)
+
+        def priced_flag(name: str):
+            return lambda: np.where(has_price, _yes_no(cols[name]), None)
+
+        builders = {
+            "航班号": lambda: cols["flight_number"],
+            "航空公司": self.airline_labels,
+            "出发城市": lambda: cols["departure_city"],
+            "到达城市": lambda: cols["arrival_city"],
+            "出发机场": lambda: cols["departure_airport"],
+            "到达机场": lambda: cols["arrival_airport"],
+            "出发时间": lambda: cols["departure_time"],
+            "到达时间": lambda: cols["arrival_time"],
+            "机型": lambda: cols["equip_type"],
+            "舱位": lambda: cols["cabin"],
+            "价格(元)": price_in_yuan("sale_price"),
+            "折扣": lambda: cols["discount"],
+            "基础价(元)": price_in_yuan("base_price"),
+            "燃油费(元)": price_in_yuan("fuel_cost"),
+            "建设费(元)": price_in_yuan("construction_cost"),
+            "含餐食": lambda: _yes_no(cols["meal_included"]),
+            "经停": lambda: _yes_no(cols["is_stop"]),
+            "跨天": lambda: _yes_no(cols["cross_day"]),
+            "飞行时长(分钟)": lambda: np.rint(cols["duration_seconds"] / 60).astype(
+                np.int64
+            ),
+            "飞行距离(公里)": lambda: cols["distance_km"],
+            "可退": priced_flag("returnable"),
+            "可改签": priced_flag("changeable"),
+            "是否共享": lambda: _yes_no(cols["is_share"]),
+            "主航班号": lambda: cols["main_flight_number"],
+            "主航空公司": lambda: cols["main_airline"],
+        }
+        names = COLUMNS_ORDER if columns is None else columns
+        return {name: builders[name]() for name in names if name in builders}
+
+    def to_table(
+        self, columns: Optional[Sequence[str]] = None, max_rows: Optional[int] = None
+    ) -> TravelTable:
+        """Convert the leading ``max_rows`` rows of the given display columns."""
+        source = self if max_rows is None else self.take(slice(0, max_rows))
+        display = source.display_columns(columns)
+        rows = list(zip(*(values.tolist() for values in display.values())))
+        return TravelTable(list(display), rows)
+
+    def to_dataframe(self):
+        """Materialize the display table with the legacy Chinese column names."""
+        import pandas as pd
+
+        return pd.DataFrame(self.display_columns(), columns=COLUMNS_ORDER)
@@ -1,6 +1,12 @@
 import json
-import pandas as pd
-from datetime import datetime
+
+from app.tool.flight_columns import FlightColumns, parse_clock
+
+# 文本展示时保留的列
+DISPLAY_COLUMNS = (
+    "航班号", "航空公司", "出发城市", "到达城市", "出发机场", "到达机场",
+    "出发时间", "到达时间", "机型", "舱位", "价格(元)", "折扣"
+)
 
 def process_flight_data(json_data):
     """
@@ -12,97 +18,8 @@ def process_flight_data(json_data):
     Returns:
         pandas.DataFrame: 处理后的航班信息表格
     """
-    # 如果输入是字符串，解析为Python对象
-    if isinstance(json_data, str):
-        data = json.loads(json_data)
-    else:
-        data = json_data
-    
-    # 创建存储所有航班信息的列表
-    flights = []
-    
-    # 遍历每个航班记录
-    for flight in data:
-        # 获取航线信息（通常只有一个航段，取第一个）
-        route = flight["flight_info"]["route_list"][0]
-        departure_info = route["departure_info"]
-        arrival_info = route["arrival_info"]
-        airline_info = route["airline_info"]
-        
-        # 获取价格信息（取第一个价格）
-        if "price_list" in flight and len(flight["price_list"]) > 0:
-            price_info = flight["price_list"][0]["flight_route_price_list"][0]["adult_price_info"]
-        else:
-            price_info = {}
-        
-        # 整理基本信息
-        flight_data = {
-            "航班号": airline_info["flight_number"],
-            "航空公司": airline_info["airline_simple_name"],
-            "出发城市": departure_info["departure_city_name"],
-            "到达城市": arrival_info["arrival_city_name"],
-            "出发机场": f"{departure_info['departure_airport_simple_name']}{departure_info['departure_terminal'] if departure_info['departure_terminal'] else ''}",
-            "到达机场": f"{arrival_info['arrival_airport_simple_name']}{arrival_info['arrival_terminal'] if arrival_info['arrival_terminal'] else ''}",
-            "出发时间": departure_info["departure_datetime"],
-            "到达时间": arrival_info["arrival_datetime"],
-            "机型": airline_info["air_equip_type"],
-            "是否共享": "是" if airline_info["is_share_flight"] == 1 else "否",
-            "主航班号": airline_info["main_flight_number"] if airline_info["is_share_flight"] == 1 else "",
-            "主航空公司": airline_info["main_airline_simple_name"] if airline_info["is_share_flight"] == 1 else "",
-        }
-        
-        # 添加价格相关信息
-        if price_info:
-            # 将分转换为元
-            sale_price_yuan = price_info.get("sale_price", 0) / 100
-            
-            flight_data.update({
-                "舱位": f"{price_info.get('cabin_name', '')}{price_info.get('cabin_code', '')}",
-                "价格(元)": round(sale_price_yuan, 2),
-                "折扣": f"{price_info.get('discount', 0)}%",
-                "基础价(元)": round(price_info.get("base_price", 0) / 100, 2),
-                "燃油费(元)": round(price_info.get("fuel_cost", 0) / 100, 2),
-                "建设费(元)": round(price_info.get("construction_cost", 0) / 100, 2),
-                "可退": "是" if price_info.get("return_info", {}).get("returnable", 0) == 1 else "否",
-                "可改签": "是" if price_info.get("change_info", {}).get("changeable", 0) == 1 else "否"
-            })
-        
-        # 添加其他信息
-        flight_data.update({
-            "含餐食": "是" if airline_info.get("is_meal_included", 0) == 1 else "否",
-            "经停": "是" if route["stop_info"]["is_stop"] == 1 else "否",
-            "跨天": "是" if route.get("cross_day", 0) == 1 else "否",
-            "飞行时长(分钟)": round(airline_info.get("flight_duration_seconds", 0) / 60),
-            "飞行距离(公里)": airline_info.get("flight_distance_km", 0)
-        })
-        
-        flights.append(flight_data)
-    
-    # 创建DataFrame
-    df = pd.DataFrame(flights)
-    
-    # 处理共享航班的标注
-    df["航空公司"] = df.apply(
-        lambda row: f"{row['航空公司']}(共享)" if row["是否共享"] == "是" else row["航空公司"], 
-        axis=1
-    )
-    
-    # 优化列的顺序
-    columns_order = [
-        "航班号", "航空公司", "出发城市", "到达城市", "出发机场", "到达机场", 
-        "出发时间", "到达时间", "机型", "舱位", "价格(元)", "折扣", 
-        "基础价(元)", "燃油费(元)", "建设费(元)", "含餐食", "经停", "跨天", 
-        "飞行时长(分钟)", "飞行距离(公里)", "可退", "可改签", 
-        "是否共享", "主航班号", "主航空公司"
-    ]
-    
-    # 确保所有列都存在
-    for col in columns_order:
-        if col not in df.columns:
-            df[col] = None
-    
-    # 返回按指定顺序排列的列
-    return df[columns_order]
+    # 一次性展开为类型化的列，再批量生成表格
+    return FlightColumns.from_json(json_data).to_dataframe()
 
 def sort_flights(df, sort_by="价格(元)", ascending=True):
     """
@@ -144,23 +61,20 @@ def filter_flights(df,
     if airline:
         filtered_df = filtered_df[filtered_df["航空公司"].str.contains(airline)]
     
-    # 筛选出发时间范围
+    # 筛选出发时间范围（整列解析为当天分钟数后比较）
     if departure_time_start or departure_time_end:
-        # 提取时间部分
-        filtered_df["出发时间只有时分"] = filtered_df["出发时间"].apply(
-            lambda x: datetime.strptime(x.split()[1], "%H:%M") if isinstance(x, str) else None
-        )
-        
+        import pandas as pd
+        departure = pd.to_datetime(filtered_df["出发时间"], errors="coerce")
+        minutes = departure.dt.hour * 60 + departure.dt.minute
+        keep = minutes.notna()
+
         if departure_time_start:
-            start_time = datetime.strptime(departure_time_start, "%H:%M")
-            filtered_df = filtered_df[filtered_df["出发时间只有时分"] >= start_time]
-        
+            keep &= minutes >= parse_clock(departure_time_start)
+
         if departure_time_end:
-            end_time = datetime.strptime(departure_time_end, "%H:%M")
-            filtered_df = filtered_df[filtered_df["出发时间只有时分"] <= end_time]
-        
-        # 删除临时列
-        filtered_df = filtered_df.drop("出发时间只有时分", axis=1)
+            keep &= minutes <= parse_clock(departure_time_end)
+
+        filtered_df = filtered_df[keep]
     
     # 筛选价格
     if price_max is not None:
@@ -172,20 +86,30 @@ def filter_flights(df,
     
     return filtered_df
 
+def _min_row(df, column):
+    """按位置取某列最小值所在的行；该列全为空时与排序取首行一致，返回第一行"""
+    if df.empty:
+        return None
+    # 重置索引后 idxmin 返回的就是位置，重复的索引标签不会取出多行
+    values = df[column].reset_index(drop=True).dropna()
+    if values.empty:
+        return df.iloc[0]
+    return df.iloc[values.idxmin()]
+
 def get_cheapest_flight(df, max_stops=0):
-    """获取最便宜的航班"""
+    """获取最便宜的航班，没有航班时返回 None"""
     if max_stops == 0:
         # 只看直飞航班
         direct_flights = df[df["经停"] == "否"]
         if not direct_flights.empty:
-            return direct_flights.sort_values("价格(元)").iloc[0]
+            return _min_row(direct_flights, "价格(元)")
     
     # 考虑经停航班或直飞为空
-    return df.sort_values("价格(元)").iloc[0]
+    return _min_row(df, "价格(元)")
 
 def get_fastest_flight(df):
-    """获取飞行时间最短的航班"""
-    return df.sort_values("飞行时长(分钟)").iloc[0]
+    """获取飞行时间最短的航班，没有航班时返回 None"""
+    return _min_row(df, "飞行时长(分钟)")
 
 def get_latest_departure_earliest_arrival(df, date):
     """获取最晚出发最早到达的航班"""
@@ -289,10 +213,7 @@ def format_for_display_as_text(df, num_flights=None):
         str: 格式化的文本表格
     """
     # 选择要显示的列
-    display_columns = [
-        "航班号", "航空公司", "出发城市", "到达城市", "出发机场", "到达机场",
-        "出发时间", "到达时间", "机型", "舱位", "价格(元)", "折扣"
-    ]
+    display_columns = list(DISPLAY_COLUMNS)
 
     # 确保所有列都存在
     display_df = df.copy()
@@ -308,6 +229,20 @@ def format_for_display_as_text(df, num_flights=None):
 
     # 转换为文本
     return df_to_text(display_df)
+
+def format_flights_as_text(json_data, num_flights=None):
+    """
+    直接将航班JSON数据格式化为文本表格（不构建DataFrame）
+
+    Args:
+        json_data (str or list): 航班信息的JSON字符串或列表
+        num_flights (int): 要显示的航班数，None表示全部
+
+    Returns:
+        str: 格式化的文本表格
+    """
+    flights = FlightColumns.from_json(json_data)
+    return flights.to_table(DISPLAY_COLUMNS, max_rows=num_flights).to_text()
 # 使用示例
 if __name__ == "__main__":
     # 从文件读取JSON数据
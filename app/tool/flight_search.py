@@ -5,9 +5,11 @@ import aiohttp
 import logging
 from tenacity import retry, stop_after_attempt, wait_exponential, before_log, after_log
 
+from app.cache import cached
 from app.config import config
 from app.tool.base import BaseTool
-import app.tool.flight_data_process as flight_data_process
+from app.tool.flight_columns import FlightColumns
+from app.tool.travel_render import FLIGHT_SPEC, render_search_result
 
 # 设置日志记录器
 logger = logging.getLogger(__name__)
@@ -50,6 +52,9 @@ class FlightSearch(BaseTool):
         "required": ["departure_city_name", "arrival_city_name", "date"],
     }
     
+    # Approximate token budget for the rendered result table
+    max_result_tokens: int = 2000
+
     _API_URL = "http://ainlp.intra.xiaojukeji.com/hotel-flight/flight/search"
 
     async def execute(
@@ -88,26 +93,18 @@ class FlightSearch(BaseTool):
         #
         #if not arrival_city_name.endswith("市"):
         #    arrival_city_name += "市"
-        payload = {
-            "departure_city_name": departure_city_name,
-            "arrival_city_name": arrival_city_name,
-            "date": date.split(" ")[0].strip(),
-            "search_type": search_type,
-            "support_price_type": support_price_type,
-            "support_rc_rule": support_rc_rule
-        }
-        #payload["departure_city_name"] = "南京市"
-        #payload["arrival_city_name"] = "北京市"
-        #payload["date"] = "2025-03-18"
-        
-        
-        logger.info(f"Searching flights from {departure_city_name} to {arrival_city_name} on {date}, {payload}")
-        
         try:
-            result = await self._send_request(self._API_URL, payload)
-            flight_list = result.get("data",{}).get("flight_list", {})
-            flights_df = flight_data_process.process_flight_data(flight_list)
-            flights_str = flight_data_process.format_for_display_as_text(flights_df)
+            flights = await self.search_table(
+                departure_city_name,
+                arrival_city_name,
+                date.split(" ")[0].strip(),
+                search_type,
+                support_price_type,
+                support_rc_rule,
+            )
+            flights_str = render_search_result(
+                flights.to_table(), FLIGHT_SPEC, self.max_result_tokens
+            )
             print(flights_str)
             #print("debug all....", json.dumps(flight_list))
 
@@ -127,6 +124,43 @@ class FlightSearch(BaseTool):
                 "data": None
             }
     
+    async def search_table(
+        self,
+        departure_city_name: str,
+        arrival_city_name: str,
+        date: str,
+        search_type: int = 0,
+        support_price_type: int = 0,
+        support_rc_rule: int = 0
+    ) -> FlightColumns:
+        """
+        Search flights and return the unrendered columnar result.
+
+        Args:
+            date (str): Flight date in format YYYY-MM-DD.
+
+        Returns:
+            FlightColumns: One row per flight.
+        """
+        payload = {
+            "departure_city_name": departure_city_name,
+            "arrival_city_name": arrival_city_name,
+            "date": date,
+            "search_type": search_type,
+            "support_price_type": support_price_type,
+            "support_rc_rule": support_rc_rule
+        }
+        #payload["departure_city_name"] = "南京市"
+        #payload["arrival_city_name"] = "北京市"
+        #payload["date"] = "2025-03-18"
+        
+        logger.info(f"Searching flights from {departure_city_name} to {arrival_city_name} on {date}, {payload}")
+        
+        result = await self._send_request(self._API_URL, payload)
+        flight_list = result.get("data",{}).get("flight_list", {})
+        return FlightColumns.from_json(flight_list)
+
+    @cached("flight_search", validate=lambda tool, response: tool._validate_response(response))
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=1, max=10),
@@ -1,15 +1,23 @@
 import json
-import pandas as pd
 
-def process_hotel_data(json_data):
+from app.tool.travel_table import TravelTable
+
+# 输出表格的列及顺序
+HOTEL_COLUMNS = (
+    "酒店ID", "酒店名称", "城市", "地址", "酒店类型", "星级",
+    "平均价格", "评分", "评分级别", "评价数量", "标签",
+    "距离", "有库存", "显示价格"
+)
+
+def build_hotel_table(json_data):
     """
-    处理酒店信息JSON数据，转换为结构化的DataFrame
+    处理酒店信息JSON数据，直接生成轻量表格（不依赖pandas）
     
     Args:
         json_data (str or list): 酒店信息的JSON字符串或列表
     
     Returns:
-        pandas.DataFrame: 处理后的酒店信息表格
+        TravelTable: 按HOTEL_COLUMNS排列的酒店信息表格
     """
     # 如果输入是字符串，解析为Python对象
     if isinstance(json_data, str):
@@ -17,61 +25,44 @@ def process_hotel_data(json_data):
     else:
         data = json_data
     
-    # 创建存储所有酒店信息的列表
-    hotels = []
-    
-    # 遍历每个酒店记录
+    rows = []
     for hotel in data:
         # 处理标签信息
         tags = []
         if "tag_info_list" in hotel and hotel["tag_info_list"]:
             tags = [tag["name"] for tag in hotel["tag_info_list"]]
         
-        # 获取经纬度
-        lng = hotel.get("lng", hotel.get("hotel_details", {}).get("lng", ""))
-        lat = hotel.get("lat", hotel.get("hotel_details", {}).get("lat", ""))
-        
-        # 整理基本信息
-        hotel_data = {
-            "酒店ID": hotel.get("didi_hotel_id", ""),
-            "酒店名称": hotel.get("hotel_name", ""),
-            "城市": hotel.get("city_name", ""),
-            "地址": hotel.get("hotel_address", ""),
-            "酒店类型": hotel.get("level_name", ""),
-            "星级": hotel.get("hotel_details", {}).get("hotel_star", ""),
-            "平均价格": hotel.get("price_avg", 0),
-            "评分": hotel.get("hotel_score", ""),
-            "评分描述": hotel.get("score_desc", ""),
-            "评价数量": hotel.get("score_num", 0),
-            "评分级别": hotel.get("score_level_name", ""),
-            "标签": ", ".join(tags),
-            "距离": hotel.get("distance", ""),
-            "经度": lng,
-            "纬度": lat,
-            "有库存": "是" if hotel.get("has_stock", 0) == 1 else "否",
-            "显示价格": "是" if hotel.get("show_price", False) else "否",
-            "图片URL": hotel.get("photo_url", "")
-        }
-        
-        hotels.append(hotel_data)
-    
-    # 创建DataFrame
-    df = pd.DataFrame(hotels)
-    
-    # 优化列的顺序
-    columns_order = [
-        "酒店ID", "酒店名称", "城市", "地址", "酒店类型", "星级", 
-        "平均价格", "评分", "评分级别", "评价数量", "标签", 
-        "距离", "有库存", "显示价格"
-    ]
+        # 按HOTEL_COLUMNS的顺序直接生成一行
+        rows.append((
+            hotel.get("didi_hotel_id", ""),
+            hotel.get("hotel_name", ""),
+            hotel.get("city_name", ""),
+            hotel.get("hotel_address", ""),
+            hotel.get("level_name", ""),
+            hotel.get("hotel_details", {}).get("hotel_star", ""),
+            hotel.get("price_avg", 0),
+            hotel.get("hotel_score", ""),
+            hotel.get("score_level_name", ""),
+            hotel.get("score_num", 0),
+            ", ".join(tags),
+            hotel.get("distance", ""),
+            "是" if hotel.get("has_stock", 0) == 1 else "否",
+            "是" if hotel.get("show_price", False) else "否",
+        ))
+    
+    return TravelTable(HOTEL_COLUMNS, rows)
+
+def process_hotel_data(json_data):
+    """
+    处理酒店信息JSON数据，转换为结构化的DataFrame
     
-    # 确保所有列都存在
-    for col in columns_order:
-        if col not in df.columns:
-            df[col] = None
+    Args:
+        json_data (str or list): 酒店信息的JSON字符串或列表
     
-    # 返回按指定顺序排列的列
-    return df[columns_order]
+    Returns:
+        pandas.DataFrame: 处理后的酒店信息表格
+    """
+    return build_hotel_table(json_data).to_dataframe()
 
 def df_to_text(df, max_rows=None):
     """
@@ -142,6 +133,7 @@ def filter_hotels(df,
     # 筛选评分
     if min_rating is not None:
         # 将评分转换为数值类型
+        import pandas as pd
         filtered_df["评分"] = pd.to_numeric(filtered_df["评分"], errors="coerce")
         filtered_df = filtered_df[filtered_df["评分"] >= min_rating]
     
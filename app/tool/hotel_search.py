@@ -1,21 +1,42 @@
 import asyncio
 import json
-from typing import Dict, List, Optional, Union
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple, Union
 import aiohttp
 import logging
 from tenacity import retry, stop_after_attempt, wait_exponential, before_log, after_log
 
+from app.cache import cached
 from app.config import config
 from app.tool.base import BaseTool
 import app.tool.hotel_data_process as hotel_data_process
+from app.tool.travel_render import HOTEL_SPEC, render_search_result, to_number
+from app.tool.travel_table import TravelTable
 
 # 设置日志记录器
 logger = logging.getLogger(__name__)
 
+# Where recent searches stopped (payload, filters and offset into the
+# fetched hotel list), keyed by cursor id
+_CURSORS: "OrderedDict[str, Dict]" = OrderedDict()
+_MAX_CURSORS = 256
+
+
+def _save_cursor(state: Dict) -> str:
+    """Remember where a search stopped and return a short cursor for it."""
+    cursor = f"hc-{uuid.uuid4().hex[:10]}"
+    _CURSORS[cursor] = state
+    while len(_CURSORS) > _MAX_CURSORS:
+        _CURSORS.popitem(last=False)
+    return cursor
+
+
 class HotelSearch(BaseTool):
     name: str = "hotel_search"
     description: str = """Search for hotels based on location, date, and other criteria.
-    This tool helps find available hotels in a specific city with customizable filters."""
+    This tool helps find available hotels in a specific city with customizable filters.
+    At most max_results hotels matching the filters are returned; if more remain, the output ends with a cursor that can be passed back to continue where it stopped."""
     parameters: dict = {
         "type": "object",
         "properties": {
@@ -62,10 +83,30 @@ class HotelSearch(BaseTool):
                 "description": "(optional) Sort order for results (0: default sorting).",
                 "default": 0,
             },
+            "min_price": {
+                "type": "number",
+                "description": "(optional) Minimum average price per night in yuan.",
+            },
+            "max_price": {
+                "type": "number",
+                "description": "(optional) Maximum average price per night in yuan.",
+            },
+            "max_results": {
+                "type": "integer",
+                "description": "(optional) Maximum number of matching hotels to return. Default is 30.",
+                "default": 30,
+            },
+            "cursor": {
+                "type": "string",
+                "description": "(optional) Cursor from a previous hotel_search result to fetch the next hotels of the same search. The search parameters stored in the cursor are used.",
+            },
         },
         "required": ["city_name", "check_in_date", "check_out_date"],
     }
     
+    # Approximate token budget for the rendered result table
+    max_result_tokens: int = 2000
+
     _API_URL = "http://ainlp.intra.xiaojukeji.com/hotel-flight/hotel/search"
 
     async def execute(
@@ -78,7 +119,11 @@ class HotelSearch(BaseTool):
         lng: str = "",
         lat: str = "",
         distance_range: str = "10000",
-        sort: int = 0
+        sort: int = 0,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        max_results: int = 30,
+        cursor: Optional[str] = None,
     ) -> Dict:
         """
         Execute a hotel search and return available hotels.
@@ -93,10 +138,27 @@ class HotelSearch(BaseTool):
             lat (str, optional): Latitude coordinate. Default is empty string.
             distance_range (str, optional): Search radius in meters. Default is "10000".
             sort (int, optional): Sort order for results. Default is 0.
+            min_price (float, optional): Minimum average price per night.
+            max_price (float, optional): Maximum average price per night.
+            max_results (int, optional): Maximum number of matching hotels to return. Default is 30.
+            cursor (str, optional): Resume a previous search after its last returned hotel.
 
         Returns:
             Dict: The hotel search results.
         """
+        if cursor:
+            # A cursor is used once; the next page gets a cursor of its own
+            state = _CURSORS.pop(cursor, None)
+            if state is None:
+                return {
+                    "status": "error",
+                    "message": f"Unknown or expired cursor: {cursor}. Please run the search again.",
+                    "data": None,
+                }
+            return await self._search(
+                state["payload"], state["filters"], max_results, offset=state["offset"]
+            )
+
         # 验证日期格式
         try:
             from datetime import datetime
@@ -114,6 +176,55 @@ class HotelSearch(BaseTool):
             if not isinstance(level, int) or level < 1 or level > 5:
                 raise ValueError(f"Invalid hotel level: {level}. Must be an integer between 1 and 5.")
         
+        payload, filters = self._build_query(
+            city_name, check_in_date, check_out_date, hotel_name, level_id,
+            lng, lat, distance_range, sort, min_price, max_price,
+        )
+        return await self._search(payload, filters, max_results)
+
+    async def search_table(
+        self,
+        city_name: str,
+        check_in_date: str,
+        check_out_date: str,
+        hotel_name: str = "",
+        level_id: List[int] = [1, 2, 3, 4, 5],
+        lng: str = "",
+        lat: str = "",
+        distance_range: str = "10000",
+        sort: int = 0,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        max_results: int = 30,
+    ) -> TravelTable:
+        """
+        Search hotels and return the unrendered result table.
+
+        Returns:
+            TravelTable: Up to max_results matching hotels, in HOTEL_COLUMNS order.
+        """
+        payload, filters = self._build_query(
+            city_name, check_in_date, check_out_date, hotel_name, level_id,
+            lng, lat, distance_range, sort, min_price, max_price,
+        )
+        hotels, _ = self._collect(await self._fetch(payload), filters, max_results)
+        return hotel_data_process.build_hotel_table(hotels)
+
+    @staticmethod
+    def _build_query(
+        city_name: str,
+        check_in_date: str,
+        check_out_date: str,
+        hotel_name: str,
+        level_id: List[int],
+        lng: str,
+        lat: str,
+        distance_range: str,
+        sort: int,
+        min_price: Optional[float],
+        max_price: Optional[float],
+    ) -> Tuple[Dict, Dict]:
+        """Build the API payload and the client-side filters of a search."""
         if not city_name.endswith("市"):
             city_name += "市"
         # 构建请求负载
@@ -130,13 +241,117 @@ class HotelSearch(BaseTool):
         }
         
         logger.info(f"Searching hotels in {city_name} from {check_in_date} to {check_out_date}, {payload}")
-        
+
+        filters = {
+            "level_id": level_id,
+            "min_price": min_price,
+            "max_price": max_price,
+            "max_distance": to_number(distance_range),
+        }
+        return payload, filters
+
+    async def _fetch(self, payload: Dict) -> List[Dict]:
+        """
+        Fetch the full result set of a search, without duplicate hotels.
+
+        The hotel API returns every hotel of a search under ``data.items`` in
+        one response. It documents no paging fields, so none are sent, and
+        ``_collect`` pages through this list on the client instead.
+
+        Returns:
+            List[Dict]: The raw hotel items, in server order.
+        """
+        result = await self._send_request(self._API_URL, payload)
+        data = result.get("data", {}) or {}
+        hotels = []
+        seen = set()
+        for hotel in data.get("items") or []:
+            key = self._hotel_key(hotel)
+            if key not in seen:
+                seen.add(key)
+                hotels.append(hotel)
+        return hotels
+
+    @staticmethod
+    def _hotel_key(hotel: Dict) -> Tuple:
+        """Identity of a hotel across pages."""
+        if hotel.get("didi_hotel_id"):
+            return ("id", hotel["didi_hotel_id"])
+        return ("name", hotel.get("hotel_name"), hotel.get("hotel_address"))
+
+    @staticmethod
+    def _star_level(hotel: Dict) -> Optional[int]:
+        """The star level shown in the 星级 column, e.g. 5 for "五星级" or "5"."""
+        star = (hotel.get("hotel_details") or {}).get("hotel_star")
+        if isinstance(star, str):
+            for digit, number in zip("一二三四五", "12345"):
+                star = star.replace(digit, number)
+        number = to_number(star)
+        return int(number) if number is not None else None
+
+    @staticmethod
+    def _matches(hotel: Dict, filters: Dict) -> bool:
+        """Check a raw hotel item against the client-side filters."""
+        levels = filters.get("level_id")
+        if levels:
+            # Compare with the star level as displayed; hotels showing none
+            # were already filtered by the server on level_id
+            star = HotelSearch._star_level(hotel)
+            if star is not None and star not in levels:
+                return False
+
+        min_price, max_price = filters.get("min_price"), filters.get("max_price")
+        if min_price is not None or max_price is not None:
+            price = hotel.get("price_avg") or 0
+            # A price of 0 means the hotel shows no price, so it cannot match
+            if price <= 0:
+                return False
+            if min_price is not None and price < min_price:
+                return False
+            if max_price is not None and price > max_price:
+                return False
+
+        max_distance = filters.get("max_distance")
+        if max_distance:
+            distance = to_number(hotel.get("distance"))
+            if distance is not None and distance > max_distance:
+                return False
+        return True
+
+    async def _search(
+        self,
+        payload: Dict,
+        filters: Dict,
+        max_results: int,
+        offset: int = 0,
+    ) -> Union[str, Dict]:
+        """
+        Render the matching hotels, with a cursor if more remain.
+
+        Args:
+            payload (Dict): Search payload.
+            filters (Dict): Client-side filters (level_id, price and distance bounds).
+            max_results (int): Maximum number of matching hotels to return.
+            offset (int): Position in the fetched hotel list to resume from.
+
+        Returns:
+            str: The rendered hotels, followed by a cursor line if more remain.
+        """
         try:
-            result = await self._send_request(self._API_URL, payload)
-            hotel_list = result.get("data", {}).get("items", {})
-            hotels_df = hotel_data_process.process_hotel_data(hotel_list)
-            hotels_text = hotel_data_process.df_to_text(hotels_df)
-            #print("debug...", result.get("data", {}).get("items", {}))
+            # Resuming re-reads the list, served by the request cache if enabled
+            items = await self._fetch(payload)
+            hotels, next_offset = self._collect(items, filters, max_results, offset)
+            #print("debug...", hotels)
+            hotels_text = render_search_result(
+                hotel_data_process.build_hotel_table(hotels),
+                HOTEL_SPEC,
+                self.max_result_tokens,
+            )
+            if next_offset is not None:
+                cursor = _save_cursor(
+                    {"payload": payload, "filters": filters, "offset": next_offset}
+                )
+                hotels_text += f"\n[还有更多酒店，可传入 cursor={cursor} 继续获取]"
             return hotels_text
         except Exception as e:
             logger.error(f"Hotel search failed: {str(e)}")
@@ -145,7 +360,28 @@ class HotelSearch(BaseTool):
                 "message": f"Failed to search for hotels: {str(e)}",
                 "data": None
             }
+
+    def _collect(
+        self, items: List[Dict], filters: Dict, max_results: int, offset: int = 0
+    ) -> Tuple[List[Dict], Optional[int]]:
+        """
+        Take hotels from ``offset`` on that pass the filters, up to max_results.
+
+        Returns:
+            Tuple[List[Dict], Optional[int]]: The matching hotels and the
+            offset a cursor resumes from, or None if the list is exhausted.
+        """
+        max_results = max(1, max_results)
+        hotels = []
+        for index in range(offset, len(items)):
+            if self._matches(items[index], filters):
+                hotels.append(items[index])
+                if len(hotels) >= max_results:
+                    next_offset = index + 1
+                    return hotels, next_offset if next_offset < len(items) else None
+        return hotels, None
     
+    @cached("hotel_search", validate=lambda tool, response: tool._validate_response(response))
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=1, max=10),
@@ -7,6 +7,7 @@ from mcp.client.sse import sse_client
 from mcp.client.stdio import stdio_client
 from mcp.types import ListToolsResult, TextContent
 
+from app.admission import mcp_calls
 from app.config import config
 from app.logger import logger
 from app.tool.base import BaseTool, ToolResult
@@ -42,7 +43,8 @@ class MCPClientTool(BaseTool):
             logger.info(
                  f"Executing tool: {self.original_name} on server '{self.server_id}' with args: {kwargs}"
             )
-            result = await self.session.call_tool(self.original_name, kwargs)
+            async with mcp_calls:
+                result = await self.session.call_tool(self.original_name, kwargs)
             content_str = ", ".join(
                 item.text for item in result.content if isinstance(item, TextContent)
             )
@@ -0,0 +1,285 @@
+"""Storage for the plans managed by the planning tool.
+
+A plan store holds the plans of one namespace, normally one flow, so
+concurrent flows never see each other's plans. ``MemoryPlanStore`` keeps a
+bounded number of plans and evicts the least recently used one;
+``SqlitePlanStore`` persists plans so a long flow can be resumed by creating
+a new flow with the same namespace and plan ID.
+
+Plans are dicts with ``plan_id``, ``title``, ``steps``, ``step_statuses``,
+``step_notes`` and ``step_dependencies``. Step updates go through
+``set_step``, which changes a single step in place.
+"""
+import json
+import os
+import sqlite3
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from app.config import config
+from app.logger import logger
+
+
+class PlanStore(ABC):
+    """Plans of one namespace, with read access like a dict of plan ID to plan."""
+
+    def __init__(self, namespace: Optional[str] = None):
+        self.namespace = namespace or uuid.uuid4().hex
+
+    @abstractmethod
+    def load(self, plan_id: str) -> Optional[Dict]:
+        """Return the plan, or None if it does not exist."""
+
+    @abstractmethod
+    def save(self, plan: Dict) -> None:
+        """Create or replace a whole plan."""
+
+    @abstractmethod
+    def remove(self, plan_id: str) -> bool:
+        """Delete a plan, returning whether it existed."""
+
+    @abstractmethod
+    def plan_ids(self) -> List[str]:
+        """IDs of the plans in this namespace."""
+
+    @abstractmethod
+    def set_step(
+        self,
+        plan_id: str,
+        step_index: int,
+        status: Optional[str] = None,
+        notes: Optional[str] = None,
+    ) -> None:
+        """Update the status and/or notes of one step."""
+
+    def __contains__(self, plan_id: str) -> bool:
+        return self.load(plan_id) is not None
+
+    def __getitem__(self, plan_id: str) -> Dict:
+        plan = self.load(plan_id)
+        if plan is None:
+            raise KeyError(plan_id)
+        return plan
+
+    def get(self, plan_id: str, default: Optional[Dict] = None) -> Optional[Dict]:
+        plan = self.load(plan_id)
+        return default if plan is None else plan
+
+    def items(self) -> List[Tuple[str, Dict]]:
+        return [
+            (plan_id, plan)
+            for plan_id in self.plan_ids()
+            if (plan := self.load(plan_id)) is not None
+        ]
+
+    def __len__(self) -> int:
+        return len(self.plan_ids())
+
+    def __bool__(self) -> bool:
+        return bool(self.plan_ids())
+
+
+class MemoryPlanStore(PlanStore):
+    """In-memory plans, keeping at most ``max_plans`` recently used ones."""
+
+    def __init__(self, namespace: Optional[str] = None, max_plans: int = 64):
+        super().__init__(namespace)
+        self.max_plans = max(1, max_plans)
+        self._plans: "OrderedDict[str, Dict]" = OrderedDict()
+
+    def load(self, plan_id: str) -> Optional[Dict]:
+        plan = self._plans.get(plan_id)
+        if plan is not None:
+            self._plans.move_to_end(plan_id)
+        return plan
+
+    def save(self, plan: Dict) -> None:
+        self._plans[plan["plan_id"]] = plan
+        self._plans.move_to_end(plan["plan_id"])
+        while len(self._plans) > self.max_plans:
+            evicted, _ = self._plans.popitem(last=False)
+            logger.info(f"Evicted plan {evicted} from plan store {self.namespace}")
+
+    def remove(self, plan_id: str) -> bool:
+        return self._plans.pop(plan_id, None) is not None
+
+    def plan_ids(self) -> List[str]:
+        return list(self._plans)
+
+    def set_step(
+        self,
+        plan_id: str,
+        step_index: int,
+        status: Optional[str] = None,
+        notes: Optional[str] = None,
+    ) -> None:
+        plan = self[plan_id]
+        if status:
+            plan["step_statuses"][step_index] = status
+        if notes:
+            plan["step_notes"][step_index] = notes
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS plans (
+    namespace TEXT NOT NULL,
+    plan_id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    step_dependencies TEXT,
+    updated REAL NOT NULL,
+    PRIMARY KEY (namespace, plan_id)
+);
+CREATE TABLE IF NOT EXISTS plan_steps (
+    namespace TEXT NOT NULL,
+    plan_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    status TEXT NOT NULL,
+    notes TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (namespace, plan_id, idx)
+);
+"""
+
+
+_connections: Dict[Tuple[int, Path], sqlite3.Connection] = {}
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    """The process's connection to a plan database, opened on first use."""
+    path = Path(path).resolve()
+    key = (os.getpid(), path)
+    if key not in _connections:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(path, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.executescript(_SCHEMA)
+        _connections[key] = db
+    return _connections[key]
+
+
+class SqlitePlanStore(PlanStore):
+    """Plans persisted in sqlite, with an in-memory cache of recently used ones.
+
+    Each step is its own row, so a status update writes one row. All calls
+    are short synchronous transactions made from the event loop thread, so
+    the stores of every flow share one connection per database file and
+    process; the namespace keeps their plans apart.
+    """
+
+    def __init__(self, path: Path, namespace: Optional[str] = None, max_cached: int = 64):
+        super().__init__(namespace)
+        self._db = _connect(path)
+        self._cache = MemoryPlanStore(self.namespace, max_cached)
+
+    def load(self, plan_id: str) -> Optional[Dict]:
+        plan = self._cache.load(plan_id)
+        if plan is not None:
+            return plan
+        row = self._db.execute(
+            "SELECT title, step_dependencies FROM plans WHERE namespace = ? AND plan_id = ?",
+            (self.namespace, plan_id),
+        ).fetchone()
+        if row is None:
+            return None
+        steps = self._db.execute(
+            "SELECT text, status, notes FROM plan_steps "
+            "WHERE namespace = ? AND plan_id = ? ORDER BY idx",
+            (self.namespace, plan_id),
+        ).fetchall()
+        plan = {
+            "plan_id": plan_id,
+            "title": row[0],
+            "steps": [step[0] for step in steps],
+            "step_statuses": [step[1] for step in steps],
+            "step_notes": [step[2] for step in steps],
+            "step_dependencies": json.loads(row[1]) if row[1] else None,
+        }
+        self._cache.save(plan)
+        return plan
+
+    def save(self, plan: Dict) -> None:
+        key = (self.namespace, plan["plan_id"])
+        dependencies = plan.get("step_dependencies")
+        with self._db:
+            self._db.execute("BEGIN")
+            self._db.execute(
+                "INSERT OR REPLACE INTO plans VALUES (?, ?, ?, ?, ?)",
+                (
+                    *key,
+                    plan["title"],
+                    json.dumps(dependencies) if dependencies is not None else None,
+                    time.time(),
+                ),
+            )
+            self._db.execute(
+                "DELETE FROM plan_steps WHERE namespace = ? AND plan_id = ?", key
+            )
+            self._db.executemany(
+                "INSERT INTO plan_steps VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (*key, i, text, status, notes or "")
+                    for i, (text, status, notes) in enumerate(
+                        zip(plan["steps"], plan["step_statuses"], plan["step_notes"])
+                    )
+                ],
+            )
+        self._cache.save(plan)
+
+    def remove(self, plan_id: str) -> bool:
+        key = (self.namespace, plan_id)
+        self._cache.remove(plan_id)
+        with self._db:
+            self._db.execute("BEGIN")
+            cursor = self._db.execute(
+                "DELETE FROM plans WHERE namespace = ? AND plan_id = ?", key
+            )
+            self._db.execute(
+                "DELETE FROM plan_steps WHERE namespace = ? AND plan_id = ?", key
+            )
+        return cursor.rowcount > 0
+
+    def plan_ids(self) -> List[str]:
+        rows = self._db.execute(
+            "SELECT plan_id FROM plans WHERE namespace = ? ORDER BY updated",
+            (self.namespace,),
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def set_step(
+        self,
+        plan_id: str,
+        step_index: int,
+        status: Optional[str] = None,
+        notes: Optional[str] = None,
+    ) -> None:
+        plan = self[plan_id]
+        self._cache.set_step(plan_id, step_index, status, notes)
+        self._db.execute(
+            "UPDATE plan_steps SET status = ?, notes = ? "
+            "WHERE namespace = ? AND plan_id = ? AND idx = ?",
+            (
+                plan["step_statuses"][step_index],
+                plan["step_notes"][step_index],
+                self.namespace,
+                plan_id,
+                step_index,
+            ),
+        )
+
+    def close(self) -> None:
+        """Drop the cached plans; the shared connection stays open for other flows."""
+        self._cache = MemoryPlanStore(self.namespace, self._cache.max_plans)
+
+
+def create_plan_store(namespace: Optional[str] = None) -> PlanStore:
+    """Build a plan store from the ``[runflow]`` configuration."""
+    settings = config.run_flow_config
+    if settings.plan_store_path:
+        return SqlitePlanStore(
+            settings.plan_store_path, namespace, max_cached=settings.max_cached_plans
+        )
+    return MemoryPlanStore(namespace, max_plans=settings.max_cached_plans)
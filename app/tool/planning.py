@@ -1,8 +1,11 @@
 # tool/planning.py
 from typing import Dict, List, Literal, Optional
 
+from pydantic import Field
+
 from app.exceptions import ToolError
 from app.tool.base import BaseTool, ToolResult
+from app.tool.plan_store import MemoryPlanStore, PlanStore
 
 
 _PLANNING_TOOL_DESCRIPTION = """
@@ -48,6 +51,13 @@ class PlanningTool(BaseTool):
                 "type": "array",
                 "items": {"type": "string"},
             },
+            "step_dependencies": {
+                "description": "Dependencies of each step, as a list with one entry per step: the 0-based indices of earlier steps that must be completed first. "
+                "Independent steps (e.g. searching hotels and searching flights) should not depend on each other so they can run in parallel. "
+                "Optional for create and update commands; by default every step depends on the previous one.",
+                "type": "array",
+                "items": {"type": "array", "items": {"type": "integer"}},
+            },
             "step_index": {
                 "description": "Index of the step to update (0-based). Required for mark_step command.",
                 "type": "integer",
@@ -66,9 +76,15 @@ class PlanningTool(BaseTool):
         "additionalProperties": False,
     }
 
-    plans: dict = {}  # Dictionary to store plans by plan_id
+    # Plans of this tool's namespace; pass a shared store to resume plans
+    store: PlanStore = Field(default_factory=MemoryPlanStore)
     _current_plan_id: Optional[str] = None  # Track the current active plan
 
+    @property
+    def plans(self) -> PlanStore:
+        """Plans by plan_id (read access; changes go through the tool)."""
+        return self.store
+
     async def execute(
         self,
         *,
@@ -78,6 +94,7 @@ class PlanningTool(BaseTool):
         plan_id: Optional[str] = None,
         title: Optional[str] = None,
         steps: Optional[List[str]] = None,
+        step_dependencies: Optional[List[List[int]]] = None,
         step_index: Optional[int] = None,
         step_status: Optional[
             Literal["not_started", "in_progress", "completed", "blocked"]
@@ -93,15 +110,16 @@ class PlanningTool(BaseTool):
         - plan_id: Unique identifier for the plan
         - title: Title for the plan (used with create command)
         - steps: List of steps for the plan (used with create command)
+        - step_dependencies: Indices of the earlier steps each step depends on (used with create and update commands)
         - step_index: Index of the step to update (used with mark_step command)
         - step_status: Status to set for a step (used with mark_step command)
         - step_notes: Additional notes for a step (used with mark_step command)
         """
 
         if command == "create":
-            return self._create_plan(plan_id, title, steps)
+            return self._create_plan(plan_id, title, steps, step_dependencies)
         elif command == "update":
-            return self._update_plan(plan_id, title, steps)
+            return self._update_plan(plan_id, title, steps, step_dependencies)
         elif command == "list":
             return self._list_plans()
         elif command == "get":
@@ -118,7 +136,11 @@ class PlanningTool(BaseTool):
             )
 
     def _create_plan(
-        self, plan_id: Optional[str], title: Optional[str], steps: Optional[List[str]]
+        self,
+        plan_id: Optional[str],
+        title: Optional[str],
+        steps: Optional[List[str]],
+        step_dependencies: Optional[List[List[int]]] = None,
     ) -> ToolResult:
         """Create a new plan with the given ID, title, and steps."""
         if not plan_id:
@@ -148,9 +170,10 @@ class PlanningTool(BaseTool):
             "steps": steps,
             "step_statuses": ["not_started"] * len(steps),
             "step_notes": [""] * len(steps),
+            "step_dependencies": self._validate_dependencies(steps, step_dependencies),
         }
 
-        self.plans[plan_id] = plan
+        self.store.save(plan)
         self._current_plan_id = plan_id  # Set as active plan
 
         return ToolResult(
@@ -158,7 +181,11 @@ class PlanningTool(BaseTool):
         )
 
     def _update_plan(
-        self, plan_id: Optional[str], title: Optional[str], steps: Optional[List[str]]
+        self,
+        plan_id: Optional[str],
+        title: Optional[str],
+        steps: Optional[List[str]],
+        step_dependencies: Optional[List[List[int]]] = None,
     ) -> ToolResult:
         """Update an existing plan with new title or steps."""
         if not plan_id:
@@ -201,11 +228,55 @@ class PlanningTool(BaseTool):
             plan["steps"] = steps
             plan["step_statuses"] = new_statuses
             plan["step_notes"] = new_notes
+            if step_dependencies is None and steps != old_steps:
+                # Dependencies refer to step positions, so they no longer apply
+                plan["step_dependencies"] = self._validate_dependencies(steps, None)
+
+        if step_dependencies is not None:
+            plan["step_dependencies"] = self._validate_dependencies(
+                plan["steps"], step_dependencies
+            )
 
+        self.store.save(plan)
         return ToolResult(
             output=f"Plan updated successfully: {plan_id}\n\n{self._format_plan(plan)}"
         )
 
+    @staticmethod
+    def _validate_dependencies(
+        steps: List[str], step_dependencies: Optional[List[List[int]]]
+    ) -> List[List[int]]:
+        """Check step dependencies, defaulting to a sequential chain."""
+        if step_dependencies is None:
+            return [[i - 1] if i else [] for i in range(len(steps))]
+
+        if not isinstance(step_dependencies, list) or len(step_dependencies) != len(
+            steps
+        ):
+            raise ToolError(
+                "Parameter `step_dependencies` must have one list of step indices per step"
+            )
+
+        dependencies = []
+        for i, deps in enumerate(step_dependencies):
+            if not isinstance(deps, list) or not all(
+                isinstance(dep, int) and 0 <= dep < i for dep in deps
+            ):
+                valid = f"indices 0 to {i - 1}" if i else "none for the first step"
+                raise ToolError(
+                    f"Invalid dependencies for step {i}: {deps}. Steps can only depend on earlier steps ({valid})."
+                )
+            dependencies.append(sorted(set(deps)))
+        return dependencies
+
+    @staticmethod
+    def get_dependencies(plan: Dict) -> List[List[int]]:
+        """Step dependencies of a plan; plans created without them run sequentially."""
+        dependencies = plan.get("step_dependencies")
+        if dependencies is None or len(dependencies) != len(plan["steps"]):
+            return [[i - 1] if i else [] for i in range(len(plan["steps"]))]
+        return dependencies
+
     def _list_plans(self) -> ToolResult:
         """List all available plans."""
         if not self.plans:
@@ -276,7 +347,25 @@ class PlanningTool(BaseTool):
         if step_index is None:
             raise ToolError("Parameter `step_index` is required for command: mark_step")
 
-        plan = self.plans[plan_id]
+        plan = self.set_step_status(plan_id, step_index, step_status, step_notes)
+        return ToolResult(
+            output=f"Step {step_index} updated in plan '{plan_id}'.\n\n{self._format_plan(plan)}"
+        )
+
+    def set_step_status(
+        self,
+        plan_id: str,
+        step_index: int,
+        step_status: Optional[str] = None,
+        step_notes: Optional[str] = None,
+    ) -> Dict:
+        """Update one step without rendering the plan, returning the plan.
+
+        Used by flows tracking progress; only the changed step is written.
+        """
+        plan = self.store.load(plan_id)
+        if plan is None:
+            raise ToolError(f"No plan found with ID: {plan_id}")
 
         if step_index < 0 or step_index >= len(plan["steps"]):
             raise ToolError(
@@ -293,15 +382,8 @@ class PlanningTool(BaseTool):
                 f"Invalid step_status: {step_status}. Valid statuses are: not_started, in_progress, completed, blocked"
             )
 
-        if step_status:
-            plan["step_statuses"][step_index] = step_status
-
-        if step_notes:
-            plan["step_notes"][step_index] = step_notes
-
-        return ToolResult(
-            output=f"Step {step_index} updated in plan '{plan_id}'.\n\n{self._format_plan(plan)}"
-        )
+        self.store.set_step(plan_id, step_index, step_status, step_notes)
+        return plan
 
     def _delete_plan(self, plan_id: Optional[str]) -> ToolResult:
         """Delete a plan."""
@@ -311,7 +393,7 @@ class PlanningTool(BaseTool):
         if plan_id not in self.plans:
             raise ToolError(f"No plan found with ID: {plan_id}")
 
-        del self.plans[plan_id]
+        self.store.remove(plan_id)
 
         # If the deleted plan was the active plan, clear the active plan
         if self._current_plan_id == plan_id:
@@ -345,7 +427,8 @@ class PlanningTool(BaseTool):
         output += f"Status: {completed} completed, {in_progress} in progress, {blocked} blocked, {not_started} not started\n\n"
         output += "Steps:\n"
 
-        # Add each step with its status and notes
+        # Add each step with its status, notes and any non-sequential dependencies
+        dependencies = self.get_dependencies(plan)
         for i, (step, status, notes) in enumerate(
             zip(plan["steps"], plan["step_statuses"], plan["step_notes"])
         ):
@@ -357,6 +440,9 @@ class PlanningTool(BaseTool):
             }.get(status, "[ ]")
 
             output += f"{i}. {status_symbol} {step}\n"
+            if dependencies[i] != ([i - 1] if i else []):
+                after = ", ".join(map(str, dependencies[i])) or "none"
+                output += f"   Depends on: {after}\n"
             if notes:
                 output += f"   Notes: {notes}\n"
 
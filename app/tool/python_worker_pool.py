@@ -0,0 +1,253 @@
+"""Persistent pool of Python worker processes used by PythonExecute."""
+import asyncio
+import atexit
+import importlib
+import multiprocessing
+import sys
+import threading
+from io import StringIO
+from multiprocessing.connection import Connection
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from app.logger import logger
+
+
+def _worker_main(conn: Connection, preload: Tuple[str, ...]) -> None:
+    """Worker process loop: import common libraries once, then run code sent over the pipe."""
+    for module in preload:
+        try:
+            importlib.import_module(module)
+        except Exception:
+            pass
+
+    builtins = __builtins__ if isinstance(__builtins__, dict) else __builtins__.__dict__
+    while True:
+        try:
+            code = conn.recv()
+        except (EOFError, OSError):
+            break
+        if code is None:
+            break
+
+        # Every task gets fresh globals; pre-imported modules stay in sys.modules
+        safe_globals = {"__builtins__": builtins.copy()}
+        original_stdout = sys.stdout
+        try:
+            output_buffer = StringIO()
+            sys.stdout = output_buffer
+            exec(code, safe_globals, safe_globals)
+            result = {"observation": output_buffer.getvalue(), "success": True}
+        except BaseException as e:
+            result = {"observation": str(e), "success": False}
+        finally:
+            sys.stdout = original_stdout
+
+        try:
+            conn.send(result)
+        except (EOFError, OSError):
+            break
+    conn.close()
+
+
+class _Worker:
+    """A single worker process and the parent end of its pipe."""
+
+    def __init__(self, preload: Tuple[str, ...]):
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(
+            target=_worker_main, args=(child_conn, preload), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.tasks = 0
+        # Cleared while a thread polls the pipe, which must not be closed under it
+        self.not_polling = threading.Event()
+        self.not_polling.set()
+
+    def is_alive(self) -> bool:
+        return self.process.is_alive()
+
+    def poll(self, timeout: float) -> bool:
+        """Wait up to ``timeout`` seconds for a result; runs in an executor thread."""
+        try:
+            return self.conn.poll(timeout)
+        finally:
+            self.not_polling.set()
+
+    def stop(self) -> None:
+        """Ask the worker to exit, killing it if it does not."""
+        try:
+            self.conn.send(None)
+        except (EOFError, OSError):
+            pass
+        self.process.join(1)
+        self.kill()
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(1)
+        # The dead worker closed its end, so a pending poll returns at once;
+        # the bound covers a poll that was queued but never started
+        self.not_polling.wait(5)
+        self.conn.close()
+
+
+class PythonWorkerPool:
+    """Pool of pre-forked Python worker processes.
+
+    Workers import ``preload`` modules once at startup, receive code and send
+    results back over pipes, are killed and replaced when a call times out,
+    and are recycled after ``max_tasks_per_worker`` calls. Starting, stopping
+    and killing workers blocks, so it runs in executor threads, never on the
+    event loop.
+
+    Attributes:
+        size: Maximum number of concurrently running workers.
+        max_tasks_per_worker: Calls served before a worker is recycled.
+        preload: Modules imported by every worker before serving calls.
+    """
+
+    def __init__(
+        self,
+        size: int = 4,
+        max_tasks_per_worker: int = 50,
+        preload: Tuple[str, ...] = (),
+    ):
+        self.size = size
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.preload = tuple(preload)
+        self._idle: List[_Worker] = []
+        self._lock = threading.Lock()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Recycling and replacement still running in executor threads
+        self._background: Set[asyncio.Future] = set()
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._loop is not loop:
+            self._slots = asyncio.Semaphore(self.size)
+            self._loop = loop
+        return self._slots
+
+    def _acquire(self) -> _Worker:
+        with self._lock:
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.is_alive():
+                    return worker
+                worker.kill()
+        return _Worker(self.preload)
+
+    def _add_idle(self, worker: _Worker) -> None:
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(worker)
+                return
+        worker.stop()
+
+    def _release(self, worker: _Worker) -> None:
+        """Replace a worker that is used up or dead with a fresh one."""
+        worker.stop()
+        self._add_idle(_Worker(self.preload))
+
+    def _replace(self, worker: _Worker) -> None:
+        """Kill a stuck or broken worker and warm up a replacement."""
+        worker.kill()
+        self._add_idle(_Worker(self.preload))
+
+    def _in_background(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        func: Callable[[_Worker], None],
+        worker: _Worker,
+    ) -> None:
+        """Run ``func(worker)`` in an executor thread, logging any failure."""
+        future = loop.run_in_executor(None, func, worker)
+        self._background.add(future)
+        future.add_done_callback(self._background_done)
+
+    def _background_done(self, future: asyncio.Future) -> None:
+        self._background.discard(future)
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            # The pool is one worker short until the next call starts one
+            logger.error(f"Failed to replace a Python worker: {error!r}")
+
+    async def execute(self, code: str, timeout: float) -> Dict:
+        """Run code in a pooled worker.
+
+        Args:
+            code: Python source to execute.
+            timeout: Execution timeout in seconds.
+
+        Returns:
+            Dict with 'observation' (captured stdout or error) and 'success'.
+        """
+        loop = asyncio.get_running_loop()
+        async with self._get_slots():
+            # May start a worker process
+            worker = await loop.run_in_executor(None, self._acquire)
+            try:
+                worker.conn.send(code)
+                worker.not_polling.clear()
+                ready = await loop.run_in_executor(None, worker.poll, timeout)
+                if not ready:
+                    self._in_background(loop, self._replace, worker)
+                    return {
+                        "observation": f"Execution timeout after {timeout} seconds",
+                        "success": False,
+                    }
+                result = worker.conn.recv()
+            except asyncio.CancelledError:
+                self._in_background(loop, self._replace, worker)
+                raise
+            except (EOFError, OSError) as e:
+                logger.warning(f"Python worker exited unexpectedly: {e}")
+                self._in_background(loop, self._replace, worker)
+                return {
+                    "observation": "Python worker exited unexpectedly",
+                    "success": False,
+                }
+
+            worker.tasks += 1
+            if worker.tasks < self.max_tasks_per_worker and worker.is_alive():
+                with self._lock:
+                    self._idle.append(worker)
+            else:
+                # Recycle in the background, off the event loop
+                self._in_background(loop, self._release, worker)
+            return result
+
+    def shutdown(self) -> None:
+        """Stop all idle workers."""
+        with self._lock:
+            workers, self._idle = self._idle, []
+        for worker in workers:
+            worker.stop()
+
+
+_pools: Dict[Tuple[str, ...], PythonWorkerPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_worker_pool(preload: Tuple[str, ...] = ()) -> PythonWorkerPool:
+    """Get the process-wide worker pool for a given set of preloaded modules."""
+    key = tuple(preload)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = PythonWorkerPool(
+                size=min(4, multiprocessing.cpu_count()), preload=key
+            )
+        return _pools[key]
+
+
+@atexit.register
+def _shutdown_pools() -> None:
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.shutdown()
@@ -1,8 +1,34 @@
-from app.tool.search.baidu_search import BaiduSearchEngine
+from functools import lru_cache
+
+from app.lazy import lazy_exports
 from app.tool.search.base import WebSearchEngine
-from app.tool.search.bing_search import BingSearchEngine
-from app.tool.search.duckduckgo_search import DuckDuckGoSearchEngine
-from app.tool.search.google_search import GoogleSearchEngine
+from app.tool.search.executor import SearchExecutor, SearchTimeoutError
+
+
+# Engine modules import their SDK at module level, so they are loaded by
+# name when an engine is first used
+_EXPORTS = {
+    "BaiduSearchEngine": "app.tool.search.baidu_search",
+    "BingSearchEngine": "app.tool.search.bing_search",
+    "DuckDuckGoSearchEngine": "app.tool.search.duckduckgo_search",
+    "GoogleSearchEngine": "app.tool.search.google_search",
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+# Engine name (as in [search] engine / fallback_engines) -> engine class
+SEARCH_ENGINES = {
+    "google": "GoogleSearchEngine",
+    "baidu": "BaiduSearchEngine",
+    "duckduckgo": "DuckDuckGoSearchEngine",
+    "bing": "BingSearchEngine",
+}
+
+
+@lru_cache(maxsize=None)
+def get_search_engine(name: str) -> WebSearchEngine:
+    """Shared engine instance by name, importing its module on first use."""
+    return __getattr__(SEARCH_ENGINES[name])()
 
 
 __all__ = [
@@ -11,4 +37,8 @@ __all__ = [
     "DuckDuckGoSearchEngine",
     "GoogleSearchEngine",
     "BingSearchEngine",
+    "SearchExecutor",
+    "SearchTimeoutError",
+    "SEARCH_ENGINES",
+    "get_search_engine",
 ]
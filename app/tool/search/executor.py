@@ -0,0 +1,211 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.logger import logger
+
+
+class SearchTimeoutError(Exception):
+    """Raised when a search engine call exceeds its per-call timeout."""
+
+
+@dataclass
+class EngineStats:
+    """Execution metrics collected for a single search engine."""
+
+    calls: int = 0
+    started: int = 0
+    executed: int = 0
+    completed: int = 0
+    errors: int = 0
+    timeouts: int = 0
+    cancelled: int = 0
+    abandoned: int = 0
+    queue_wait_total: float = 0.0
+    queue_wait_max: float = 0.0
+    exec_time_total: float = 0.0
+    exec_time_max: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        started, executed = self.started, self.executed
+        data["queue_wait_avg"] = self.queue_wait_total / started if started else 0.0
+        data["exec_time_avg"] = self.exec_time_total / executed if executed else 0.0
+        return data
+
+
+class _EnginePool:
+    """Bounded thread pool dedicated to one search engine.
+
+    Threads cannot be killed, so a call that times out is abandoned: the
+    caller gets an error straight away while the worker thread keeps running.
+    Once abandoned calls occupy every worker, the pool is swapped for a fresh
+    one so new searches are not queued behind hung ones.
+    """
+
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.stats = EngineStats()
+        self._lock = threading.Lock()
+        self._stuck = 0
+        self._executor = self._new_executor()
+
+    def _new_executor(self) -> ThreadPoolExecutor:
+        return ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix=f"search-{self.name}"
+        )
+
+    def submit(self, fn: Callable[[], Any]) -> Tuple[Future, ThreadPoolExecutor]:
+        submitted_at = time.monotonic()
+
+        def timed() -> Any:
+            started_at = time.monotonic()
+            wait = started_at - submitted_at
+            with self._lock:
+                self.stats.started += 1
+                self.stats.queue_wait_total += wait
+                self.stats.queue_wait_max = max(self.stats.queue_wait_max, wait)
+            try:
+                return fn()
+            finally:
+                elapsed = time.monotonic() - started_at
+                with self._lock:
+                    self.stats.executed += 1
+                    self.stats.exec_time_total += elapsed
+                    self.stats.exec_time_max = max(self.stats.exec_time_max, elapsed)
+
+        with self._lock:
+            self.stats.calls += 1
+            executor = self._executor
+        return executor.submit(timed), executor
+
+    def abandon(self, future: Future, executor: ThreadPoolExecutor) -> None:
+        """Give up on a call whose worker thread is still running."""
+        with self._lock:
+            self.stats.abandoned += 1
+            if executor is not self._executor:
+                return
+            self._stuck += 1
+            stale = None
+            if self._stuck >= self.max_workers:
+                stale, self._executor = self._executor, self._new_executor()
+                self._stuck = 0
+
+        if stale is None:
+            future.add_done_callback(lambda _: self._release(executor))
+            return
+        logger.warning(
+            f"All {self.max_workers} {self.name} search workers are hung, replacing pool"
+        )
+        stale.shutdown(wait=False, cancel_futures=True)
+
+    def _release(self, executor: ThreadPoolExecutor) -> None:
+        with self._lock:
+            if executor is self._executor and self._stuck:
+                self._stuck -= 1
+
+    def record(self, outcome: str) -> None:
+        with self._lock:
+            setattr(self.stats, outcome, getattr(self.stats, outcome) + 1)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class SearchExecutor:
+    """Runs synchronous search engine SDK calls off the event loop.
+
+    Each engine gets its own sized thread pool, so a hanging engine cannot
+    starve the shared default executor or other engines. Calls honour a
+    per-call timeout, propagate asyncio cancellation to queued work and
+    record queue-wait versus execution-time metrics.
+    """
+
+    def __init__(self, max_workers: int = 4, timeout: Optional[float] = 30.0):
+        """Initializes the executor.
+
+        Args:
+            max_workers: Thread pool size per engine.
+            timeout: Default per-call timeout in seconds, None for no limit.
+        """
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._pools: Dict[str, _EnginePool] = {}
+        self._lock = threading.Lock()
+
+    def _pool(self, engine_name: str) -> _EnginePool:
+        with self._lock:
+            if engine_name not in self._pools:
+                self._pools[engine_name] = _EnginePool(engine_name, self.max_workers)
+            return self._pools[engine_name]
+
+    async def run(
+        self,
+        engine_name: str,
+        fn: Callable[..., Any],
+        *args: Any,
+        timeout: Optional[float] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """Run ``fn(*args, **kwargs)`` in the engine's pool.
+
+        Args:
+            engine_name: Name of the engine whose pool runs the call.
+            fn: Synchronous callable performing the search.
+            timeout: Per-call timeout overriding the executor default.
+
+        Returns:
+            The value returned by ``fn``.
+
+        Raises:
+            SearchTimeoutError: If the call did not finish in time.
+            asyncio.CancelledError: If the awaiting task was cancelled.
+        """
+        pool = self._pool(engine_name)
+        timeout = self.timeout if timeout is None else timeout
+        future, executor = pool.submit(lambda: fn(*args, **kwargs))
+
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            pool.record("timeouts")
+            self._abandon(pool, future, executor)
+            raise SearchTimeoutError(
+                f"{engine_name} search timed out after {timeout} seconds"
+            )
+        except asyncio.CancelledError:
+            pool.record("cancelled")
+            self._abandon(pool, future, executor)
+            raise
+        except Exception:
+            pool.record("errors")
+            raise
+
+        pool.record("completed")
+        return result
+
+    @staticmethod
+    def _abandon(
+        pool: _EnginePool, future: Future, executor: ThreadPoolExecutor
+    ) -> None:
+        # A call still waiting in the queue is dropped outright; one that is
+        # already running can only be left to finish in the background.
+        if not future.cancel() and not future.done():
+            pool.abandon(future, executor)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get per-engine execution metrics."""
+        with self._lock:
+            pools = list(self._pools.values())
+        return {pool.name: pool.stats.to_dict() for pool in pools}
+
+    def shutdown(self) -> None:
+        """Shut down all engine pools without waiting for hung calls."""
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            pool.shutdown()
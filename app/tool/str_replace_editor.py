@@ -128,11 +128,11 @@ class StrReplaceEditor(BaseTool):
         operator = self._get_operator()
 
         # Validate path and command combination
-        await self.validate_path(command, Path(path), operator)
+        is_dir = await self.validate_path(command, Path(path), operator)
 
         # Execute the appropriate command
         if command == "view":
-            result = await self.view(path, view_range, operator)
+            result = await self.view(path, view_range, operator, is_dir)
         elif command == "create":
             if file_text is None:
                 raise ToolError("Parameter `file_text` is required for command: create")
@@ -165,21 +165,26 @@ class StrReplaceEditor(BaseTool):
 
     async def validate_path(
         self, command: str, path: Path, operator: FileOperator
-    ) -> None:
-        """Validate path and command combination based on execution environment."""
+    ) -> bool:
+        """Validate path and command combination based on execution environment.
+
+        Returns whether the path is a directory, so callers need not check again.
+        """
         # Check if path is absolute
         if not path.is_absolute():
             raise ToolError(f"The path {path} is not an absolute path")
 
+        # Existence and directory checks share one round trip
+        exists, is_dir = await operator.path_status(path)
+
         # Only check if path exists for non-create commands
         if command != "create":
-            if not await operator.exists(path):
+            if not exists:
                 raise ToolError(
                     f"The path {path} does not exist. Please provide a valid path."
                 )
 
             # Check if path is a directory
-            is_dir = await operator.is_directory(path)
             if is_dir and command != "view":
                 raise ToolError(
                     f"The path {path} is a directory and only the `view` command can be used on directories"
@@ -187,21 +192,24 @@ class StrReplaceEditor(BaseTool):
 
         # Check if file exists for create command
         elif command == "create":
-            exists = await operator.exists(path)
             if exists:
                 raise ToolError(
                     f"File already exists at: {path}. Cannot overwrite files using command `create`."
                 )
 
+        return is_dir
+
     async def view(
         self,
         path: PathLike,
         view_range: Optional[List[int]] = None,
         operator: FileOperator = None,
+        is_dir: Optional[bool] = None,
     ) -> CLIResult:
         """Display file or directory content."""
         # Determine if path is a directory
-        is_dir = await operator.is_directory(path)
+        if is_dir is None:
+            is_dir = await operator.is_directory(path)
 
         if is_dir:
             # Directory handling
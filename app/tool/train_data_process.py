@@ -1,17 +1,31 @@
 import json
-import pandas as pd
 from datetime import datetime
 import re
 
-def process_train_data(json_data):
+from app.tool.travel_table import TravelTable
+
+# 输出表格的列及顺序
+TRAIN_COLUMNS = (
+    "车次", "车型", "出发城市", "到达城市", "出发站", "到达站",
+    "出发日期", "出发时间", "到达时间", "历时",
+    "二等座价格", "二等座余票", "二等座可预订",
+    "一等座价格", "一等座余票", "一等座可预订",
+    "商务座价格", "商务座余票", "商务座可预订",
+    "是否始发站", "是否终点站", "可预订"
+)
+
+# 表格中展示的座位类型（与TRAIN_COLUMNS中的顺序一致）
+SEAT_TYPES = ("二等座", "一等座", "商务座")
+
+def build_train_table(json_data):
     """
-    处理火车信息JSON数据，转换为结构化的DataFrame
+    处理火车信息JSON数据，直接生成轻量表格（不依赖pandas）
     
     Args:
         json_data (str or dict): 火车信息的JSON字符串或字典
     
     Returns:
-        pandas.DataFrame: 处理后的火车信息表格
+        TravelTable: 按TRAIN_COLUMNS排列的火车信息表格
     """
     # 如果输入是字符串，解析为Python对象
     if isinstance(json_data, str):
@@ -33,88 +47,58 @@ def process_train_data(json_data):
             timestamp = int(match.group(1)) // 1000  # 毫秒转秒
             departure_date = datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d')
     
-    # 创建存储所有火车信息的列表
-    trains = []
-    
-    # 遍历每个火车记录
+    rows = []
     for train in data.get("TrainItems", []):
         # 获取车票信息
         ticket_result = train.get("TicketResult", {})
-        ticket_items = ticket_result.get("TicketItems", [])
         
-        # 提取每种座位类型及价格
+        # 提取每种座位类型的价格、余票和可预订状态
         seats_info = {}
-        for ticket in ticket_items:
-            seat_type = ticket.get("SeatTypeName", "")
-            price = ticket.get("ShowPrice", 0)
-            inventory = ticket.get("Inventory", 0)
-            bookable = ticket.get("Bookable", False)
-            
-            # 添加到seats_info字典
-            seats_info[seat_type] = {
-                "价格": price,
-                "余票": inventory,
-                "可预订": "是" if bookable else "否"
-            }
+        for ticket in ticket_result.get("TicketItems", []):
+            seats_info[ticket.get("SeatTypeName", "")] = (
+                ticket.get("ShowPrice", 0),
+                ticket.get("Inventory", 0),
+                "是" if ticket.get("Bookable", False) else "否",
+            )
         
         # 计算行程时间
         use_time_minutes = train.get("UseTime", 0)
-        hours = use_time_minutes // 60
-        minutes = use_time_minutes % 60
-        use_time = f"{hours}时{minutes}分"
-        
-        # 整理基本信息
-        train_data = {
-            "车次": train.get("TrainName", ""),
-            "车型": train.get("TrainTypeShortName", ""),
-            "出发城市": departure_city,
-            "到达城市": arrival_city,
-            "出发站": ticket_result.get("DepartureStationName", train.get("StartStationName", "")),
-            "到达站": ticket_result.get("ArrivalStationName", train.get("EndStationName", "")),
-            "出发日期": departure_date,
-            "出发时间": ticket_result.get("DepartureTime", train.get("StartTime", "")),
-            "到达时间": ticket_result.get("ArrivalTime", train.get("EndTime", "")),
-            "历时": use_time,
-            "是否始发站": "是" if train.get("IsStartStation", False) else "否",
-            "是否终点站": "是" if train.get("IsEndStation", False) else "否",
-            "可预订": "是" if train.get("Bookable", False) else "否",
-            "支持刷卡": "是" if train.get("IsSupportCard", "") == "1" else "否"
-        }
+        use_time = f"{use_time_minutes // 60}时{use_time_minutes % 60}分"
         
-        # 添加不同座位类型的价格和余票信息
-        seat_types = ["商务座", "一等座", "二等座"]
-        for seat_type in seat_types:
-            if seat_type in seats_info:
-                train_data[f"{seat_type}价格"] = seats_info[seat_type]["价格"]
-                train_data[f"{seat_type}余票"] = seats_info[seat_type]["余票"]
-                train_data[f"{seat_type}可预订"] = seats_info[seat_type]["可预订"]
-            else:
-                train_data[f"{seat_type}价格"] = None
-                train_data[f"{seat_type}余票"] = None
-                train_data[f"{seat_type}可预订"] = "否"
-        
-        trains.append(train_data)
-    
-    # 创建DataFrame
-    df = pd.DataFrame(trains)
-    
-    # 优化列的顺序
-    columns_order = [
-        "车次", "车型", "出发城市", "到达城市", "出发站", "到达站", 
-        "出发日期", "出发时间", "到达时间", "历时", 
-        "二等座价格", "二等座余票", "二等座可预订",
-        "一等座价格", "一等座余票", "一等座可预订",
-        "商务座价格", "商务座余票", "商务座可预订",
-        "是否始发站", "是否终点站", "可预订"
-    ]
-    
-    # 确保所有列都存在
-    for col in columns_order:
-        if col not in df.columns:
-            df[col] = None
-    
-    # 返回按指定顺序排列的列
-    return df[columns_order]
+        row = [
+            train.get("TrainName", ""),
+            train.get("TrainTypeShortName", ""),
+            departure_city,
+            arrival_city,
+            ticket_result.get("DepartureStationName", train.get("StartStationName", "")),
+            ticket_result.get("ArrivalStationName", train.get("EndStationName", "")),
+            departure_date,
+            ticket_result.get("DepartureTime", train.get("StartTime", "")),
+            ticket_result.get("ArrivalTime", train.get("EndTime", "")),
+            use_time,
+        ]
+        for seat_type in SEAT_TYPES:
+            row.extend(seats_info.get(seat_type, (None, None, "否")))
+        row.extend((
+            "是" if train.get("IsStartStation", False) else "否",
+            "是" if train.get("IsEndStation", False) else "否",
+            "是" if train.get("Bookable", False) else "否",
+        ))
+        rows.append(tuple(row))
+    
+    return TravelTable(TRAIN_COLUMNS, rows)
+
+def process_train_data(json_data):
+    """
+    处理火车信息JSON数据，转换为结构化的DataFrame
+    
+    Args:
+        json_data (str or dict): 火车信息的JSON字符串或字典
+    
+    Returns:
+        pandas.DataFrame: 处理后的火车信息表格
+    """
+    return build_train_table(json_data).to_dataframe()
 
 def df_to_text(df, max_rows=None):
     """
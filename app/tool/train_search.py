@@ -5,9 +5,12 @@ import aiohttp
 import logging
 from tenacity import retry, stop_after_attempt, wait_exponential, before_log, after_log
 
+from app.cache import cached
 from app.config import config
 from app.tool.base import BaseTool
 import app.tool.train_data_process as train_data_process
+from app.tool.travel_render import TRAIN_SPEC, render_search_result
+from app.tool.travel_table import TravelTable
 
 # 设置日志记录器
 logger = logging.getLogger(__name__)
@@ -51,6 +54,9 @@ class TrainSearch(BaseTool):
         "required": ["depart_station", "arrive_station", "depart_date"],
     }
     
+    # Approximate token budget for the rendered result table
+    max_result_tokens: int = 2000
+
     _API_URL = "http://ainlp.intra.xiaojukeji.com/hotel-flight/train/search"
 
     async def execute(
@@ -101,6 +107,41 @@ class TrainSearch(BaseTool):
             except ValueError:
                 raise ValueError(f"Incorrect time format. Please use HH:MM format. Received: {depart_time_latest}")
         
+        try:
+            trains_table = await self.search_table(
+                depart_station,
+                arrive_station,
+                depart_date,
+                filter_train_type,
+                depart_time_earliest,
+                depart_time_latest,
+            )
+            return render_search_result(
+                trains_table, TRAIN_SPEC, self.max_result_tokens
+            )
+        except Exception as e:
+            logger.error(f"Train search failed: {str(e)}")
+            return {
+                "status": "error",
+                "message": f"Failed to search for trains: {str(e)}",
+                "data": None
+            }
+    
+    async def search_table(
+        self,
+        depart_station: str,
+        arrive_station: str,
+        depart_date: str,
+        filter_train_type: List[str] = ["G", "D", "T", "K", "Z"],
+        depart_time_earliest: str = "",
+        depart_time_latest: str = ""
+    ) -> TravelTable:
+        """
+        Search trains and return the unrendered result table.
+
+        Returns:
+            TravelTable: One row per train, in TRAIN_COLUMNS order.
+        """
         if depart_time_earliest.strip() == "":
             depart_time_earliest = "00:00"
         if depart_time_latest.strip() == "":
@@ -117,21 +158,11 @@ class TrainSearch(BaseTool):
         
         logger.info(f"Searching trains from {depart_station} to {arrive_station} on {depart_date}, {payload}")
         
-        try:
-            result = await self._send_request(self._API_URL, payload)
-            trains_df = train_data_process.process_train_data(result.get("data", {}))
+        result = await self._send_request(self._API_URL, payload)
+        #print("debug.....", result.get("data", {}))
+        return train_data_process.build_train_table(result.get("data", {}))
 
-
-            #print("debug.....", result.get("data", {}))
-            return train_data_process.df_to_text(trains_df)
-        except Exception as e:
-            logger.error(f"Train search failed: {str(e)}")
-            return {
-                "status": "error",
-                "message": f"Failed to search for trains: {str(e)}",
-                "data": None
-            }
-    
+    @cached("train_search", validate=lambda tool, response: tool._validate_response(response))
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=1, max=10),
@@ -0,0 +1,307 @@
+"""Token-budgeted rendering of hotel, flight and train search results.
+
+Instead of printing every row and column and letting the agent truncate the
+observation at an arbitrary character, results are ranked, low-value columns
+are dropped first, and a compact ``|``-separated table is emitted that fits a
+token budget. The full table is kept in ``RESULT_STORE`` under a result id so
+the agent can filter, sort or page through it afterwards with the
+``travel_results`` tool.
+"""
+import math
+import re
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Sequence, Tuple
+
+from app.tool.travel_table import TravelTable
+
+
+_NUMBER_PATTERN = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+def estimate_tokens(text: str) -> int:
+    """Conservative token estimate for BPE tokenizers such as cl100k.
+
+    ASCII text averages about four characters per token, while CJK characters
+    typically take one to two tokens each.
+    """
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    return math.ceil((len(text) - non_ascii) / 4 + non_ascii * 1.5)
+
+
+def to_number(value: Any) -> Optional[float]:
+    """Extract a number from a cell such as 724, "4.8" or "距您直线1.2公里"."""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return None if isinstance(value, float) and math.isnan(value) else float(value)
+    match = _NUMBER_PATTERN.search(str(value))
+    if not match:
+        return None
+    number = float(match.group())
+    # Distances are reported in either 米 or 公里; rank them in metres
+    if "公里" in str(value) or "km" in str(value).lower():
+        number *= 1000
+    return number
+
+
+def has_distance_units(values: Sequence[Any]) -> bool:
+    """Whether a column holds distances written with 米 or 公里 units."""
+    return any(
+        isinstance(v, str) and ("米" in v or "公里" in v or "km" in v.lower())
+        for v in values
+    )
+
+
+@dataclass(frozen=True)
+class RankKey:
+    """One ranking criterion.
+
+    Attributes:
+        column: Column to rank on.
+        ascending: Lower values rank first.
+        positive_only: Treat zero or negative values as missing (e.g. a price
+            of 0 meaning no price is shown).
+        numeric: Compare extracted numbers; False compares the text, which
+            orders zero-padded dates and times correctly.
+    """
+
+    column: str
+    ascending: bool = True
+    positive_only: bool = False
+    numeric: bool = True
+
+    def value(self, cell: Any) -> Any:
+        if not self.numeric:
+            return None if cell is None or cell == "" else str(cell)
+        number = to_number(cell)
+        if number is None or (self.positive_only and number <= 0):
+            return None
+        return number
+
+
+def infer_rank_key(table: TravelTable, column: str, ascending: bool = True) -> RankKey:
+    """Rank key for an arbitrary column: numeric if every cell holds one number."""
+    numeric = all(
+        isinstance(cell, (int, float))
+        or len(_NUMBER_PATTERN.findall(str(cell))) == 1
+        for cell in table.column(column)
+        if cell is not None and cell != ""
+    )
+    return RankKey(column, ascending=ascending, numeric=numeric)
+
+
+@dataclass(frozen=True)
+class RenderSpec:
+    """How one kind of travel result is ranked and trimmed.
+
+    Attributes:
+        kind: Short result kind used in result ids (hotel, flight, train).
+        columns: Columns shown by default, from most to least valuable;
+            columns at the end are dropped first when the budget is tight.
+        rank: Ranking criteria, applied lexicographically.
+        min_columns: Number of leading columns that are never dropped.
+        min_rows: Rows the renderer tries to fit before dropping columns.
+    """
+
+    kind: str
+    columns: Tuple[str, ...]
+    rank: Tuple[RankKey, ...] = ()
+    min_columns: int = 3
+    min_rows: int = 15
+
+
+HOTEL_SPEC = RenderSpec(
+    kind="hotel",
+    columns=(
+        "酒店名称", "平均价格", "评分", "距离", "酒店类型", "星级", "有库存",
+        "评价数量", "标签", "地址", "评分级别", "酒店ID", "城市", "显示价格",
+    ),
+    rank=(
+        RankKey("平均价格", positive_only=True),
+        RankKey("评分", ascending=False),
+        RankKey("距离"),
+    ),
+)
+
+FLIGHT_SPEC = RenderSpec(
+    kind="flight",
+    columns=(
+        "航班号", "价格(元)", "出发时间", "到达时间", "航空公司", "出发机场",
+        "到达机场", "舱位", "折扣", "机型", "出发城市", "到达城市",
+    ),
+    rank=(
+        RankKey("价格(元)", positive_only=True),
+        RankKey("出发时间", numeric=False),
+    ),
+)
+
+TRAIN_SPEC = RenderSpec(
+    kind="train",
+    columns=(
+        "车次", "二等座价格", "出发时间", "到达时间", "历时", "二等座余票",
+        "出发站", "到达站", "一等座价格", "一等座余票", "商务座价格",
+        "商务座余票", "车型", "可预订", "出发日期", "二等座可预订",
+        "一等座可预订", "商务座可预订", "是否始发站", "是否终点站",
+        "出发城市", "到达城市",
+    ),
+    rank=(
+        RankKey("二等座价格", positive_only=True),
+        RankKey("出发时间", numeric=False),
+    ),
+)
+
+
+def rank_rows(table: TravelTable, keys: Sequence[RankKey]) -> TravelTable:
+    """Order rows by ranking keys, missing values last for every key."""
+    keys = [key for key in keys if key.column in table.columns]
+    if not keys:
+        return table
+
+    # Stable sorts from the least to the most significant key
+    rows = list(table.rows)
+    for key in reversed(keys):
+        index = table.columns.index(key.column)
+        decorated = [(key.value(row[index]), row) for row in rows]
+        present = [item for item in decorated if item[0] is not None]
+        present.sort(key=lambda item: item[0], reverse=not key.ascending)
+        rows = [row for _, row in present]
+        rows += [row for value, row in decorated if value is None]
+    return TravelTable(table.columns, rows)
+
+
+class TravelResultStore:
+    """Keeps recent full result tables addressable by id (LRU bounded)."""
+
+    def __init__(self, max_results: int = 32):
+        self.max_results = max_results
+        self._results: "OrderedDict[str, Tuple[RenderSpec, TravelTable]]" = (
+            OrderedDict()
+        )
+
+    def put(self, spec: RenderSpec, table: TravelTable) -> str:
+        result_id = f"{spec.kind}-{uuid.uuid4().hex[:8]}"
+        self._results[result_id] = (spec, table)
+        while len(self._results) > self.max_results:
+            self._results.popitem(last=False)
+        return result_id
+
+    def get(self, result_id: str) -> Optional[Tuple[RenderSpec, TravelTable]]:
+        entry = self._results.get(result_id)
+        if entry is not None:
+            self._results.move_to_end(result_id)
+        return entry
+
+
+RESULT_STORE = TravelResultStore()
+
+
+@dataclass
+class RenderedResult:
+    """Outcome of a budgeted render."""
+
+    text: str
+    shown_rows: int
+    total_rows: int
+    columns: List[str] = field(default_factory=list)
+    dropped_columns: List[str] = field(default_factory=list)
+
+
+def render_budgeted(
+    table: TravelTable,
+    spec: RenderSpec,
+    token_budget: int,
+    result_id: Optional[str] = None,
+    offset: int = 0,
+    columns: Optional[Sequence[str]] = None,
+    rank: bool = True,
+) -> RenderedResult:
+    """Render a table within a token budget.
+
+    Rows are ranked by ``spec.rank`` (unless ``rank`` is False). Columns are
+    then dropped from the end of ``spec.columns`` until at least
+    ``spec.min_rows`` rows fit, and rows are added until the budget is used up.
+
+    Args:
+        table: Full result table.
+        spec: Ranking and column priorities.
+        token_budget: Approximate maximum tokens of the returned text.
+        result_id: Id under which the full table is stored, shown in the footer.
+        offset: Number of ranked rows to skip, for paging.
+        columns: Explicit columns to show instead of the spec's priorities.
+        rank: Whether to apply the spec's ranking.
+
+    Returns:
+        RenderedResult: Compact text plus what was shown and left out.
+    """
+    ranked = rank_rows(table, spec.rank) if rank else table
+    rows = ranked.rows[offset:]
+
+    # Columns outside the spec stay reachable through ``columns``
+    wanted = columns if columns is not None else spec.columns
+    candidates = [name for name in wanted if name in ranked.columns]
+    min_columns = min(spec.min_columns, len(candidates))
+
+    def footer(shown: int, dropped: List[str]) -> str:
+        if shown:
+            parts = [f"显示 {offset + 1}-{offset + shown} / 共 {len(table)} 条"]
+        else:
+            parts = [f"共 {len(table)} 条，第 {offset + 1} 条之后没有更多结果"]
+        if dropped:
+            parts.append(f"省略列: {', '.join(dropped)}")
+        if result_id:
+            parts.append(
+                f"完整结果 result_id={result_id}，可用 travel_results 工具筛选、排序或翻页"
+            )
+        return "[" + "；".join(parts) + "]"
+
+    def row_lines(names: List[str], sample: List[tuple]) -> List[str]:
+        text = TravelTable(ranked.columns, sample).to_csv(columns=names, sep="|")
+        return text.rstrip("\n").split("\n")
+
+    # Drop the least valuable columns until enough rows fit
+    target_rows = min(spec.min_rows, len(rows))
+    shown_columns = list(candidates)
+    while True:
+        lines = row_lines(shown_columns, rows[: max(target_rows, 1)])
+        fixed = estimate_tokens(lines[0]) + estimate_tokens(
+            footer(target_rows, candidates[len(shown_columns):])
+        )
+        row_tokens = sum(estimate_tokens(line) + 1 for line in lines[1:])
+        if fixed + row_tokens <= token_budget or len(shown_columns) <= min_columns:
+            break
+        shown_columns.pop()
+
+    dropped = [name for name in candidates if name not in shown_columns]
+    lines = row_lines(shown_columns, rows)
+    used = estimate_tokens(lines[0]) + estimate_tokens(footer(len(rows), dropped))
+    output = [lines[0]]
+    for line in lines[1:]:
+        cost = estimate_tokens(line) + 1
+        if used + cost > token_budget and len(output) > 1:
+            break
+        output.append(line)
+        used += cost
+
+    shown = len(output) - 1
+    if not shown:
+        output = []
+    output.append(footer(shown, dropped))
+    return RenderedResult(
+        text="\n".join(output),
+        shown_rows=shown,
+        total_rows=len(table),
+        columns=shown_columns,
+        dropped_columns=dropped,
+    )
+
+
+def render_search_result(
+    table: TravelTable, spec: RenderSpec, token_budget: int
+) -> str:
+    """Store a fresh search result and render it within the budget."""
+    if not len(table):
+        return "未找到符合条件的结果"
+    result_id = RESULT_STORE.put(spec, table)
+    return render_budgeted(table, spec, token_budget, result_id=result_id).text
@@ -0,0 +1,131 @@
+from typing import List, Optional
+
+from app.tool.base import BaseTool
+from app.tool.travel_render import (
+    RESULT_STORE,
+    has_distance_units,
+    infer_rank_key,
+    rank_rows,
+    render_budgeted,
+    to_number,
+)
+from app.tool.travel_table import TravelTable
+
+
+class TravelResults(BaseTool):
+    name: str = "travel_results"
+    description: str = """Filter, sort or page through the full result of an earlier hotel_search, flight_search or train_search call.
+    Search tools only show the top-ranked rows and most useful columns; their output ends with a result_id that can be passed here to see the rest."""
+    parameters: dict = {
+        "type": "object",
+        "properties": {
+            "result_id": {
+                "type": "string",
+                "description": "(required) The result_id printed at the end of a search result.",
+            },
+            "keyword": {
+                "type": "string",
+                "description": "(optional) Keep only rows where some column contains this text, e.g. an airline, station or hotel brand.",
+            },
+            "filter_column": {
+                "type": "string",
+                "description": "(optional) Numeric column to filter on with min_value / max_value, e.g. 价格(元) or 评分. For distances shown in 米 or 公里, min_value / max_value are in 公里, e.g. max_value=2 keeps 800米 and 1.9公里.",
+            },
+            "min_value": {
+                "type": "number",
+                "description": "(optional) Minimum value of filter_column.",
+            },
+            "max_value": {
+                "type": "number",
+                "description": "(optional) Maximum value of filter_column.",
+            },
+            "sort_by": {
+                "type": "string",
+                "description": "(optional) Column to sort on instead of the default ranking.",
+            },
+            "ascending": {
+                "type": "boolean",
+                "description": "(optional) Sort order for sort_by. Default is true.",
+                "default": True,
+            },
+            "columns": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "(optional) Columns to show, in order.",
+            },
+            "offset": {
+                "type": "integer",
+                "description": "(optional) Number of rows to skip, for paging. Default is 0.",
+                "default": 0,
+            },
+        },
+        "required": ["result_id"],
+    }
+
+    max_result_tokens: int = 2000
+
+    async def execute(
+        self,
+        result_id: str,
+        keyword: Optional[str] = None,
+        filter_column: Optional[str] = None,
+        min_value: Optional[float] = None,
+        max_value: Optional[float] = None,
+        sort_by: Optional[str] = None,
+        ascending: bool = True,
+        columns: Optional[List[str]] = None,
+        offset: int = 0,
+    ) -> str:
+        """
+        Query a stored travel search result.
+
+        Returns:
+            str: The matching rows rendered within the token budget.
+        """
+        entry = RESULT_STORE.get(result_id)
+        if entry is None:
+            return f"Unknown or expired result_id: {result_id}. Please run the search again."
+        spec, table = entry
+
+        if keyword:
+            table = TravelTable(
+                table.columns,
+                [row for row in table.rows if any(keyword in str(v) for v in row)],
+            )
+
+        if filter_column:
+            if filter_column not in table.columns:
+                return f"Unknown column: {filter_column}. Available columns: {', '.join(table.columns)}"
+
+            # Distance cells are compared in metres, so 米 and 公里 rows mix;
+            # the bounds are given in 公里
+            scale = 1000 if has_distance_units(table.column(filter_column)) else 1
+            low = None if min_value is None else min_value * scale
+            high = None if max_value is None else max_value * scale
+
+            def in_range(cell) -> bool:
+                value = to_number(cell)
+                return (
+                    value is not None
+                    and (low is None or value >= low)
+                    and (high is None or value <= high)
+                )
+
+            table = table.where(filter_column, in_range)
+
+        rank = True
+        if sort_by:
+            if sort_by not in table.columns:
+                return f"Unknown column: {sort_by}. Available columns: {', '.join(table.columns)}"
+            table = rank_rows(table, [infer_rank_key(table, sort_by, ascending)])
+            rank = False
+
+        return render_budgeted(
+            table,
+            spec,
+            self.max_result_tokens,
+            result_id=result_id,
+            offset=max(offset, 0),
+            columns=columns,
+            rank=rank,
+        ).text
@@ -0,0 +1,181 @@
+"""Lightweight result tables shared by the hotel, flight and train tools.
+
+Search results are kept as a tuple of column names plus a list of row tuples,
+and written straight to text, markdown or CSV. Column projection and row
+limits are applied before any cell is formatted, so a tool call never needs
+pandas or a DataFrame just to print a table. pandas is only imported by
+``to_dataframe`` for callers that still want one.
+"""
+import csv
+import io
+import math
+import unicodedata
+from typing import Any, Callable, Iterable, List, Optional, Sequence, TextIO, Tuple
+
+
+def _is_missing(value: Any) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def _cell(value: Any) -> str:
+    """Format a single cell; missing values (None / NaN) render empty."""
+    return "" if _is_missing(value) else str(value)
+
+
+def _display_width(text: str) -> int:
+    """Terminal width of text, counting wide (CJK) characters as two columns."""
+    if text.isascii():
+        return len(text)
+    return sum(2 if unicodedata.east_asian_width(ch) in "WF" else 1 for ch in text)
+
+
+class TravelTable:
+    """Column names plus row tuples, with direct streaming writers.
+
+    Attributes:
+        columns: Column names in display order.
+        rows: One tuple per record, aligned with ``columns``.
+    """
+
+    __slots__ = ("columns", "rows")
+
+    def __init__(self, columns: Sequence[str], rows: Optional[List[tuple]] = None):
+        self.columns: Tuple[str, ...] = tuple(columns)
+        self.rows: List[tuple] = rows if rows is not None else []
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __repr__(self) -> str:
+        return f"TravelTable({len(self.rows)} rows x {len(self.columns)} columns)"
+
+    @classmethod
+    def from_records(
+        cls, columns: Sequence[str], records: Iterable[dict]
+    ) -> "TravelTable":
+        """Build a table from dicts, taking ``columns`` in order (missing keys are None)."""
+        return cls(columns, [tuple(record.get(c) for c in columns) for record in records])
+
+    def column(self, name: str) -> List[Any]:
+        """Values of one column."""
+        index = self.columns.index(name)
+        return [row[index] for row in self.rows]
+
+    def select(
+        self, columns: Optional[Sequence[str]] = None, max_rows: Optional[int] = None
+    ) -> "TravelTable":
+        """Project columns and limit rows without copying cell values.
+
+        Args:
+            columns: Columns to keep, in output order; unknown names are
+                skipped. None keeps all columns.
+            max_rows: Maximum number of leading rows to keep, None for all.
+        """
+        rows = self.rows if max_rows is None else self.rows[:max_rows]
+        if columns is None:
+            return TravelTable(self.columns, rows)
+
+        names = [name for name in columns if name in self.columns]
+        indices = [self.columns.index(name) for name in names]
+        return TravelTable(names, [tuple(row[i] for i in indices) for row in rows])
+
+    def where(self, column: str, predicate: Callable[[Any], bool]) -> "TravelTable":
+        """Keep the rows whose value in ``column`` satisfies ``predicate``."""
+        index = self.columns.index(column)
+        return TravelTable(
+            self.columns, [row for row in self.rows if predicate(row[index])]
+        )
+
+    def sort(self, column: str, ascending: bool = True) -> "TravelTable":
+        """Stable sort on one column; missing values always go last."""
+        index = self.columns.index(column)
+        present = [row for row in self.rows if not _is_missing(row[index])]
+        missing = [row for row in self.rows if _is_missing(row[index])]
+        present.sort(key=lambda row: row[index], reverse=not ascending)
+        return TravelTable(self.columns, present + missing)
+
+    def write_text(
+        self,
+        out: TextIO,
+        columns: Optional[Sequence[str]] = None,
+        max_rows: Optional[int] = None,
+    ) -> None:
+        """Write a right-aligned plain text table, one line per row."""
+        table = self.select(columns, max_rows)
+        # Format and measure every cell once, then pad to the column widths
+        lines = [[(name, _display_width(name)) for name in table.columns]]
+        for row in table.rows:
+            texts = [_cell(value) for value in row]
+            lines.append([(text, _display_width(text)) for text in texts])
+
+        widths = [max(line[i][1] for line in lines) for i in range(len(table.columns))]
+        for n, line in enumerate(lines):
+            if n:
+                out.write("\n")
+            out.write(
+                " ".join(
+                    " " * (width - text_width) + text
+                    for (text, text_width), width in zip(line, widths)
+                ).rstrip()
+            )
+
+    def write_markdown(
+        self,
+        out: TextIO,
+        columns: Optional[Sequence[str]] = None,
+        max_rows: Optional[int] = None,
+    ) -> None:
+        """Write a GitHub-flavoured markdown table."""
+        table = self.select(columns, max_rows)
+
+        def escape(text: str) -> str:
+            return text.replace("|", "\\|").replace("\n", " ")
+
+        out.write("| " + " | ".join(escape(name) for name in table.columns) + " |\n")
+        out.write("|" + "|".join("---" for _ in table.columns) + "|")
+        for row in table.rows:
+            out.write("\n| " + " | ".join(escape(_cell(v)) for v in row) + " |")
+
+    def write_csv(
+        self,
+        out: TextIO,
+        columns: Optional[Sequence[str]] = None,
+        max_rows: Optional[int] = None,
+        sep: str = ",",
+    ) -> None:
+        """Write CSV with a header line."""
+        table = self.select(columns, max_rows)
+        writer = csv.writer(out, delimiter=sep, lineterminator="\n")
+        writer.writerow(table.columns)
+        for row in table.rows:
+            writer.writerow([_cell(value) for value in row])
+
+    def to_text(
+        self, columns: Optional[Sequence[str]] = None, max_rows: Optional[int] = None
+    ) -> str:
+        buffer = io.StringIO()
+        self.write_text(buffer, columns, max_rows)
+        return buffer.getvalue()
+
+    def to_markdown(
+        self, columns: Optional[Sequence[str]] = None, max_rows: Optional[int] = None
+    ) -> str:
+        buffer = io.StringIO()
+        self.write_markdown(buffer, columns, max_rows)
+        return buffer.getvalue()
+
+    def to_csv(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        max_rows: Optional[int] = None,
+        sep: str = ",",
+    ) -> str:
+        buffer = io.StringIO()
+        self.write_csv(buffer, columns, max_rows, sep)
+        return buffer.getvalue()
+
+    def to_dataframe(self):
+        """Convert to a pandas DataFrame (imports pandas on first use)."""
+        import pandas as pd
+
+        return pd.DataFrame(self.rows, columns=list(self.columns))
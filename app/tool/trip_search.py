@@ -0,0 +1,345 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from app.tool.base import BaseTool
+from app.tool.flight_columns import MINUTES_PER_DAY, MISSING_TIME, parse_clock, to_minutes
+from app.tool.flight_search import FlightSearch
+from app.tool.hotel_search import HotelSearch
+from app.tool.train_search import TrainSearch
+from app.tool.travel_render import (
+    HOTEL_SPEC,
+    RankKey,
+    RenderSpec,
+    rank_rows,
+    render_search_result,
+    to_number,
+)
+from app.tool.travel_table import TravelTable
+
+
+# 设置日志记录器
+logger = logging.getLogger(__name__)
+
+TRIP_COLUMNS = (
+    "排名", "交通", "车次/航班", "出发", "到达", "交通价格", "酒店", "酒店价格",
+    "晚数", "总价", "到店等待(小时)", "评分", "距离",
+)
+
+TRIP_SPEC = RenderSpec(
+    kind="trip",
+    columns=TRIP_COLUMNS,
+    rank=(),
+    min_columns=6,
+)
+
+# Seat classes tried in order when pricing a train
+_TRAIN_PRICE_COLUMNS = ("二等座价格", "一等座价格", "商务座价格")
+
+
+def _strip_city(city: str) -> str:
+    return city[:-1] if city.endswith("市") else city
+
+
+class _Transport:
+    """Outbound options from the train and flight searches as aligned arrays."""
+
+    def __init__(self):
+        self.mode: List[str] = []
+        self.number: List[str] = []
+        self.depart: List[str] = []
+        self.arrive: List[str] = []
+        self.depart_minutes: List[np.ndarray] = []
+        self.arrive_minutes: List[np.ndarray] = []
+        self.price: List[np.ndarray] = []
+
+    def add_trains(self, table: TravelTable) -> None:
+        if not len(table):
+            return
+        dates = table.column("出发日期")
+        depart = [f"{d} {t}" for d, t in zip(dates, table.column("出发时间"))]
+        arrive = [f"{d} {t}" for d, t in zip(dates, table.column("到达时间"))]
+        depart_minutes = to_minutes(np.array(depart, dtype=object))
+        arrive_minutes = to_minutes(np.array(arrive, dtype=object))
+        # Overnight trains arrive on a later day than they leave
+        overnight = (arrive_minutes != MISSING_TIME) & (arrive_minutes < depart_minutes)
+        arrive_minutes = np.where(overnight, arrive_minutes + MINUTES_PER_DAY, arrive_minutes)
+
+        price = np.full(len(table), np.nan)
+        for name in reversed(_TRAIN_PRICE_COLUMNS):
+            seat = np.array(
+                [to_number(v) or np.nan for v in table.column(name)], dtype=np.float64
+            )
+            price = np.where(np.isnan(seat), price, seat)
+
+        self.mode += ["火车"] * len(table)
+        self.number += table.column("车次")
+        self.depart += depart
+        self.arrive += arrive
+        self.depart_minutes.append(depart_minutes)
+        self.arrive_minutes.append(arrive_minutes)
+        self.price.append(price)
+
+    def add_flights(self, flights) -> None:
+        if not len(flights):
+            return
+        cols = flights.columns
+        self.mode += ["飞机"] * len(flights)
+        self.number += cols["flight_number"].tolist()
+        self.depart += cols["departure_time"].tolist()
+        self.arrive += cols["arrival_time"].tolist()
+        self.depart_minutes.append(cols["departure_minutes"])
+        self.arrive_minutes.append(cols["arrival_minutes"])
+        self.price.append(cols["sale_price"] / 100)
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        if not self.mode:
+            empty = np.array([], dtype=np.int64)
+            return empty, empty, np.array([], dtype=np.float64)
+        return (
+            np.concatenate(self.depart_minutes),
+            np.concatenate(self.arrive_minutes),
+            np.concatenate(self.price),
+        )
+
+
+class TripSearch(BaseTool):
+    name: str = "trip_search"
+    description: str = """Plan a trip in one call: search trains, flights and hotels concurrently for an origin, destination and date range, and return a ranked table of itineraries (outbound train or flight plus a hotel).
+    Itineraries are ranked by total cost, where travel time and waiting before hotel check-in are also charged. Use this instead of calling train_search, flight_search and hotel_search one after another."""
+    parameters: dict = {
+        "type": "object",
+        "properties": {
+            "origin_city": {
+                "type": "string",
+                "description": "(required) Departure city in chinese, e.g. 北京.",
+            },
+            "destination_city": {
+                "type": "string",
+                "description": "(required) Destination city in chinese, e.g. 上海.",
+            },
+            "depart_date": {
+                "type": "string",
+                "description": "(required) Outbound date and hotel check-in date, in format YYYY-MM-DD.",
+            },
+            "return_date": {
+                "type": "string",
+                "description": "(required) Hotel check-out date in format YYYY-MM-DD.",
+            },
+            "transport": {
+                "type": "array",
+                "items": {"type": "string", "enum": ["train", "flight"]},
+                "description": "(optional) Transport modes to consider. Default is both.",
+                "default": ["train", "flight"],
+            },
+            "earliest_departure": {
+                "type": "string",
+                "description": "(optional) Earliest outbound departure time in format HH:MM.",
+                "default": "",
+            },
+            "latest_arrival": {
+                "type": "string",
+                "description": "(optional) Latest arrival time on the depart date in format HH:MM. Default is 23:59.",
+                "default": "23:59",
+            },
+            "hotel_max_price": {
+                "type": "number",
+                "description": "(optional) Maximum hotel price per night in yuan.",
+            },
+            "hotel_level_id": {
+                "type": "array",
+                "items": {"type": "integer"},
+                "description": "(optional) Hotel star levels to consider (1-5).",
+                "default": [1, 2, 3, 4, 5],
+            },
+        },
+        "required": ["origin_city", "destination_city", "depart_date", "return_date"],
+    }
+
+    # Approximate token budget for the rendered itinerary table
+    max_result_tokens: int = 2000
+    # Candidates of each kind combined into itineraries
+    max_transports: int = 20
+    max_hotels: int = 20
+    # Itineraries listed per transport option and per hotel, so the table
+    # offers distinct choices instead of the cheapest leg paired with
+    # every other one
+    max_leg_repeats: int = 2
+    # Hotel check-in time and the value of an hour spent travelling or waiting
+    check_in_time: str = "14:00"
+    hour_cost: float = 50.0
+
+    async def execute(
+        self,
+        origin_city: str,
+        destination_city: str,
+        depart_date: str,
+        return_date: str,
+        transport: Optional[List[str]] = None,
+        earliest_departure: str = "",
+        latest_arrival: str = "23:59",
+        hotel_max_price: Optional[float] = None,
+        hotel_level_id: List[int] = [1, 2, 3, 4, 5],
+    ) -> str:
+        """
+        Search outbound transport and hotels concurrently and rank itineraries.
+
+        Returns:
+            str: The ranked itinerary table within the token budget.
+        """
+        try:
+            start = datetime.strptime(depart_date, "%Y-%m-%d")
+            end = datetime.strptime(return_date, "%Y-%m-%d")
+        except ValueError:
+            raise ValueError(
+                f"Incorrect date format. Please use YYYY-MM-DD format. Received: {depart_date}, {return_date}"
+            )
+        nights = (end - start).days
+        if nights < 1:
+            raise ValueError("return_date must be later than depart_date")
+
+        modes = set(transport or ["train", "flight"])
+        searches = {}
+        if "train" in modes:
+            searches["train"] = TrainSearch().search_table(
+                _strip_city(origin_city),
+                _strip_city(destination_city),
+                depart_date,
+                depart_time_earliest=earliest_departure,
+            )
+        if "flight" in modes:
+            searches["flight"] = FlightSearch().search_table(
+                f"{_strip_city(origin_city)}市",
+                f"{_strip_city(destination_city)}市",
+                depart_date,
+            )
+        searches["hotel"] = HotelSearch().search_table(
+            destination_city,
+            depart_date,
+            return_date,
+            level_id=hotel_level_id,
+            max_price=hotel_max_price,
+            max_results=self.max_hotels * 3,
+        )
+
+        logger.info(f"Searching trip {origin_city} -> {destination_city}, {depart_date} to {return_date}: {list(searches)}")
+        results = dict(
+            zip(searches, await asyncio.gather(*searches.values(), return_exceptions=True))
+        )
+
+        notes = []
+        for kind, result in results.items():
+            if isinstance(result, Exception):
+                logger.error(f"Trip {kind} search failed: {result}")
+                notes.append(f"{kind} 查询失败: {result}")
+
+        options = _Transport()
+        if isinstance(results.get("train"), TravelTable):
+            options.add_trains(results["train"])
+        if "flight" in results and not isinstance(results["flight"], Exception):
+            options.add_flights(results["flight"])
+        hotels = results["hotel"]
+        if isinstance(hotels, Exception) or not len(hotels) or not options.mode:
+            notes.append("未找到可组合的交通和酒店")
+            return "\n".join(notes)
+
+        itineraries = self._join(
+            options, hotels, depart_date, nights, earliest_departure, latest_arrival
+        )
+        if not len(itineraries):
+            notes.append("没有满足时间条件的行程")
+            return "\n".join(notes)
+
+        text = render_search_result(itineraries, TRIP_SPEC, self.max_result_tokens)
+        return "\n".join(notes + [text])
+
+    def _join(
+        self,
+        options: _Transport,
+        hotels: TravelTable,
+        depart_date: str,
+        nights: int,
+        earliest_departure: str,
+        latest_arrival: str,
+    ) -> TravelTable:
+        """Combine transport and hotels into itineraries ranked by total cost.
+
+        Every transport option and every hotel appears in at most
+        ``max_leg_repeats`` itineraries.
+        """
+        depart, arrive, transport_price = options.arrays()
+
+        day = np.datetime64(depart_date, "D").astype("datetime64[m]").astype(np.int64)
+        window = (
+            (arrive != MISSING_TIME)
+            & (arrive <= day + parse_clock(latest_arrival or "23:59"))
+            & ~np.isnan(transport_price)
+        )
+        if earliest_departure:
+            window &= depart >= day + parse_clock(earliest_departure)
+
+        # Cheapest feasible transport options, then the best-ranked hotels
+        candidates = np.flatnonzero(window)
+        candidates = candidates[
+            np.argsort(transport_price[candidates], kind="stable")[: self.max_transports]
+        ]
+        ranked_hotels = rank_rows(hotels, HOTEL_SPEC.rank)
+        hotel_price = np.array(
+            [RankKey("平均价格", positive_only=True).value(v) or np.nan
+             for v in ranked_hotels.column("平均价格")],
+            dtype=np.float64,
+        )
+        hotel_index = np.flatnonzero(~np.isnan(hotel_price))[: self.max_hotels]
+        if not len(candidates) or not len(hotel_index):
+            return TravelTable(TRIP_COLUMNS)
+
+        # Cost matrix: transport x hotel, charging travel and waiting hours
+        check_in = day + parse_clock(self.check_in_time)
+        travel_hours = (arrive[candidates] - depart[candidates]) / 60
+        wait_hours = np.maximum(check_in - arrive[candidates], 0) / 60
+        transport_cost = transport_price[candidates] + self.hour_cost * (
+            travel_hours + 0.5 * wait_hours
+        )
+        total = transport_cost[:, None] + hotel_price[hotel_index][None, :] * nights
+
+        order = np.argsort(total, axis=None, kind="stable")
+        t_pos, h_pos = np.unravel_index(order, total.shape)
+        # Walk pairs by cost, skipping those whose transport or hotel is
+        # already listed max_leg_repeats times
+        t_uses = np.zeros(len(candidates), dtype=np.int64)
+        h_uses = np.zeros(len(hotel_index), dtype=np.int64)
+        pairs = []
+        for t, h in zip(t_pos.tolist(), h_pos.tolist()):
+            if t_uses[t] < self.max_leg_repeats and h_uses[h] < self.max_leg_repeats:
+                t_uses[t] += 1
+                h_uses[h] += 1
+                pairs.append((t, h))
+
+        columns = ranked_hotels.columns
+        name_i, score_i, distance_i = (
+            columns.index("酒店名称"), columns.index("评分"), columns.index("距离")
+        )
+        rows = []
+        for rank, (t, h) in enumerate(pairs, start=1):
+            option = int(candidates[t])
+            hotel = ranked_hotels.rows[int(hotel_index[h])]
+            price = float(hotel_price[hotel_index[h]])
+            rows.append((
+                rank,
+                options.mode[option],
+                options.number[option],
+                options.depart[option],
+                options.arrive[option],
+                round(float(transport_price[option]), 2),
+                hotel[name_i],
+                price,
+                nights,
+                round(float(transport_price[option]) + price * nights, 2),
+                round(float(wait_hours[t]), 1),
+                hotel[score_i],
+                hotel[distance_i],
+            ))
+        return TravelTable(TRIP_COLUMNS, rows)
@@ -1,24 +1,43 @@
 import asyncio
-from typing import Any, Dict, List, Optional
-
-import requests
-from bs4 import BeautifulSoup
+import codecs
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+from urllib.parse import urlsplit
+
+import httpx
 from pydantic import BaseModel, ConfigDict, Field, model_validator
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import (
+    retry,
+    retry_if_not_exception_type,
+    stop_after_attempt,
+    wait_exponential,
+)
 
+from app.cache import cached
 from app.config import config
 from app.logger import logger
 from app.tool.base import BaseTool, ToolResult
 from app.tool.search import (
-    BaiduSearchEngine,
-    BingSearchEngine,
-    DuckDuckGoSearchEngine,
-    GoogleSearchEngine,
+    SEARCH_ENGINES,
+    SearchExecutor,
+    SearchTimeoutError,
     WebSearchEngine,
+    get_search_engine,
 )
 from app.tool.search.base import SearchItem
 
 
+# Shared by every WebSearch instance so each engine keeps one bounded pool
+SEARCH_EXECUTOR = SearchExecutor(
+    max_workers=config.search_config.engine_workers if config.search_config else 4,
+    timeout=config.search_config.engine_timeout if config.search_config else 30.0,
+)
+
+
 class SearchResult(BaseModel):
     """Represents a single search result returned by a search engine."""
 
@@ -103,11 +122,167 @@ class SearchResponse(ToolResult):
         return self
 
 
+class _HTMLTextExtractor(HTMLParser):
+    """Incremental HTML-to-text extractor.
+
+    Fed chunk by chunk while the body is streamed, it drops non-content
+    elements and stops collecting once ``max_chars`` of text is gathered.
+    """
+
+    SKIP_TAGS = frozenset(
+        {"script", "style", "header", "footer", "nav", "noscript", "template", "svg"}
+    )
+
+    def __init__(self, max_chars: int):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self._parts: List[str] = []
+        self._length = 0
+        self._skip_depth = 0
+
+    @property
+    def full(self) -> bool:
+        return self._length >= self.max_chars
+
+    def handle_starttag(self, tag: str, attrs) -> None:
+        if tag in self.SKIP_TAGS:
+            self._skip_depth += 1
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in self.SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data: str) -> None:
+        if self._skip_depth or self.full:
+            return
+        words = data.split()
+        if words:
+            text = " ".join(words)
+            self._parts.append(text)
+            self._length += len(text) + 1
+
+    def get_text(self) -> str:
+        return " ".join(self._parts)[: self.max_chars]
+
+
+@dataclass
+class _CachedPage:
+    """Extracted page text plus the validators needed to revalidate it."""
+
+    text: Optional[str]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+
 class WebContentFetcher:
-    """Utility class for fetching web content."""
+    """Utility class for fetching web content.
+
+    Pages are fetched over a pooled async HTTP client with a per-host
+    concurrency limit, streamed up to ``max_bytes`` and converted to text
+    incrementally. Extracted text is cached by URL and revalidated with
+    ETag/Last-Modified once it is older than ``cache_ttl`` seconds.
+    """
+
+    USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+    TEXT_CONTENT_TYPES = ("text/", "application/xhtml", "application/xml")
+
+    _shared: Optional["WebContentFetcher"] = None
 
-    @staticmethod
-    async def fetch_content(url: str, timeout: int = 10) -> Optional[str]:
+    def __init__(
+        self,
+        max_bytes: int = 2 * 1024 * 1024,
+        max_chars: int = 10000,
+        per_host_limit: int = 4,
+        max_connections: int = 32,
+        cache_size: int = 256,
+        cache_ttl: float = 300.0,
+    ):
+        self.max_bytes = max_bytes
+        self.max_chars = max_chars
+        self.per_host_limit = per_host_limit
+        self.max_connections = max_connections
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self._cache: "OrderedDict[str, _CachedPage]" = OrderedDict()
+        self._client: Optional[httpx.AsyncClient] = None
+        # Only hosts with requests in flight have an entry, so the dict does
+        # not grow with every host ever fetched
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self._host_users: Dict[str, int] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._closing: Set[asyncio.Future] = set()
+
+    @classmethod
+    def shared(cls) -> "WebContentFetcher":
+        """Returns the process-wide fetcher so all tools share one pool and cache."""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Returns the pooled client, rebuilding it if the event loop changed."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            if self._client is not None:
+                self._close_client(self._client, self._loop)
+            self._client = httpx.AsyncClient(
+                headers={"User-Agent": self.USER_AGENT},
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+            self._host_limits = {}
+            self._host_users = {}
+            self._loop = loop
+        return self._client
+
+    def _close_client(
+        self, client: httpx.AsyncClient, loop: Optional[asyncio.AbstractEventLoop]
+    ) -> None:
+        """Closes a replaced client's connection pool, on its own loop if that still runs."""
+
+        async def close() -> None:
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.debug(f"Failed to close replaced HTTP client: {e}")
+
+        if loop is not None and loop.is_running():
+            asyncio.run_coroutine_threadsafe(close(), loop)
+            return
+        task = asyncio.ensure_future(close())
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    @asynccontextmanager
+    async def _host_slot(self, url: str) -> AsyncIterator[None]:
+        """Holds one of the ``per_host_limit`` request slots of the URL's host."""
+        host = urlsplit(url).netloc.lower()
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.per_host_limit)
+        limit = self._host_limits[host]
+        self._host_users[host] = self._host_users.get(host, 0) + 1
+        try:
+            async with limit:
+                yield
+        finally:
+            # The dicts are reset when the client is rebuilt for a new loop
+            if self._host_limits.get(host) is limit:
+                self._host_users[host] -= 1
+                if not self._host_users[host]:
+                    del self._host_users[host]
+                    del self._host_limits[host]
+
+    def _remember(self, url: str, page: _CachedPage) -> None:
+        self._cache[url] = page
+        self._cache.move_to_end(url)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def fetch_content(self, url: str, timeout: int = 10) -> Optional[str]:
         """
         Fetch and extract the main content from a webpage.
 
@@ -118,40 +293,88 @@ class WebContentFetcher:
         Returns:
             Extracted text content or None if fetching fails
         """
-        headers = {
-            "WebSearch": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
+        cached = self._cache.get(url)
+        if cached is not None:
+            self._cache.move_to_end(url)
+            if time.monotonic() - cached.fetched_at < self.cache_ttl:
+                return cached.text
+
+        headers = {}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
 
         try:
-            # Use asyncio to run requests in a thread pool
-            response = await asyncio.get_event_loop().run_in_executor(
-                None, lambda: requests.get(url, headers=headers, timeout=timeout)
-            )
-
-            if response.status_code != 200:
-                logger.warning(
-                    f"Failed to fetch content from {url}: HTTP {response.status_code}"
-                )
-                return None
-
-            # Parse HTML with BeautifulSoup
-            soup = BeautifulSoup(response.text, "html.parser")
-
-            # Remove script and style elements
-            for script in soup(["script", "style", "header", "footer", "nav"]):
-                script.extract()
-
-            # Get text content
-            text = soup.get_text(separator="\n", strip=True)
-
-            # Clean up whitespace and limit size (100KB max)
-            text = " ".join(text.split())
-            return text[:10000] if text else None
+            client = self._get_client()
+            async with self._host_slot(url):
+                async with client.stream(
+                    "GET", url, headers=headers, timeout=timeout
+                ) as response:
+                    if response.status_code == 304 and cached is not None:
+                        cached.fetched_at = time.monotonic()
+                        return cached.text
+
+                    if response.status_code != 200:
+                        logger.warning(
+                            f"Failed to fetch content from {url}: HTTP {response.status_code}"
+                        )
+                        return None
+
+                    content_type = response.headers.get("content-type", "").lower()
+                    if content_type and not content_type.startswith(
+                        self.TEXT_CONTENT_TYPES
+                    ):
+                        logger.warning(
+                            f"Skipping non-text content from {url}: {content_type}"
+                        )
+                        return None
+
+                    text = await self._extract_text(response)
+                    self._remember(
+                        url,
+                        _CachedPage(
+                            text=text,
+                            etag=response.headers.get("etag"),
+                            last_modified=response.headers.get("last-modified"),
+                            fetched_at=time.monotonic(),
+                        ),
+                    )
+                    return text
 
         except Exception as e:
             logger.warning(f"Error fetching content from {url}: {e}")
             return None
 
+    async def _extract_text(self, response: httpx.Response) -> Optional[str]:
+        """Stream the body into the extractor until the byte or char cap is hit."""
+        try:
+            codec = codecs.lookup(response.charset_encoding or "utf-8")
+        except LookupError:
+            codec = codecs.lookup("utf-8")
+        decoder = codec.incrementaldecoder(errors="replace")
+        extractor = _HTMLTextExtractor(self.max_chars)
+        received = 0
+
+        async for chunk in response.aiter_bytes():
+            chunk = chunk[: self.max_bytes - received]
+            received += len(chunk)
+            extractor.feed(decoder.decode(chunk))
+            if received >= self.max_bytes or extractor.full:
+                break
+        else:
+            extractor.feed(decoder.decode(b"", final=True))
+
+        extractor.close()
+        return extractor.get_text() or None
+
+    async def close(self) -> None:
+        """Close the pooled HTTP client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
 
 class WebSearch(BaseTool):
     """Search the web for information using various search engines."""
@@ -190,13 +413,7 @@ class WebSearch(BaseTool):
         },
         "required": ["query"],
     }
-    _search_engine: dict[str, WebSearchEngine] = {
-        "google": GoogleSearchEngine(),
-        "baidu": BaiduSearchEngine(),
-        "duckduckgo": DuckDuckGoSearchEngine(),
-        "bing": BingSearchEngine(),
-    }
-    content_fetcher: WebContentFetcher = WebContentFetcher()
+    content_fetcher: WebContentFetcher = Field(default_factory=WebContentFetcher.shared)
 
     async def execute(
         self,
@@ -295,13 +512,21 @@ class WebSearch(BaseTool):
         failed_engines = []
 
         for engine_name in engine_order:
-            engine = self._search_engine[engine_name]
             logger.info(f"🔎 Attempting search with {engine_name.capitalize()}...")
-            search_items = await self._perform_search_with_engine(
-                engine, query, num_results, search_params
-            )
+            try:
+                search_items = await self._search_items(
+                    engine_name,
+                    query,
+                    num_results,
+                    search_params.get("lang"),
+                    search_params.get("country"),
+                )
+            except Exception as e:
+                logger.warning(f"{engine_name.capitalize()} search failed: {e}")
+                search_items = []
 
             if not search_items:
+                failed_engines.append(engine_name)
                 continue
 
             if failed_engines:
@@ -313,10 +538,10 @@ class WebSearch(BaseTool):
             return [
                 SearchResult(
                     position=i + 1,
-                    url=item.url,
-                    title=item.title
+                    url=item["url"],
+                    title=item["title"]
                     or f"Result {i+1}",  # Ensure we always have a title
-                    description=item.description or "",
+                    description=item["description"] or "",
                     source=engine_name,
                 )
                 for i, item in enumerate(search_items)
@@ -372,31 +597,52 @@ class WebSearch(BaseTool):
         )
 
         # Start with preferred engine, then fallbacks, then remaining engines
-        engine_order = [preferred] if preferred in self._search_engine else []
+        engine_order = [preferred] if preferred in SEARCH_ENGINES else []
         engine_order.extend(
             [
                 fb
                 for fb in fallbacks
-                if fb in self._search_engine and fb not in engine_order
+                if fb in SEARCH_ENGINES and fb not in engine_order
             ]
         )
-        engine_order.extend([e for e in self._search_engine if e not in engine_order])
+        engine_order.extend([e for e in SEARCH_ENGINES if e not in engine_order])
 
         return engine_order
 
+    @cached("web_search")
+    async def _search_items(
+        self,
+        engine_name: str,
+        query: str,
+        num_results: int,
+        lang: Optional[str],
+        country: Optional[str],
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Search with one engine, returning the items as dicts or None if there are none."""
+        # Imports the engine's SDK on first use; a missing SDK fails this engine only
+        engine = get_search_engine(engine_name)
+        search_items = await self._perform_search_with_engine(
+            engine_name, engine, query, num_results, {"lang": lang, "country": country}
+        )
+        return [item.model_dump() for item in search_items] or None
+
     @retry(
-        stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=1, max=10)
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=1, max=10),
+        retry=retry_if_not_exception_type(SearchTimeoutError),
+        reraise=True,
     )
     async def _perform_search_with_engine(
         self,
+        engine_name: str,
         engine: WebSearchEngine,
         query: str,
         num_results: int,
         search_params: Dict[str, Any],
     ) -> List[SearchItem]:
         """Execute search with the given engine and parameters."""
-        return await asyncio.get_event_loop().run_in_executor(
-            None,
+        return await SEARCH_EXECUTOR.run(
+            engine_name,
             lambda: list(
                 engine.perform_search(
                     query,
@@ -0,0 +1,293 @@
+"""Extraction of tool calls written into model content.
+
+Models that do not use the native ``tool_calls`` field write their calls into
+the message text in one of three shapes:
+
+- a fenced block: ```json {"function": ..., "parameters": ...} ```
+- a bare JSON object or list in the prose
+- a ``<tool_call>...</tool_call>`` tag, with ``function``/``parameters`` or
+  ``name``/``arguments`` keys, optionally wrapping a fenced block
+
+``ToolCallParser`` finds all of them in a single left-to-right scan driven by
+one precompiled pattern, and can be fed a streamed response chunk by chunk.
+Spans that yield at least one call are removed from the returned content;
+everything else, including JSON that is not a tool call, is kept verbatim.
+"""
+import json
+import re
+from typing import List, NamedTuple, Optional
+
+from app import codec
+
+
+# Literals that start a construct; str.find on them is much faster than one
+# alternation pattern. Bare JSON starts at a brace followed by a tool call key.
+_FENCE = "```"
+_TAG_START = "<tool_call>"
+_TAG_END = "</tool_call>"
+_BARE = "{"
+_BARE_KEY = re.compile(r'\{\s*"(?:function|parameters)"\s*:')
+_WHITESPACE = " \t\r\n"
+_FENCE_LANG = re.compile(r"[ \t]*([A-Za-z0-9_+-]*)")
+_TAG_OPEN = re.compile(r"\s*(?:```[ \t]*(?:json)?)?\s*")
+_TAG_CLOSE = re.compile(r"\s*(?:```)?\s*</tool_call>")
+
+# Fence languages whose body may hold tool calls
+_FENCE_LANGS = {"", "json", "tool_call"}
+
+# Characters kept unscanned at the end of a streamed buffer, enough for a
+# token and the lookahead of a bare JSON start to arrive in the next chunk
+_HOLDBACK = 32
+
+_decoder = json.JSONDecoder()
+
+
+class ParsedToolCall(NamedTuple):
+    """A tool call found in content; ``arguments`` is JSON text."""
+
+    name: str
+    arguments: str
+
+
+class ParseResult(NamedTuple):
+    calls: List[ParsedToolCall]
+    content: str
+
+
+def to_tool_call(item, tagged: bool = False) -> Optional[ParsedToolCall]:
+    """Convert a decoded JSON item to a tool call, or None if it is not one.
+
+    Items need ``function`` and ``parameters`` keys. Inside ``<tool_call>``
+    tags the ``name``/``arguments`` convention is accepted as well.
+    """
+    if not isinstance(item, dict):
+        return None
+    if "function" in item and "parameters" in item:
+        name, arguments = item["function"], item["parameters"]
+    elif tagged and "name" in item and "arguments" in item:
+        name, arguments = item["name"], item["arguments"]
+    else:
+        return None
+    if not isinstance(name, str):
+        return None
+    if not isinstance(arguments, str):
+        arguments = codec.dumps(arguments)
+    return ParsedToolCall(name, arguments)
+
+
+def _to_tool_calls(data, tagged: bool = False) -> List[ParsedToolCall]:
+    items = data if isinstance(data, list) else [data]
+    calls = []
+    for item in items:
+        call = to_tool_call(item, tagged)
+        if call is not None:
+            calls.append(call)
+    return calls
+
+
+def _bare_start(buffer: str, brace: int, pos: int) -> int:
+    """Start of the bare JSON opened at ``brace``, including a list bracket before it."""
+    bracket = brace - 1
+    while bracket >= pos and buffer[bracket] in _WHITESPACE:
+        bracket -= 1
+    return bracket if bracket >= pos and buffer[bracket] == "[" else brace
+
+
+def _has_closer(buffer: str, start: int) -> bool:
+    return buffer.find("}", start) >= 0 or buffer.find("]", start) >= 0
+
+
+class _Pending(Exception):
+    """The construct at the scan position continues in a later chunk."""
+
+
+class ToolCallParser:
+    """Incremental single-pass tool call extractor.
+
+    Call ``feed`` with each chunk of a streamed response and ``close`` once
+    it ends; both return the calls completed by that chunk. ``calls`` and
+    ``content`` hold the results so far.
+    """
+
+    def __init__(self):
+        self.calls: List[ParsedToolCall] = []
+        self._buffer = ""
+        self._pos = 0  # scan position
+        self._flushed = 0  # end of the content already copied to _parts
+        self._parts: List[str] = []
+        # Where the closing fence search of a pending block resumes
+        self._fence_search = 0
+        # Buffer length at the last failed decode of a pending JSON value
+        self._decoded_upto = 0
+        self._closed = False
+
+    @property
+    def content(self) -> str:
+        """Content with tool call spans removed, including the unscanned tail."""
+        return "".join(self._parts) + self._buffer[self._flushed:]
+
+    def feed(self, chunk: str) -> List[ParsedToolCall]:
+        if self._closed:
+            raise ValueError("Parser is closed")
+        if not chunk:
+            return []
+        self._buffer += chunk
+        return self._scan(final=False)
+
+    def close(self) -> List[ParsedToolCall]:
+        if self._closed:
+            return []
+        self._closed = True
+        return self._scan(final=True)
+
+    def result(self) -> ParseResult:
+        return ParseResult(list(self.calls), self.content.strip())
+
+    def _scan(self, final: bool) -> List[ParsedToolCall]:
+        buffer = self._buffer
+        found = []
+        # Next fence and tag: -2 before the first search, -1 once there is
+        # none left
+        marks = {_FENCE: -2, _TAG_START: -2}
+        while True:
+            start, token = self._next_token(buffer, marks)
+            if token is None:
+                if not final:
+                    self._pos = max(self._pos, len(buffer) - _HOLDBACK)
+                else:
+                    self._pos = len(buffer)
+                break
+
+            if (
+                not final
+                and token != _FENCE
+                and start == self._pos
+                and self._decoded_upto
+                and not _has_closer(buffer, self._decoded_upto)
+            ):
+                # A JSON value only completes with a closing bracket, so
+                # don't decode it again until one arrives
+                break
+            try:
+                if token == _FENCE:
+                    end, calls = self._fence(start, final)
+                elif token == _TAG_START:
+                    end, calls = self._tag(start, start + len(_TAG_START), final)
+                else:
+                    end, calls = self._bare(start, final)
+            except _Pending:
+                self._pos = start
+                if token != _FENCE:
+                    self._decoded_upto = len(buffer)
+                break
+
+            if calls:
+                # Drop the call span from the content
+                self._parts.append(buffer[self._flushed:start])
+                self._flushed = end
+                found.extend(calls)
+            self._pos = end
+            self._fence_search = 0
+            self._decoded_upto = 0
+
+        self.calls.extend(found)
+        self._compact()
+        return found
+
+    def _next_token(self, buffer: str, marks: dict):
+        """Return (start, marker) of the first construct at or after the scan position."""
+        pos = self._pos
+        best, token = len(buffer), None
+        for marker in (_FENCE, _TAG_START):
+            at = marks[marker]
+            if at < pos and at != -1:
+                at = marks[marker] = buffer.find(marker, pos)
+            if 0 <= at < best:
+                best, token = at, marker
+        # Bare JSON is only looked for before the first fence or tag, so
+        # braces inside those are never examined
+        brace = buffer.find("{", pos, best)
+        while brace >= 0:
+            if _BARE_KEY.match(buffer, brace):
+                return _bare_start(buffer, brace, pos), _BARE
+            brace = buffer.find("{", brace + 1, best)
+        return best, token
+
+    def _compact(self) -> None:
+        # Text before the scan position is final: move it out of the buffer
+        # so appending a chunk never copies the whole response
+        cut = self._pos
+        if not cut:
+            return
+        if self._flushed < cut:
+            self._parts.append(self._buffer[self._flushed:cut])
+            self._flushed = cut
+        self._buffer = self._buffer[cut:]
+        self._flushed -= cut
+        self._pos = 0
+        if self._fence_search:
+            self._fence_search -= cut
+        if self._decoded_upto:
+            self._decoded_upto -= cut
+
+    def _fence(self, start: int, final: bool):
+        buffer = self._buffer
+        lang_match = _FENCE_LANG.match(buffer, start + 3)
+        body_start = lang_match.end()
+        close = buffer.find(_FENCE, max(body_start, self._fence_search))
+        if close < 0:
+            if not final:
+                # Resume the search where a split fence could begin
+                self._fence_search = max(body_start, len(buffer) - 2)
+                raise _Pending
+            # Unclosed fence: the opening backticks are plain text
+            return start + 3, []
+        end = close + 3
+        if lang_match.group(1).lower() not in _FENCE_LANGS:
+            return end, []
+        try:
+            data = codec.loads(buffer[body_start:close].strip())
+        except (codec.JSONDecodeError, ValueError):
+            return end, []
+        return end, _to_tool_calls(data)
+
+    def _tag(self, start: int, token_end: int, final: bool):
+        buffer = self._buffer
+        json_start = _TAG_OPEN.match(buffer, token_end).end()
+        try:
+            data, json_end = _decoder.raw_decode(buffer, json_start)
+        except json.JSONDecodeError:
+            if not final:
+                raise _Pending
+            return token_end, []
+
+        close = _TAG_CLOSE.match(buffer, json_end)
+        if close is not None:
+            end = close.end()
+        else:
+            rest = buffer[json_end:].lstrip()
+            if rest.startswith(_FENCE):
+                rest = rest[3:].lstrip()
+            if not final and (_TAG_END.startswith(rest) or _FENCE.startswith(rest)):
+                # The closing tag may still be on its way
+                raise _Pending
+            end = json_end
+        calls = _to_tool_calls(data, tagged=True)
+        return (end, calls) if calls else (token_end, [])
+
+    def _bare(self, start: int, final: bool):
+        try:
+            data, end = _decoder.raw_decode(self._buffer, start)
+        except json.JSONDecodeError:
+            if not final:
+                raise _Pending
+            return start + 1, []
+        return end, _to_tool_calls(data)
+
+
+def parse_tool_calls(text: Optional[str]) -> ParseResult:
+    """Extract all tool calls from complete model content."""
+    parser = ToolCallParser()
+    parser.feed(text or "")
+    parser.close()
+    return parser.result()
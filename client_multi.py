@@ -1,95 +1,271 @@
 import argparse
+import asyncio
 import datetime
+import hashlib
 import json
+import math
 import os
-import sys
-from concurrent.futures import ThreadPoolExecutor
+import random
+import time
+from typing import Dict, List, Optional, Set
 
-import requests
+import httpx
 
 # 设置服务端地址
 BASE_URL = "http://10.191.68.172:8100"
 
+# 服务端返回这些状态码时视为过载，降低并发后重试
+RETRY_STATUS = {429, 500, 502, 503, 504}
 
-def request(data):
-    prompt_data = {"prompt": data}
-    # 发送 POST 请求到 /api/chat
-    try:
-        response = requests.post(f"{BASE_URL}/api/chat", json=prompt_data, timeout=6000)
-        if response.status_code == 200:
-            # 保存结果为 JSON 文件
-            result = response.json()
-            return result
+
+def prompt_hash(prompt: str) -> str:
+    """用于断点续跑的问题指纹"""
+    return hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:16]
+
+
+def load_prompts(input_file: str) -> List[str]:
+    """读取输入文件，每行一个问题，去掉空行和重复行"""
+    prompts = []
+    seen = set()
+    with open(input_file, "r") as f:
+        for line in f:
+            prompt = line.strip()
+            if prompt == "" or prompt in seen:
+                continue
+            seen.add(prompt)
+            prompts.append(prompt)
+    return prompts
+
+
+def load_checkpoint(output_file: str) -> Set[str]:
+    """读取已处理问题的指纹（兼容只有 problem 字段的旧结果文件）"""
+    processed = set()
+    if not os.path.exists(output_file):
+        return processed
+    with open(output_file, "r") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # 上次中断时可能留下半行
+                continue
+            processed.add(record.get("prompt_hash") or prompt_hash(record["problem"]))
+    return processed
+
+
+class AdaptiveLimiter:
+    """根据服务端错误率自动调整并发数（AIMD）
+
+    从 ``initial`` 个并发开始；请求超时、连接失败或返回过载状态码时并发数
+    减半，每个并发窗口内的请求都成功时并发数加一。请求延迟不作为过载信号：
+    agent 的运行时间随问题长短相差很大，慢不代表服务端在排队。
+    """
+
+    def __init__(
+        self,
+        min_limit: int = 1,
+        max_limit: int = 16,
+        initial: Optional[int] = None,
+    ):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        limit = self.max_limit if initial is None else initial
+        self.limit = float(min(self.max_limit, max(self.min_limit, limit)))
+        self.in_flight = 0
+        self._condition = asyncio.Condition()
+
+    @property
+    def current(self) -> int:
+        return int(self.limit)
+
+    async def acquire(self) -> None:
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.current)
+            self.in_flight += 1
+
+    async def release(self, ok: bool) -> None:
+        """归还并发名额；ok 为 False 表示超时或服务端过载"""
+        async with self._condition:
+            self.in_flight -= 1
+            self._record(ok)
+            self._condition.notify_all()
+
+    def _record(self, ok: bool) -> None:
+        if not ok:
+            self.limit = max(self.min_limit, self.limit / 2)
+        else:
+            # 每完成 limit 个请求约增加 1 个并发
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+
+class BatchStats:
+    """统计请求延迟分位数与吞吐"""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.succeeded = 0
+        self.failed = 0
+        self.skipped = 0
+        self.started = time.monotonic()
+
+    def percentile(self, q: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        # 最近秩法
+        rank = max(1, math.ceil(q / 100 * len(ordered)))
+        return ordered[rank - 1]
+
+    def summary(self, limiter: AdaptiveLimiter) -> str:
+        elapsed = time.monotonic() - self.started
+        throughput = self.succeeded / elapsed if elapsed > 0 else 0.0
+        return (
+            f"成功: {self.succeeded}，失败: {self.failed}，跳过(已处理): {self.skipped}\n"
+            f"延迟 p50: {self.percentile(50):.2f}s，p95: {self.percentile(95):.2f}s，"
+            f"p99: {self.percentile(99):.2f}s\n"
+            f"总耗时: {elapsed:.1f}s，吞吐: {throughput:.3f} 条/s，"
+            f"最终并发: {limiter.current}"
+        )
+
+
+async def request(
+    client: httpx.AsyncClient,
+    prompt: str,
+    limiter: AdaptiveLimiter,
+    stats: BatchStats,
+    retries: int,
+) -> Optional[Dict]:
+    """发送一个问题，失败或过载时退避重试，返回服务端结果或 None"""
+    for attempt in range(retries + 1):
+        await limiter.acquire()
+        start = time.monotonic()
+        # 只有超时、连接错误和过载状态码才算服务端压力
+        healthy = False
+        try:
+            response = await client.post("/api/chat", json={"prompt": prompt})
+            healthy = response.status_code not in RETRY_STATUS
+            if response.status_code == 200:
+                stats.latencies.append(time.monotonic() - start)
+                return response.json()
+            print(f"请求失败，状态码: {response.status_code}: {prompt[:30]}...")
+            if healthy:
+                return None
+        except httpx.TimeoutException:
+            print(f"请求超时: {prompt[:30]}...")
+        except httpx.HTTPError as e:
+            print(f"请求失败：{e}")
+        finally:
+            await limiter.release(healthy)
+
+        if attempt < retries:
+            await asyncio.sleep(min(60.0, 2 ** attempt) * (0.5 + random.random()))
+    return None
+
+
+async def run_batch(
+    prompts: List[str],
+    output_file: str,
+    base_url: str = BASE_URL,
+    max_workers: int = 5,
+    min_workers: int = 1,
+    initial_workers: Optional[int] = None,
+    timeout: float = 6000,
+    retries: int = 2,
+) -> BatchStats:
+    """并发处理所有未完成的问题，每完成一条立即写入结果文件
+
+    Args:
+        prompts: 待处理的问题列表
+        output_file: JSON Lines 结果文件，同时作为断点续跑的检查点
+        base_url: 服务端地址
+        max_workers: 并发上限
+        min_workers: 并发下限
+        initial_workers: 初始并发数，默认等于 max_workers，出错时再逐步收缩
+        timeout: 单个请求的超时时间（秒）
+        retries: 失败后的重试次数
+
+    Returns:
+        BatchStats: 本次运行的统计信息
+    """
+    stats = BatchStats()
+    processed = load_checkpoint(output_file)
+    pending = []
+    for prompt in prompts:
+        key = prompt_hash(prompt)
+        if key in processed:
+            stats.skipped += 1
         else:
-            print(f"请求失败，状态码: {response.status_code}")
-            return None
-    except requests.exceptions.Timeout:
-        print(f"请求超时！请稍后再试: {data[:30]}...")
-        return None
-    except requests.exceptions.RequestException as e:
-        print(f"请求失败：{e}")
-        return None
+            pending.append((key, prompt))
+
+    limiter = AdaptiveLimiter(
+        min_limit=min_workers, max_limit=max_workers, initial=initial_workers
+    )
+    limits = httpx.Limits(
+        max_connections=max_workers, max_keepalive_connections=max_workers
+    )
+
+    async with httpx.AsyncClient(
+        base_url=base_url, timeout=timeout, limits=limits
+    ) as client:
+        with open(output_file, "a") as f:
 
+            async def process(key: str, prompt: str) -> None:
+                print(f"开始处理: {prompt[:30]}...")
+                response = await request(client, prompt, limiter, stats, retries)
+                if response is None:
+                    stats.failed += 1
+                    print(f"响应为空: {prompt[:30]}...")
+                    return
+                record = {"problem": prompt, "response": response, "prompt_hash": key}
+                # 写入与 flush 之间没有 await，各协程的结果行不会交错
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                f.flush()
+                stats.succeeded += 1
 
-def process_line(line, processed):
-    line = line.strip()
-    if line in processed:
-        return None
+            # 限流在 request 内部完成，这里只限制同时处理的问题数量
+            remaining = iter(pending)
 
-    print(f"开始处理: {line[:30]}...")
-    response = request(line)
-    if response is None:
-        print(f"响应为空: {line[:30]}...")
-        return None
+            async def worker() -> None:
+                for key, prompt in remaining:
+                    await process(key, prompt)
 
-    output_json = {"problem": line, "response": response}
-    return output_json
+            await asyncio.gather(*(worker() for _ in range(max_workers)))
+
+    print(stats.summary(limiter))
+    return stats
 
 
 def main():
     parser = argparse.ArgumentParser(description="并发处理查询请求")
     parser.add_argument("--input_file", help="输入文件路径")
-    parser.add_argument("--workers", type=int, default=5, help="并发工作线程数量")
+    parser.add_argument("--workers", type=int, default=5, help="最大并发请求数")
+    parser.add_argument("--min_workers", type=int, default=1, help="最小并发请求数")
+    parser.add_argument(
+        "--initial_workers", type=int, default=None, help="初始并发请求数，默认等于 --workers"
+    )
+    parser.add_argument("--base_url", default=BASE_URL, help="服务端地址")
+    parser.add_argument("--output_file", help="结果文件路径，默认按日期命名")
+    parser.add_argument("--timeout", type=float, default=6000, help="单个请求超时（秒）")
+    parser.add_argument("--retries", type=int, default=2, help="失败重试次数")
     args = parser.parse_args()
 
     # 获取当前日期
     current_date = datetime.datetime.now().strftime("%Y%m%d")
-    output_file = f"SFT_train_data_{current_date}.json"
-    # output_file = "SFT_train_data_20250417.json"
-
-    # 读取输入文件
-    with open(args.input_file, "r") as f:
-        all_lines = f.readlines()
-        lines = []
-        for line in all_lines:
-            # line = json.loads(line)
-            prompt = line.strip()
-            if prompt == "":
-                continue
-            lines.append(prompt)
+    output_file = args.output_file or f"SFT_train_data_{current_date}.json"
 
-    # 读取已处理的数据
-    processed = set()
-    if os.path.exists(output_file):
-        with open(output_file, "r") as f:
-            for line in f:
-                try:
-                    processed.add(json.loads(line)["problem"])
-                except json.JSONDecodeError:
-                    continue
-
-    # 使用线程池并发处理
-    results = []
-    with ThreadPoolExecutor(max_workers=args.workers) as executor:
-        futures = [executor.submit(process_line, line, processed) for line in lines]
-
-        with open(output_file, "a+") as f:
-            for future in futures:
-                result = future.result()
-                if result:
-                    f.write(json.dumps(result, ensure_ascii=False) + "\n")
-                    f.flush()
-                    processed.add(result["problem"])
+    prompts = load_prompts(args.input_file)
+    asyncio.run(
+        run_batch(
+            prompts,
+            output_file,
+            base_url=args.base_url,
+            max_workers=args.workers,
+            min_workers=args.min_workers,
+            initial_workers=args.initial_workers,
+            timeout=args.timeout,
+            retries=args.retries,
+        )
+    )
 
     print(f"处理完成，结果已保存到 {output_file}")
 
@@ -0,0 +1,175 @@
+"""Micro-benchmark for flight result processing.
+
+Compares the previous row-wise pipeline (one dict per flight, ``apply`` for
+the codeshare label, ``strptime`` per row when filtering) against the current
+one (flattening with ``app.tool.flight_columns``, then the vectorized helpers
+of ``app.tool.flight_data_process``) on synthetic search responses.
+
+Usage:
+    python -m examples.benchmarks.flight_processing [--flights 500] [--repeat 20]
+"""
+import argparse
+import random
+import timeit
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from app.tool.flight_data_process import (
+    filter_flights,
+    get_cheapest_flight,
+    get_fastest_flight,
+    process_flight_data,
+    sort_flights,
+)
+
+
+AIRLINES = ["东方航空", "中国国航", "南方航空", "海南航空", "吉祥航空", "春秋航空"]
+
+
+def make_flights(count: int, seed: int = 0) -> list:
+    """Build a synthetic Beijing-Shanghai flight_list with ``count`` fares."""
+    rng = random.Random(seed)
+    day = datetime(2025, 3, 18)
+    flights = []
+    for i in range(count):
+        departure = day + timedelta(minutes=rng.randrange(6 * 60, 23 * 60, 5))
+        duration = rng.randrange(120, 180) * 60
+        arrival = departure + timedelta(seconds=duration)
+        is_share = rng.random() < 0.4
+        airline = rng.choice(AIRLINES)
+        price = rng.randrange(400, 3000) * 100
+        flight = {
+            "flight_info": {
+                "route_list": [
+                    {
+                        "departure_info": {
+                            "departure_city_name": "北京市",
+                            "departure_airport_simple_name": rng.choice(["首都", "大兴"]),
+                            "departure_terminal": rng.choice(["T2", "T3", ""]),
+                            "departure_datetime": departure.strftime("%Y-%m-%d %H:%M"),
+                        },
+                        "arrival_info": {
+                            "arrival_city_name": "上海市",
+                            "arrival_airport_simple_name": rng.choice(["虹桥", "浦东"]),
+                            "arrival_terminal": rng.choice(["T1", "T2", None]),
+                            "arrival_datetime": arrival.strftime("%Y-%m-%d %H:%M"),
+                        },
+                        "airline_info": {
+                            "flight_number": f"MU{5100 + i}",
+                            "airline_simple_name": airline,
+                            "air_equip_type": rng.choice(["A320", "B737", "A350"]),
+                            "is_share_flight": int(is_share),
+                            "main_flight_number": f"CA{1500 + i}" if is_share else "",
+                            "main_airline_simple_name": rng.choice(AIRLINES)
+                            if is_share
+                            else "",
+                            "is_meal_included": rng.randint(0, 1),
+                            "flight_duration_seconds": duration,
+                            "flight_distance_km": 1088,
+                        },
+                        "stop_info": {"is_stop": int(rng.random() < 0.1)},
+                        "cross_day": 0,
+                    }
+                ]
+            },
+            "price_list": [
+                {
+                    "flight_route_price_list": [
+                        {
+                            "adult_price_info": {
+                                "cabin_name": "经济舱",
+                                "cabin_code": "Y",
+                                "sale_price": price,
+                                "discount": rng.randrange(30, 100),
+                                "base_price": price - 5000,
+                                "fuel_cost": 0,
+                                "construction_cost": 5000,
+                                "return_info": {"returnable": rng.randint(0, 1)},
+                                "change_info": {"changeable": rng.randint(0, 1)},
+                            }
+                        }
+                    ]
+                }
+            ],
+        }
+        flights.append(flight)
+    return flights
+
+
+def rowwise_pipeline(flights: list) -> pd.DataFrame:
+    """The previous implementation: per-row dicts, apply and strptime."""
+    rows = []
+    for flight in flights:
+        route = flight["flight_info"]["route_list"][0]
+        airline_info = route["airline_info"]
+        price_info = flight["price_list"][0]["flight_route_price_list"][0][
+            "adult_price_info"
+        ]
+        rows.append(
+            {
+                "航空公司": airline_info["airline_simple_name"],
+                "是否共享": "是" if airline_info["is_share_flight"] == 1 else "否",
+                "出发时间": route["departure_info"]["departure_datetime"],
+                "价格(元)": round(price_info.get("sale_price", 0) / 100, 2),
+                "经停": "是" if route["stop_info"]["is_stop"] == 1 else "否",
+                "飞行时长(分钟)": round(
+                    airline_info.get("flight_duration_seconds", 0) / 60
+                ),
+            }
+        )
+    df = pd.DataFrame(rows)
+    df["航空公司"] = df.apply(
+        lambda row: f"{row['航空公司']}(共享)" if row["是否共享"] == "是" else row["航空公司"],
+        axis=1,
+    )
+    df["时分"] = df["出发时间"].apply(
+        lambda x: datetime.strptime(x.split()[1], "%H:%M")
+    )
+    df = df[
+        (df["时分"] >= datetime.strptime("08:00", "%H:%M"))
+        & (df["时分"] <= datetime.strptime("20:00", "%H:%M"))
+        & (df["价格(元)"] <= 2000)
+    ]
+    df.sort_values("价格(元)").iloc[0]
+    df.sort_values("飞行时长(分钟)").iloc[0]
+    return df.sort_values("价格(元)")
+
+
+def columnar_pipeline(flights: list) -> pd.DataFrame:
+    """The current pipeline: flatten once into columns, then vectorized filters."""
+    df = process_flight_data(flights)
+    df = filter_flights(
+        df, departure_time_start="08:00", departure_time_end="20:00", price_max=2000
+    )
+    get_cheapest_flight(df, max_stops=1)
+    get_fastest_flight(df)
+    return sort_flights(df, "价格(元)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--flights", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    flights = make_flights(args.flights)
+
+    # Both pipelines must agree before their timings mean anything
+    expected = rowwise_pipeline(flights)["价格(元)"].tolist()
+    actual = columnar_pipeline(flights)["价格(元)"].tolist()
+    assert sorted(expected) == sorted(actual), "pipelines disagree"
+
+    cases = {
+        "row-wise pipeline": lambda: rowwise_pipeline(flights),
+        "columnar pipeline": lambda: columnar_pipeline(flights),
+        "process_flight_data": lambda: process_flight_data(flights),
+    }
+    print(f"{args.flights} flights, best of {args.repeat} runs")
+    for name, case in cases.items():
+        best = min(timeit.repeat(case, number=1, repeat=args.repeat))
+        print(f"  {name:<22}{best * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Import-time benchmark for the entry points.
+
+Imports each entry module in a fresh interpreter with ``python -X importtime``
+and reports its cumulative import time, the slowest modules it pulls in, and
+any heavy optional dependency (browser_use, docker, pandas, search engine
+SDKs, ...) that was imported although nothing used it yet. The budgets are
+the ones enforced by ``tests/test_import_time.py``.
+
+Usage:
+    python -m examples.benchmarks.import_time [--repeat 5] [--top 15]
+"""
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, Tuple
+
+
+# Entry module -> import time budget in seconds
+BUDGETS = {
+    "app.agent.manus": 1.5,
+    "app.mcp.server": 1.5,
+    "server_web": 2.0,
+}
+
+# Must only be imported when the feature using them runs
+LAZY_DEPENDENCIES = [
+    "browser_use",
+    "playwright",
+    "docker",
+    "boto3",
+    "pandas",
+    "baidusearch",
+    "bs4",
+    "duckduckgo_search",
+    "googlesearch",
+]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def import_profile(module: str) -> Dict[str, Tuple[int, int]]:
+    """Module -> (self, cumulative) import time in microseconds, imported in a fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        # Keep the first (outermost) entry of a module
+        profile.setdefault(name.strip(), (int(own), int(cumulative)))
+    return profile
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    for module, budget in BUDGETS.items():
+        runs = [import_profile(module) for _ in range(args.repeat)]
+        best = min(runs, key=lambda profile: profile[module][1])
+        total = best[module][1] / 1e6
+        status = "ok" if total <= budget else "OVER BUDGET"
+        print(f"{module}: {total:.3f}s (budget {budget:.1f}s, best of {args.repeat}) {status}")
+        eager = [name for name in LAZY_DEPENDENCIES if name in best]
+        if eager:
+            print(f"  imported eagerly: {', '.join(eager)}")
+        slowest = sorted(best.items(), key=lambda item: item[1][0], reverse=True)
+        for name, (own, _) in slowest[: args.top]:
+            print(f"  {own / 1e3:8.1f}ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Micro-benchmark for the JSON codec on a real trajectory.
+
+Replays the per-step serialization work of an agent run on the trajectory in
+``train_data.json``: decoding tool-call arguments, pretty-printing every tool
+output for the validator prompt, and logging the growing message list as a
+``train_data:`` line. Each case is timed with the standard library calls the
+agent used before and with ``app.codec`` (orjson when installed).
+
+Usage:
+    python -m examples.benchmarks.json_codec [--trajectory train_data.json] [--repeat 20]
+"""
+import argparse
+import json
+import timeit
+
+from app import codec
+
+
+def prefixes(messages: list) -> list:
+    """The message list as it grows, one snapshot per assistant step."""
+    return [messages[: i + 1] for i, m in enumerate(messages) if m["role"] == "assistant"]
+
+
+def tool_outputs(messages: list) -> list:
+    outputs = []
+    for m in messages:
+        content = m.get("content")
+        if m["role"] == "tool" and isinstance(content, str):
+            if "Observed output of cmd" in content:
+                content = content.split(":", 1)[-1].strip()
+            outputs.append(content)
+    return outputs
+
+
+def arguments(messages: list) -> list:
+    return [
+        call["function"]["arguments"]
+        for m in messages
+        for call in m.get("tool_calls") or []
+    ]
+
+
+def stdlib_pretty(content: str) -> str:
+    try:
+        return json.dumps(json.loads(content), indent=2, ensure_ascii=False)
+    except (json.JSONDecodeError, TypeError):
+        return str(content)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--trajectory", default="train_data.json")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with open(args.trajectory, "r", encoding="utf-8") as f:
+        messages = json.load(f)
+    steps = prefixes(messages)
+    outputs = tool_outputs(messages)
+    calls = arguments(messages)
+
+    # Same documents either way, only the whitespace of the encoding differs
+    assert all(
+        json.loads(codec.dumps(step)) == json.loads(json.dumps(step, ensure_ascii=False))
+        for step in steps
+    )
+    assert [json.loads(stdlib_pretty(o)) for o in outputs if o.startswith(("{", "["))] == [
+        json.loads(codec.pretty_json_text(o)) for o in outputs if o.startswith(("{", "["))
+    ]
+
+    def validator_prompts(pretty) -> None:
+        # Every step re-renders all tool outputs seen so far
+        for step in steps:
+            for output in tool_outputs(step):
+                pretty(output)
+
+    def uncached_pretty(content: str) -> str:
+        try:
+            return codec.dumps(codec.loads(content), indent=True)
+        except codec.JSONDecodeError:
+            return content
+
+    cases = {
+        "decode tool arguments": (
+            lambda: [json.loads(a) for a in calls],
+            lambda: [codec.loads(a) for a in calls],
+        ),
+        "log train_data per step": (
+            lambda: [json.dumps(s, ensure_ascii=False) for s in steps],
+            lambda: [codec.dumps(s) for s in steps],
+        ),
+        "validator tool outputs": (
+            lambda: validator_prompts(stdlib_pretty),
+            lambda: validator_prompts(codec.pretty_json_text),
+        ),
+        "  (without cache)": (
+            lambda: validator_prompts(stdlib_pretty),
+            lambda: validator_prompts(uncached_pretty),
+        ),
+    }
+
+    print(
+        f"{len(messages)} messages, {len(steps)} steps, {len(outputs)} tool outputs; "
+        f"backend: {codec.BACKEND}; best of {args.repeat} runs"
+    )
+    print(f"  {'case':<26}{'stdlib':>10}{'codec':>10}{'speedup':>9}")
+    for name, (baseline, candidate) in cases.items():
+        before = min(timeit.repeat(baseline, number=10, repeat=args.repeat)) / 10
+        after = min(timeit.repeat(candidate, number=10, repeat=args.repeat)) / 10
+        print(
+            f"  {name:<26}{before * 1e6:8.0f}us{after * 1e6:8.0f}us{before / after:8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Mock OpenAI-compatible LLM server for load tests.
+
+Answers every ``/v1/chat/completions`` request after ``--latency`` seconds
+with the same assistant message calling ``terminate``, so a load test
+measures the server and agent overhead without API costs or rate limits.
+Agents that do not have the ``terminate`` tool run to their step limit, one
+completion per step. ``GET /calls`` returns the number of completions
+served, e.g. to see how many the LLM-response cache saved.
+
+Point the ``[llm]`` section at it to use it::
+
+    base_url = "http://127.0.0.1:18000/v1"
+
+Usage:
+    python -m examples.benchmarks.mock_llm [--port 18000] [--latency 0.3]
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import uvicorn
+from fastapi import FastAPI
+
+
+def create_app(latency: float) -> FastAPI:
+    app = FastAPI()
+    app.state.calls = 0
+
+    @app.post("/v1/chat/completions")
+    async def completions() -> dict:
+        app.state.calls += 1
+        await asyncio.sleep(latency)
+        return {
+            "id": f"mock-{app.state.calls}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": "mock",
+            "choices": [
+                {
+                    "index": 0,
+                    "finish_reason": "tool_calls",
+                    "message": {
+                        "role": "assistant",
+                        "content": "done",
+                        "tool_calls": [
+                            {
+                                "id": "call-terminate",
+                                "type": "function",
+                                "function": {
+                                    "name": "terminate",
+                                    "arguments": json.dumps({"status": "success"}),
+                                },
+                            }
+                        ],
+                    },
+                }
+            ],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+        }
+
+    @app.get("/calls")
+    async def calls() -> dict:
+        return {"calls": app.state.calls}
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=18000)
+    parser.add_argument("--latency", type=float, default=0.3, help="Seconds per completion")
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.latency), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
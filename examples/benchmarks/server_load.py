@@ -0,0 +1,191 @@
+"""Load test for the chat service, single- and multi-worker.
+
+Sends ``--requests`` POST /api/chat requests with ``--concurrency`` in flight
+and reports throughput and latency percentiles. With ``--workers 1 2 4`` it
+starts ``serve.py`` with each worker count in turn (on ``--port``) and
+measures every deployment the same way; otherwise it targets ``--url``.
+
+With ``--mock-llm SECONDS`` the run starts ``examples.benchmarks.mock_llm``
+on ``--mock-port`` and also reports how many completions each deployment
+requested; the ``[llm]`` base_url must point at it
+(``http://127.0.0.1:18000/v1`` by default).
+
+``--distinct`` prompts are cycled through, so with ``[cache] backend =
+"sqlite"`` and ``llm_responses = true`` the repeated prompts show how much
+the workers gain from each other's cache hits.
+
+Usage:
+    python -m examples.benchmarks.server_load --workers 1 2 4 [--requests 200] [--concurrency 32]
+    python -m examples.benchmarks.server_load --workers 1 2 4 --mock-llm 0.3
+    python -m examples.benchmarks.server_load --url http://127.0.0.1:8072
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from typing import List, Optional
+
+import httpx
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+async def run_load(url: str, requests: int, concurrency: int, distinct: int) -> dict:
+    latencies: List[float] = []
+    errors = 0
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(f"Load test prompt {i % distinct}: plan a one-day trip")
+
+    async with httpx.AsyncClient(base_url=url, timeout=600) as client:
+
+        async def worker() -> None:
+            nonlocal errors
+            while not queue.empty():
+                prompt = queue.get_nowait()
+                started = time.perf_counter()
+                try:
+                    response = await client.post("/api/chat", json={"prompt": prompt})
+                    response.raise_for_status()
+                    latencies.append(time.perf_counter() - started)
+                except httpx.HTTPError:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "ok": len(latencies),
+        "errors": errors,
+        "throughput": len(latencies) / elapsed,
+        "p50": percentile(latencies, 0.5),
+        "p95": percentile(latencies, 0.95),
+        "p99": percentile(latencies, 0.99),
+    }
+
+
+async def wait_ready(
+    url: str, path: str, process: Optional[subprocess.Popen], timeout: float = 120
+) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=url, timeout=5) as client:
+        while time.monotonic() < deadline:
+            if process is not None and process.poll() is not None:
+                raise RuntimeError(f"{process.args[1:3]} exited before becoming ready")
+            try:
+                if (await client.get(path)).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.5)
+    raise RuntimeError(f"{url} did not become ready in {timeout}s")
+
+
+async def mock_llm_calls(mock_url: Optional[str]) -> Optional[int]:
+    if mock_url is None:
+        return None
+    async with httpx.AsyncClient(base_url=mock_url, timeout=5) as client:
+        return (await client.get("/calls")).json()["calls"]
+
+
+async def measure(url: str, mock_url: Optional[str], args) -> dict:
+    before = await mock_llm_calls(mock_url)
+    result = await run_load(url, args.requests, args.concurrency, args.distinct)
+    if before is not None:
+        result["llm_calls"] = await mock_llm_calls(mock_url) - before
+    return result
+
+
+def report(label: str, result: dict) -> None:
+    llm_calls = f"  llm calls {result['llm_calls']}" if "llm_calls" in result else ""
+    print(
+        f"  {label:<12}{result['throughput']:8.2f} req/s  p50 {result['p50']:6.2f}s  "
+        f"p95 {result['p95']:6.2f}s  p99 {result['p99']:6.2f}s  "
+        f"ok {result['ok']}  errors {result['errors']}{llm_calls}"
+    )
+
+
+def start_mock_llm(latency: float, port: int) -> subprocess.Popen:
+    from app.config import config
+
+    base_url = config.llm["default"].base_url or ""
+    if f":{port}" not in base_url:
+        raise SystemExit(
+            f"[llm] base_url is {base_url!r}; set it to http://127.0.0.1:{port}/v1 "
+            "in config/config.toml to benchmark against the mock LLM"
+        )
+    return subprocess.Popen(
+        [sys.executable, "-m", "examples.benchmarks.mock_llm",
+         "--port", str(port), "--latency", str(latency)],
+        cwd=ROOT,
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=None, help="Existing deployment to load")
+    parser.add_argument("--workers", type=int, nargs="*", default=None)
+    parser.add_argument("--port", type=int, default=8072)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--distinct", type=int, default=50, help="Distinct prompts cycled through")
+    parser.add_argument(
+        "--mock-llm", type=float, default=None, metavar="SECONDS",
+        help="Start the mock LLM answering after this many seconds",
+    )
+    parser.add_argument("--mock-port", type=int, default=18000)
+    args = parser.parse_args()
+
+    mock, mock_url = None, None
+    if args.mock_llm is not None:
+        mock = start_mock_llm(args.mock_llm, args.mock_port)
+        mock_url = f"http://127.0.0.1:{args.mock_port}"
+        await wait_ready(mock_url, "/calls", mock)
+    try:
+        await run_benchmark(args, mock_url)
+    finally:
+        if mock is not None:
+            mock.terminate()
+            mock.wait()
+
+
+async def run_benchmark(args, mock_url: Optional[str]) -> None:
+    print(
+        f"{args.requests} requests, {args.concurrency} in flight, "
+        f"{args.distinct} distinct prompts, {os.cpu_count()} CPUs"
+    )
+    if not args.workers:
+        url = args.url or f"http://127.0.0.1:{args.port}"
+        await wait_ready(url, "/health", None)
+        report(url, await measure(url, mock_url, args))
+        return
+
+    url = f"http://127.0.0.1:{args.port}"
+    for workers in args.workers:
+        process = subprocess.Popen(
+            [sys.executable, "serve.py", "--workers", str(workers), "--port", str(args.port),
+             "--host", "127.0.0.1"],
+            cwd=ROOT,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            await wait_ready(url, "/health", process)
+            result = await measure(url, mock_url, args)
+            report(f"{workers} worker{'s' if workers > 1 else ''}", result)
+        finally:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
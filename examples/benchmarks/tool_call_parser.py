@@ -0,0 +1,117 @@
+"""Micro-benchmark for extracting tool calls from model content.
+
+Renders every assistant step of the trajectory in ``train_data.json`` as the
+content a model without native tool calls would return (the step's calls in
+fenced ```json blocks) and times the regex passes ``ask_tool`` ran
+before against ``app.tool_call_parser``, both on complete content and fed in
+small streamed chunks.
+
+Usage:
+    python -m examples.benchmarks.tool_call_parser [--trajectory train_data.json] [--repeat 20]
+"""
+import argparse
+import json
+import re
+import timeit
+
+from app import codec
+from app.tool_call_parser import ToolCallParser, parse_tool_calls
+
+
+def recorded_outputs(messages: list, inline: bool = False) -> list:
+    """Assistant contents with their calls in one ```json block, or inline
+    blocks of one call each (which only the old fallback pattern matched)."""
+    outputs = []
+    for m in messages:
+        if m["role"] != "assistant":
+            continue
+        items = [
+            {"function": c["function"]["name"], "parameters": json.loads(c["function"]["arguments"])}
+            for c in m.get("tool_calls") or []
+        ]
+        content = m.get("content") or ""
+        if inline:
+            content += "".join(f"\n```json {json.dumps(i, ensure_ascii=False)}```" for i in items)
+        elif items:
+            content += f"\n```json\n{json.dumps(items, ensure_ascii=False, indent=2)}\n```\n"
+        outputs.append(content)
+    return outputs
+
+
+def calls_of(block: str) -> list:
+    data = codec.loads(block)
+    return [(i["function"], codec.dumps(i["parameters"])) for i in ([data] if isinstance(data, dict) else data)]
+
+
+def legacy(text: str) -> tuple:
+    """extract_tool_calls followed by the ask_tool fallback, as before."""
+    calls = []
+    if re.search(r"```json\n", text):
+        for block in re.findall(r"```json\n([\s\S]*?)\n```", text):
+            calls.extend(calls_of(block))
+    if not calls:
+        pattern = r"```json\s*([\s\S]*?)\s*```"
+        for block in re.findall(pattern, text):
+            calls.extend(calls_of(block.strip()))
+        if calls:
+            text = re.sub(pattern, "", text).strip()
+            text = re.sub(r"(\n\s*){2,}", "\n", text).strip()
+    return calls, text
+
+
+def streamed(text: str, size: int = 16) -> list:
+    parser = ToolCallParser()
+    for position in range(0, len(text), size):
+        parser.feed(text[position:position + size])
+    parser.close()
+    return parser.calls
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--trajectory", default="train_data.json")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with open(args.trajectory, "r", encoding="utf-8") as f:
+        messages = json.load(f)
+    outputs = recorded_outputs(messages)
+    inline = recorded_outputs(messages, inline=True)
+
+    # Same calls either way
+    for text in outputs + inline:
+        assert [(c.name, c.arguments) for c in parse_tool_calls(text).calls] == legacy(text)[0]
+        assert streamed(text) == parse_tool_calls(text).calls
+
+    cases = {
+        "complete content": (
+            lambda: [legacy(t) for t in outputs],
+            lambda: [parse_tool_calls(t) for t in outputs],
+        ),
+        "inline blocks": (
+            lambda: [legacy(t) for t in inline],
+            lambda: [parse_tool_calls(t) for t in inline],
+        ),
+        "content x20": (
+            lambda: [legacy(t * 20) for t in outputs],
+            lambda: [parse_tool_calls(t * 20) for t in outputs],
+        ),
+        "streamed, 16 chars/chunk": (
+            # Re-parsing the accumulated text on every chunk
+            lambda: [legacy(t[:end]) for t in outputs for end in range(16, len(t) + 16, 16)],
+            lambda: [streamed(t) for t in outputs],
+        ),
+    }
+
+    print(f"{len(outputs)} assistant steps; best of {args.repeat} runs")
+    print(f"  {'case':<26}{'regex':>10}{'parser':>10}{'speedup':>9}")
+    for name, (baseline, candidate) in cases.items():
+        before = min(timeit.repeat(baseline, number=10, repeat=args.repeat)) / 10
+        after = min(timeit.repeat(candidate, number=10, repeat=args.repeat)) / 10
+        print(
+            f"  {name:<26}{before * 1e6:8.0f}us{after * 1e6:8.0f}us{before / after:8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ import asyncio
 from app.agent.manus import Manus
 from app.agent.mcp import MCPAgent
 from app.logger import logger
+from app.sandbox.client import SANDBOX_CLIENT
 
 
 async def main():
@@ -14,6 +15,9 @@ async def main():
     )
     args = parser.parse_args()
 
+    # Pre-warm the sandbox pool if one is configured
+    await SANDBOX_CLIENT.warm_up()
+
     # Create and initialize Manus agent
     agent = await Manus.create()
     try:
@@ -31,6 +35,7 @@ async def main():
     finally:
         # Ensure agent resources are cleaned up before exiting
         await agent.cleanup()
+        await SANDBOX_CLIENT.shutdown()
 
 
 if __name__ == "__main__":
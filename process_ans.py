@@ -1,7 +1,28 @@
-import pandas as pd
+"""
+Turn train_data logs into a query / summary / 参考信息 table.
+
+Log lines are streamed, ``train_data:`` records are parsed and formatted in a
+process pool, and rows are written incrementally to CSV or Parquet. Sorting by
+the query file and writing Excel is an optional final step.
+
+Usage:
+    python process_ans.py raw_logs.txt --queries assets/query.txt \
+        -o output.csv --excel output_ordered.xlsx --profile legacy
+"""
+import argparse
+import ast
+import csv
 import json
+import os
 import re
-import ast
+from functools import partial
+from multiprocessing import Pool
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Column holding each row's position in the query file, used for sorting
+ORDER_COLUMN = "query_order"
+COLUMNS = ["query", "summary", "参考信息", ORDER_COLUMN]
+
 
 def parse_tool_output(content_string: str):
     """
@@ -22,176 +43,433 @@ def parse_tool_output(content_string: str):
             print(f"Warning: Could not parse tool output string: {dict_str}")
             return None
 
-def format_reference_info(conversation: list) -> str:
+
+def parse_observed_output(content_string: str):
+    """
+    Parses tool output of the MCP log format, a JSON object after the
+    "Observed output of cmd" prefix. Returns None for anything else.
+    """
+    content_string = content_string.strip()
+    if not content_string.startswith("Observed output of cmd"):
+        return None
+    json_start_index = content_string.find('{')
+    if json_start_index == -1:
+        return None
+    dict_str = content_string[json_start_index:]
+    try:
+        return json.loads(dict_str)
+    except json.JSONDecodeError:
+        try:
+            # Fallback for dict-like strings that aren't valid JSON
+            return ast.literal_eval(dict_str)
+        except (ValueError, SyntaxError):
+            print(f"Warning: Could not parse tool output string: {dict_str}")
+            return None
+
+
+class ReferenceFormatter:
     """
-    Formats the '参考信息' column by aggregating details from all tool calls
-    in a single conversation.
+    Builds the '参考信息' column from the tool calls of a conversation.
+
+    Tool-specific formatting is pluggable: ``register`` adds a function that
+    turns one tool's parsed output into result lines. Tools without a
+    registered function use ``fallback``.
+
+    Args:
+        parse_output: Parses a raw 'tool' message content into a dict.
+        payload_key: Key of the result payload inside the parsed output, or
+            None to pass the whole output to the tool formatter.
+        require_success: Only format outputs whose status is 'success'.
+        fallback: Formatter for tools without a registered one.
+        skip_tools: Tool calls left out of the column.
     """
-    reference_parts = []
-
-    # Create maps for both parsed and raw tool outputs
-    id_to_parsed_output = {}
-    id_to_raw_content = {}
-    for msg in conversation:
-        if msg.get('role') == 'tool' and 'tool_call_id' in msg:
-            raw_content = msg.get('content', '')
-            id_to_raw_content[msg['tool_call_id']] = raw_content
-            id_to_parsed_output[msg['tool_call_id']] = parse_tool_output(raw_content)
-
-    for msg in conversation:
-        if msg.get('role') == 'assistant' and 'tool_calls' in msg:
+
+    def __init__(
+        self,
+        parse_output: Callable[[str], Optional[dict]],
+        payload_key: Optional[str] = None,
+        require_success: bool = False,
+        fallback: Optional[Callable[[dict], str]] = None,
+        skip_tools: Iterable[str] = ("terminate",),
+    ):
+        self.parse_output = parse_output
+        self.payload_key = payload_key
+        self.require_success = require_success
+        self.fallback = fallback
+        self.skip_tools = set(skip_tools)
+        self.tools: Dict[str, Callable[[dict], str]] = {}
+        self.raw_tools: Dict[str, Callable[[str], str]] = {}
+
+    def register(self, *names: str, raw: bool = False):
+        """Register a formatter for tools; raw formatters get the unparsed content."""
+        def decorator(func):
+            for name in names:
+                (self.raw_tools if raw else self.tools)[name] = func
+            return func
+        return decorator
+
+    def format_call(self, func_name: str, arguments, raw_content: Optional[str]) -> str:
+        try:
+            # Arguments can be a stringified JSON
+            func_args = json.loads(arguments if arguments is not None else '{}')
+        except json.JSONDecodeError:
+            func_args = {}
+        except TypeError:
+            # Or already a dict
+            func_args = arguments
+
+        part = f"函数: {func_name}\n参数: {json.dumps(func_args, ensure_ascii=False, indent=2)}\n"
+
+        if func_name in self.raw_tools:
+            return part + self.raw_tools[func_name](raw_content if raw_content is not None else 'N/A')
+
+        output = self.parse_output(raw_content) if raw_content is not None else None
+        if not output or (self.require_success and output.get('status') != 'success'):
+            return part + "结果: 调用失败或无数据\n"
+
+        part += "结果:\n"
+        payload = output.get(self.payload_key, {}) if self.payload_key else output
+        formatter = self.tools.get(func_name, self.fallback)
+        if formatter is not None:
+            part += formatter(payload)
+        return part
+
+    def __call__(self, conversation: list) -> str:
+        id_to_raw_content = {
+            msg['tool_call_id']: msg.get('content', '')
+            for msg in conversation
+            if msg.get('role') == 'tool' and 'tool_call_id' in msg
+        }
+
+        reference_parts = []
+        for msg in conversation:
+            if msg.get('role') != 'assistant' or not msg.get('tool_calls'):
+                continue
             for call in msg['tool_calls']:
                 func_info = call.get('function', {})
                 func_name = func_info.get('name')
-
-                if func_name == 'terminate':
+                if func_name in self.skip_tools:
                     continue
-
-                try:
-                    func_args = json.loads(func_info.get('arguments', '{}'))
-                except json.JSONDecodeError:
-                    func_args = {}
-
-                part = f"函数: {func_name}\n参数: {json.dumps(func_args, ensure_ascii=False, indent=2)}\n"
-
-                # --- MODIFIED LOGIC TO HANDLE DEEP_SEARCH SEPARATELY ---
-                if func_name == 'deep_search':
-                    raw_output = id_to_raw_content.get(call.get('id'), 'N/A')
-                    # Clean the prefix for better readability
-                    prefix_to_remove = "Observed output of cmd `deep_search` executed:\n"
-                    cleaned_content = raw_output.replace(prefix_to_remove, "", 1).strip()
-                    part += f"搜索结果:\n{cleaned_content}\n"
-                else:
-                    # Logic for all other tools
-                    output = id_to_parsed_output.get(call.get('id'))
-                    if output and output.get('status') == 'success':
-                        part += "结果:\n"
-                        data = output.get('data', {})
-
-                        locations_to_process = []
-                        if func_name in ['location_search', 'location_around_search']:
-                            locations_to_process = data
-                        elif func_name == 'route_along_search':
-                            locations_to_process = data.get('pois', [])
-
-                        if locations_to_process:
-                            for loc in locations_to_process:
-                                name = loc.get('name', 'N/A')
-                                address = loc.get('address', 'N/A')
-                                distance = loc.get('distance', 'N/A')
-                                part += f"  - 名称: {name}, 地址: {address}, 距离: {distance}\n"
-                        elif not locations_to_process and func_name in ['location_search', 'location_around_search', 'route_along_search']:
-                             part += "  - 未找到任何位置信息。\n"
-
-                        if func_name == 'route_planner':
-                            routes = data.get('routes', [])
-                            if not routes:
-                                part += "  - 未找到任何路线信息。\n"
-                            for route in routes:
-                                label = route.get('路线标签', 'N/A')
-                                dist = route.get('路线距离', 'N/A')
-                                time = route.get('预估时间', 'N/A')
-                                lights = route.get('红绿灯', '未提供')
-                                part += f"  - 路线: 标签='{label}', 距离='{dist}', 时间='{time}', 红绿灯='{lights}'\n"
-                    else:
-                        part += "结果: 调用失败或无数据\n"
-
-                reference_parts.append(part)
-
-    return "\n---\n".join(reference_parts)
-
-def process_single_conversation(conversation: list) -> dict:
+                reference_parts.append(
+                    self.format_call(
+                        func_name,
+                        func_info.get('arguments', '{}'),
+                        id_to_raw_content.get(call.get('id')),
+                    )
+                )
+
+        return "\n---\n".join(reference_parts)
+
+
+class RawReferenceFormatter(ReferenceFormatter):
+    """Lists every tool call with its raw arguments and truncated result."""
+
+    def __init__(self, max_result_chars: int = 300):
+        super().__init__(parse_output=lambda content: None, skip_tools=())
+        self.max_result_chars = max_result_chars
+
+    def format_call(self, func_name: str, arguments, raw_content: Optional[str]) -> str:
+        if raw_content is None:
+            result_content = '结果未找到'
+        elif len(raw_content) > self.max_result_chars:
+            result_content = raw_content[:self.max_result_chars] + '...'
+        else:
+            result_content = raw_content
+        return f"函数: {func_name or 'N/A'}\n参数: {arguments}\n结果: {result_content}"
+
+
+def format_deep_search(raw_output: str) -> str:
+    # Clean the prefix for better readability
+    prefix_to_remove = "Observed output of cmd `deep_search` executed:\n"
+    cleaned_content = raw_output.replace(prefix_to_remove, "", 1).strip()
+    return f"搜索结果:\n{cleaned_content}\n"
+
+
+def format_locations(locations, field: str = 'distance', label: str = '距离') -> str:
+    if not locations:
+        return "  - 未找到任何位置信息。\n"
+    return "".join(
+        f"  - 名称: {loc.get('name', 'N/A')}, 地址: {loc.get('address', 'N/A')}, "
+        f"{label}: {loc.get(field, 'N/A')}\n"
+        for loc in locations
+    )
+
+
+# --- Legacy tool names (location_search, route_planner, ...) ---
+LEGACY_FORMATTER = ReferenceFormatter(
+    parse_tool_output, payload_key='data', require_success=True
+)
+LEGACY_FORMATTER.register('deep_search', raw=True)(format_deep_search)
+
+
+@LEGACY_FORMATTER.register('location_search', 'location_around_search')
+def format_legacy_locations(data) -> str:
+    return format_locations(data)
+
+
+@LEGACY_FORMATTER.register('route_along_search')
+def format_legacy_route_pois(data) -> str:
+    return format_locations(data.get('pois', []))
+
+
+@LEGACY_FORMATTER.register('route_planner')
+def format_legacy_routes(data) -> str:
+    routes = data.get('routes', [])
+    if not routes:
+        return "  - 未找到任何路线信息。\n"
+    return "".join(
+        f"  - 路线: 标签='{route.get('路线标签', 'N/A')}', 距离='{route.get('路线距离', 'N/A')}', "
+        f"时间='{route.get('预估时间', 'N/A')}', 红绿灯='{route.get('红绿灯', '未提供')}'\n"
+        for route in routes
+    )
+
+
+# --- MCP map tool names (maps_text_search, maps_direction_driving, ...) ---
+MCP_FORMATTER = ReferenceFormatter(
+    parse_observed_output,
+    fallback=lambda output: f"  {json.dumps(output, ensure_ascii=False, indent=4)}\n",
+)
+MCP_FORMATTER.register('deep_search', raw=True)(format_deep_search)
+
+
+@MCP_FORMATTER.register('maps_text_search', 'maps_around_search', 'maps_geo', 'maps_search_detail')
+def format_mcp_locations(output) -> str:
+    # For maps_geo, the data is in 'results'
+    return format_locations(
+        output.get('pois') or output.get('results'), field='location', label='坐标'
+    )
+
+
+@MCP_FORMATTER.register(
+    'maps_direction_driving', 'maps_direction_walking',
+    'maps_direction_bicycling', 'maps_direction_transit_integrated',
+)
+def format_mcp_routes(output) -> str:
+    routes = output.get('paths', [])
+    if not routes:
+        return "  - 未找到任何路线信息。\n"
+    # distance in meters, duration in seconds
+    return "".join(
+        f"  - 路线 {i + 1}: 距离='{int(route.get('distance', 0)) / 1000:.2f}公里', "
+        f"时间='{int(route.get('duration', 0)) / 60:.2f}分钟'\n"
+        for i, route in enumerate(routes)
+    )
+
+
+@MCP_FORMATTER.register('maps_distance')
+def format_mcp_distance(output) -> str:
+    results = output.get('results', [])
+    if not results:
+        return "  - 未能测量距离。\n"
+    part = ""
+    for res in results:
+        dist_m = int(res.get('distance', 0))
+        dura_s = int(res.get('duration', 0))
+        dist_km = f"{dist_m / 1000:.2f}公里" if dist_m > 0 else "N/A"
+        dura_min = f"{dura_s / 60:.2f}分钟" if dura_s > 0 else "N/A"
+        part += f"  - 测量结果: 距离='{dist_km}', 时间='{dura_min}'\n"
+    return part
+
+
+FORMATTERS: Dict[str, ReferenceFormatter] = {
+    'legacy': LEGACY_FORMATTER,
+    'mcp': MCP_FORMATTER,
+    'raw': RawReferenceFormatter(),
+}
+
+
+def process_single_conversation(conversation: list, profile: str = 'legacy') -> Optional[dict]:
     """
     Processes a SINGLE conversation to extract query, summary, and reference info.
     """
     query = next((msg['content'] for msg in conversation if msg.get('role') == 'user'), None)
+    if not query:
+        return None
 
-    last_assistant_msg = next((msg for msg in reversed(conversation) if msg.get('role') == 'assistant'), None)
+    last_assistant_msg = next(
+        (msg for msg in reversed(conversation) if msg.get('role') == 'assistant' and msg.get('content')),
+        None,
+    )
     summary = ""
-    if last_assistant_msg and 'content' in last_assistant_msg:
+    if last_assistant_msg:
         summary = re.sub(r'<think>.*?</think>', '', last_assistant_msg['content'], flags=re.DOTALL).strip()
 
-    reference_info = format_reference_info(conversation)
+    return {
+        'query': str(query),
+        'summary': summary,
+        '参考信息': FORMATTERS[profile](conversation),
+    }
 
-    if query:
-        return {
-            'query': query,
-            'summary': summary,
-            '参考信息': reference_info
-        }
-    return None
 
-def main():
-    """
-    Main function to read log and query files, process data, sort it, and save to Excel.
-    """
-    # log_filename = "raw_logs.txt" #input("Enter the path to your log file (e.g., app.log): ")
-    log_filename = "raw_logs_07010_morning.txt"
-    query_filename = "/nfs/volume-1593-3/user/zhouwenxing/projects/OpenManus/assets/query.txt" #input("Enter the path to your query order file (e.g., queries.txt): ")
-
-    log_entries = []
-    try:
-        with open(log_filename, 'r', encoding='utf-8') as f:
-            #log_content_string = f.read()
+def iter_log_entries(log_files: Iterable[str]) -> Iterator[str]:
+    """Stream the JSON payload of every train_data line."""
+    for log_file in log_files:
+        with open(log_file, 'r', encoding='utf-8') as f:
             for line in f:
-                log_entries.append((line.split("train_data:")[-1]).strip())
-
-        #if not log_content_string.strip():
-        #    print(f"❌ Error: The log file '{log_filename}' is empty.")
-        #    return
-        #
-        with open(query_filename, 'r', encoding='utf-8') as f:
-            ordered_queries = [line.strip() for line in f if line.strip()]
-        #if not ordered_queries:
-        #    print(f"❌ Error: The query file '{query_filename}' is empty or contains no valid queries.")
-        #    return
+                if "train_data:" in line:
+                    entry = line.split("train_data:")[-1].strip()
+                    if entry:
+                        yield entry
 
-    except FileNotFoundError as e:
-        print(f"❌ Error: A file was not found: {e.filename}")
-        return
+
+def process_entry(entry: str, profile: str) -> Tuple[str, object]:
+    """Parse and format one log entry in a worker: ('ok', record), ('skip', None) or ('error', message)."""
+    try:
+        record = process_single_conversation(json.loads(entry), profile)
+    except json.JSONDecodeError as e:
+        return 'error', f"JSON parsing error: {e}"
     except Exception as e:
-        print(f"❌ An unexpected error occurred while reading files: {e}")
-        return
+        return 'error', f"Unexpected error: {e}"
+    return ('ok', record) if record else ('skip', None)
 
-    #log_entries = re.split(r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d{3} \| INFO     \| app\.llm:ask_tool:873 - train_data:', log_content_string)
 
-    all_records = []
-    for entry in log_entries:
-        try:
-            conversation = json.loads(entry)
-            print("json.loads done")
-            record = process_single_conversation(conversation)
-            if record:
-                all_records.append(record)
-        except json.JSONDecodeError as e:
-            print(f"⚠️ Warning: Skipping an entry due to a JSON parsing error: {e}")
-            continue
-
-    if not all_records:
-        print("❌ No valid data was processed from the log file. Please check its format.")
-        return
+class CsvSink:
+    def __init__(self, path: str):
+        self._file = open(path, 'w', encoding='utf-8', newline='')
+        self._writer = csv.DictWriter(self._file, fieldnames=COLUMNS)
+        self._writer.writeheader()
+
+    def write(self, records: List[dict]) -> None:
+        self._writer.writerows(records)
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class ParquetSink:
+    """Writes each batch of records as one Parquet row group."""
+
+    def __init__(self, path: str):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
 
-    df = pd.DataFrame(all_records)
+        self._pa = pa
+        self._schema = pa.schema(
+            [(name, pa.string()) for name in COLUMNS[:-1]] + [(ORDER_COLUMN, pa.int64())]
+        )
+        self._writer = pq.ParquetWriter(path, self._schema)
 
-    df['query'] = df['query'].astype(str)
-    ordered_queries_set = set(ordered_queries)
+    def write(self, records: List[dict]) -> None:
+        self._writer.write_table(self._pa.Table.from_pylist(records, schema=self._schema))
 
-    df_in_order = df[df['query'].isin(ordered_queries_set)].copy()
-    df_not_in_order = df[~df['query'].isin(ordered_queries_set)].copy()
+    def close(self) -> None:
+        self._writer.close()
 
-    df_in_order['query'] = pd.Categorical(df_in_order['query'], categories=ordered_queries, ordered=True)
-    df_sorted = df_in_order.sort_values('query')
 
-    if not df_not_in_order.empty:
-        print(f"⚠️ Found {len(df_not_in_order)} records in the log file that were not in the query file. Appending them to the end.")
-        final_df = pd.concat([df_sorted, df_not_in_order], ignore_index=True)
+def open_sink(path: str):
+    if path.endswith('.parquet'):
+        try:
+            return ParquetSink(path)
+        except ImportError:
+            raise SystemExit("❌ Writing Parquet requires pyarrow (pip install pyarrow), or use a .csv output")
+    return CsvSink(path)
+
+
+def run_pipeline(
+    log_files: List[str],
+    output_file: str,
+    ordered_queries: List[str],
+    profile: str = 'legacy',
+    workers: Optional[int] = None,
+    chunksize: int = 64,
+    batch_size: int = 1000,
+) -> Tuple[int, int, int]:
+    """
+    Stream log entries through a process pool and write rows as they arrive.
+
+    Returns:
+        (number of rows written, number of rows whose query is not in the query file,
+         number of entries skipped because they could not be processed)
+    """
+    query_order = {}
+    for index, query in enumerate(ordered_queries):
+        query_order.setdefault(query, index)
+    unknown_order = len(ordered_queries)
+
+    sink = open_sink(output_file)
+    written = unknown = errors = 0
+    batch = []
+    try:
+        with Pool(workers or os.cpu_count() or 1) as pool:
+            # imap keeps log order, so rows missing from the query file stay in log order
+            results = pool.imap(
+                partial(process_entry, profile=profile), iter_log_entries(log_files), chunksize
+            )
+            for i, (status, value) in enumerate(results):
+                if status == 'error':
+                    errors += 1
+                    print(f"⚠️ Warning: Skipping entry #{i + 1} due to {value}")
+                    continue
+                if status == 'skip':
+                    continue
+                order = query_order.get(value['query'], unknown_order)
+                unknown += order == unknown_order
+                batch.append({**value, ORDER_COLUMN: order})
+                if len(batch) >= batch_size:
+                    sink.write(batch)
+                    written += len(batch)
+                    batch = []
+        if batch:
+            sink.write(batch)
+            written += len(batch)
+    finally:
+        sink.close()
+    return written, unknown, errors
+
+
+def write_sorted_excel(table_file: str, excel_file: str) -> None:
+    """Sort rows by the query file (unknown queries last, in log order) and write Excel."""
+    import pandas as pd
+
+    if table_file.endswith('.parquet'):
+        df = pd.read_parquet(table_file)
     else:
-        final_df = df_sorted
+        df = pd.read_csv(table_file, dtype={'query': str}, keep_default_na=False)
+    df = df.sort_values(ORDER_COLUMN, kind='stable').drop(columns=[ORDER_COLUMN])
+    df.to_excel(excel_file, index=False)
+
+
+def main(default_profile: str = 'legacy'):
+    parser = argparse.ArgumentParser(description="Extract query / summary / 参考信息 rows from train_data logs")
+    parser.add_argument('log_files', nargs='+', help="Log files containing train_data: lines")
+    parser.add_argument('--queries', help="Query file (one per line) defining the output order")
+    parser.add_argument('-o', '--output', default="output.csv",
+                        help="Streamed output table, .csv or .parquet (needs pyarrow) (default: output.csv)")
+    parser.add_argument('--excel', help="Also write an Excel file sorted by the query file")
+    parser.add_argument('--profile', choices=sorted(FORMATTERS), default=default_profile,
+                        help=f"Tool formatter profile (default: {default_profile})")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="Worker processes (default: all CPUs)")
+    parser.add_argument('--chunksize', type=int, default=64, help="Entries sent to a worker at a time")
+    args = parser.parse_args()
+
+    ordered_queries = []
+    try:
+        if args.queries:
+            with open(args.queries, 'r', encoding='utf-8') as f:
+                ordered_queries = [line.strip() for line in f if line.strip()]
+            if not ordered_queries:
+                print(f"⚠️ Warning: The query file '{args.queries}' is empty. Output will not be sorted.")
+        written, unknown, errors = run_pipeline(
+            args.log_files, args.output, ordered_queries, args.profile, args.workers, args.chunksize
+        )
+    except FileNotFoundError as e:
+        print(f"❌ Error: A file was not found: {e.filename}")
+        return
+
+    if errors:
+        print(f"⚠️ Skipped {errors} log entries that could not be processed.")
+    if not written:
+        print("❌ No valid data was processed from the log file. Please check its format.")
+        return
+    if ordered_queries and unknown:
+        print(f"⚠️ Found {unknown} records in the log file that were not in the query file. They are sorted to the end.")
+    print(f"✅ Wrote {written} records to '{args.output}'")
 
-    output_filename = "output_ordered_07010_morning.xlsx"
-    final_df.to_excel(output_filename, index=False)
+    if args.excel:
+        write_sorted_excel(args.output, args.excel)
+        print(f"✅ Successfully created sorted Excel file: '{args.excel}' with {written} records.")
 
-    print(f"✅ Successfully created sorted Excel file: '{output_filename}' with {len(final_df)} records.")
 
 if __name__ == "__main__":
     main()
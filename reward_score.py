@@ -0,0 +1,131 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Dict, Iterator, Optional, Set, Tuple
+
+from app.agent.reward import RewardEngine, create_reward_engine, solution_text
+
+
+def load_records(input_file: str) -> Iterator[Tuple[int, str, str]]:
+    """
+    逐行读取待评分的轨迹，返回 (行号, 用户需求, 待评估方案)
+
+    每行是一个 JSON 对象：需求取 problem / prompt / query 字段，方案取
+    response / solution 字段，没有时取 trajectory / messages 中最后一条
+    assistant 回复（client_multi.py 和 /api/jobs 的结果文件都可直接使用）
+    """
+    with open(input_file, "r", encoding="utf-8") as f:
+        for index, line in enumerate(f):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                print(f"第 {index + 1} 行不是合法的 JSON，已跳过")
+                continue
+            query = record.get("problem") or record.get("prompt") or record.get("query") or ""
+            # 与 ContentValidator 一致，有轨迹时评估整条轨迹，否则评估最终回答
+            trajectory = record.get("trajectory") or record.get("messages")
+            solution = solution_text(trajectory) if trajectory else (
+                record.get("response") or record.get("solution") or ""
+            )
+            yield index, query, solution
+
+
+def load_checkpoint(output_file: str) -> Set[str]:
+    """读取已评分轨迹的哈希，用于断点续跑"""
+    processed = set()
+    if not os.path.exists(output_file):
+        return processed
+    with open(output_file, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # 上次中断时可能留下半行
+                continue
+            if record.get("status") == "success":
+                processed.add(record["trajectory_hash"])
+    return processed
+
+
+async def score_file(
+    engine: RewardEngine,
+    input_file: str,
+    output_file: str,
+    workers: Optional[int] = None,
+) -> Dict[str, int]:
+    """
+    并发给输入文件中的所有轨迹打分，每完成一条立即写入结果文件
+
+    Args:
+        engine: 评分引擎，负责并发上限、重试和缓存
+        input_file: JSON Lines 输入文件
+        output_file: JSON Lines 结果文件，同时作为断点续跑的检查点
+        workers: 同时处理的轨迹数，默认与引擎的并发上限相同
+    """
+    processed = load_checkpoint(output_file)
+    counts = {"success": 0, "failed": 0, "skipped": 0}
+    records = load_records(input_file)
+    started = time.monotonic()
+
+    with open(output_file, "a", encoding="utf-8") as out:
+
+        async def worker():
+            # 所有 worker 共用一个迭代器，输入文件不必一次读入内存
+            for index, query, solution in records:
+                key = engine.key(query, solution)
+                if key in processed:
+                    counts["skipped"] += 1
+                    continue
+                processed.add(key)
+                record = {"index": index, "problem": query, "trajectory_hash": key}
+                try:
+                    result = await engine.score(query, solution)
+                    record.update(status="success", **result)
+                    counts["success"] += 1
+                except Exception as e:
+                    record.update(status="failed", error=str(e))
+                    counts["failed"] += 1
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+                done = counts["success"] + counts["failed"]
+                if done % 50 == 0:
+                    rate = done / (time.monotonic() - started)
+                    print(f"已评分 {done} 条（失败 {counts['failed']}），{rate:.2f} 条/s")
+
+        workers = workers or engine.concurrency
+        await asyncio.gather(*(worker() for _ in range(max(1, workers))))
+    return counts
+
+
+async def main(args) -> None:
+    overrides = {}
+    if args.concurrency:
+        overrides["concurrency"] = args.concurrency
+    if args.retries is not None:
+        overrides["max_retries"] = args.retries
+    engine = create_reward_engine(use_cache=not args.no_cache, **overrides)
+    try:
+        started = time.monotonic()
+        counts = await score_file(engine, args.input_file, args.output_file, args.concurrency)
+    finally:
+        await engine.close()
+    print(
+        f"成功: {counts['success']}，失败: {counts['failed']}，跳过(已评分): {counts['skipped']}，"
+        f"总耗时: {time.monotonic() - started:.1f}s"
+    )
+    print(f"评分结果已保存到: {args.output_file}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="并发给轨迹结果文件打分")
+    parser.add_argument("--input_file", type=str, required=True, help="JSON Lines 轨迹文件")
+    parser.add_argument("--output_file", type=str, default="reward_scores.jsonl", help="评分结果文件")
+    parser.add_argument("--concurrency", type=int, default=None, help="并发请求数，默认取 [reward] 配置")
+    parser.add_argument("--retries", type=int, default=None, help="每条轨迹的重试次数，默认取 [reward] 配置")
+    parser.add_argument("--no_cache", action="store_true", help="不读写评分缓存")
+    asyncio.run(main(parser.parse_args()))
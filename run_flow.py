@@ -6,6 +6,7 @@ from app.agent.manus import Manus
 from app.config import config
 from app.flow.flow_factory import FlowFactory, FlowType
 from app.logger import logger
+from app.sandbox.client import SANDBOX_CLIENT
 
 
 async def run_flow():
@@ -14,6 +15,8 @@ async def run_flow():
     }
     if config.run_flow_config.use_data_analysis_agent:
         agents["data_analysis"] = DataAnalysis()
+    # Pre-warm the sandbox pool if one is configured
+    await SANDBOX_CLIENT.warm_up()
     try:
         prompt = input("Enter your prompt: ")
 
@@ -46,6 +49,8 @@ async def run_flow():
         logger.info("Operation cancelled by user.")
     except Exception as e:
         logger.error(f"Error: {str(e)}")
+    finally:
+        await SANDBOX_CLIENT.shutdown()
 
 
 if __name__ == "__main__":
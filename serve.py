@@ -0,0 +1,92 @@
+import argparse
+import os
+
+from app.config import config
+
+
+def run_uvicorn(args) -> None:
+    """用 uvicorn 自带的进程管理启动多个 worker"""
+    import uvicorn
+
+    uvicorn.run(
+        "server_web:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        timeout_graceful_shutdown=args.graceful_timeout,
+    )
+
+
+def run_gunicorn(args) -> None:
+    """用 gunicorn 管理 uvicorn worker（需要 pip install gunicorn），worker 异常退出后会自动重启"""
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        raise SystemExit("未安装 gunicorn，请先 pip install gunicorn，或使用 --server uvicorn")
+
+    class ServerApplication(BaseApplication):
+        def load_config(self):
+            options = {
+                "bind": f"{args.host}:{args.port}",
+                "workers": args.workers,
+                "worker_class": args.worker_class,
+                # SSE 流式响应和 agent 运行时间都很长，不能按请求超时杀掉 worker
+                "timeout": 0,
+                "graceful_timeout": args.graceful_timeout,
+                # 每个 worker 自己导入应用，MCP 连接、缓存连接和 LLM 客户端都在 worker 内创建
+                "preload_app": False,
+            }
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from server_web import app
+
+            return app
+
+    ServerApplication().run()
+
+
+def main(args) -> None:
+    settings = config.cache_config
+    if args.workers > 1 and settings.backend != "sqlite":
+        print(
+            f"提示: 当前缓存后端为 {settings.backend}，各 worker 之间不共享缓存；"
+            "在 config.toml 中设置 [cache] backend = \"sqlite\" 可共享工具结果和 LLM 响应缓存"
+        )
+    admission = config.admission_config
+    print(
+        f"启动 {args.workers} 个 worker（{args.server}），监听 {args.host}:{args.port}，"
+        f"聊天会话并发上限共 {args.workers * admission.max_sessions}"
+        f"（排队上限 {args.workers * admission.max_queue}），"
+        f"批量任务并发上限共 {args.workers * config.job_config.concurrency}"
+    )
+    if args.server == "gunicorn":
+        run_gunicorn(args)
+    else:
+        run_uvicorn(args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="以多进程方式启动 server_web.py 的服务")
+    parser.add_argument("--host", type=str, default="0.0.0.0", help="监听地址")
+    parser.add_argument("--port", type=int, default=8072, help="监听端口")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.environ.get("WEB_CONCURRENCY", 1)),
+        help="worker 进程数，默认取环境变量 WEB_CONCURRENCY 或 1",
+    )
+    parser.add_argument(
+        "--server", choices=["uvicorn", "gunicorn"], default="uvicorn", help="进程管理方式"
+    )
+    parser.add_argument(
+        "--worker_class",
+        type=str,
+        default="uvicorn.workers.UvicornWorker",
+        help="gunicorn 的 worker 类（新版 uvicorn 中为 uvicorn_worker.UvicornWorker）",
+    )
+    parser.add_argument(
+        "--graceful_timeout", type=int, default=30, help="退出时等待进行中请求的秒数"
+    )
+    main(parser.parse_args())
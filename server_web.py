@@ -1,7 +1,7 @@
 import asyncio
 import html
-import json
 import os
+from contextlib import asynccontextmanager
 from typing import AsyncGenerator, Optional
 
 import uvicorn
@@ -9,13 +9,40 @@ from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
+from starlette.background import BackgroundTask
 from pydantic import BaseModel
 
+from app import codec
+from app.admission import QueueFull, create_admission_controller
 from app.agent.manus import Manus
+from app.jobs import create_job_runner, parse_prompts
 from app.logger import logger
+from app.sandbox.client import SANDBOX_CLIENT
+from app.tool.mcp import cleanup_mcp_clients
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 启动批量任务的工作协程池，服务退出时停止
+    # 多进程部署（serve.py --workers N）时每个进程各自执行一次，互不共享状态；
+    # MCP 连接在本进程第一次运行 agent 时才建立
+    app.state.jobs = create_job_runner()
+    await app.state.jobs.start()
+    # 聊天会话的准入控制：超过并发上限的请求排队，队列满时返回 429
+    app.state.admission = create_admission_controller()
+    # 配置了 sandbox.pool_size 时预热沙箱池，退出时销毁池中的容器
+    await SANDBOX_CLIENT.warm_up()
+    try:
+        yield
+    finally:
+        await app.state.jobs.stop()
+        app.state.jobs.store.close()
+        await cleanup_mcp_clients()
+        await SANDBOX_CLIENT.shutdown()
+
 
 # 创建FastAPI应用实例
-app = FastAPI(title="Manus Chat Service")
+app = FastAPI(title="Manus Chat Service", lifespan=lifespan)
 
 # 启用 CORS
 app.add_middleware(
@@ -900,37 +927,64 @@ async def get_chat_interface():
     """
     return html_content
 
+def admit_session(request: Request):
+    """为聊天会话排队；队列已满时返回 429，并在 Retry-After 中给出建议的重试秒数"""
+    try:
+        return request.app.state.admission.enqueue()
+    except QueueFull as e:
+        logger.warning(f"Rejecting chat request: {e}")
+        raise HTTPException(
+            status_code=429,
+            detail=f"服务繁忙，请 {e.retry_after} 秒后重试",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+
 @app.get("/api/chat/stream")
-async def chat_stream(prompt: str):
-    """提供聊天的 SSE 流式响应端点"""
+async def chat_stream(prompt: str, request: Request):
+    """提供聊天的 SSE 流式响应端点；排队期间通过 queue 事件推送当前排队位置"""
     if not prompt.strip():
         logger.warning("Empty prompt provided.")
         raise HTTPException(status_code=400, detail="Empty prompt provided")
+    ticket = admit_session(request)
 
     async def event_generator() -> AsyncGenerator[str, None]:
         try:
+            queued = False
+            async for position in ticket.wait():
+                queued = True
+                queue_data = codec.dumps({"position": position})
+                yield f"event: queue\ndata: {queue_data}\n\n"
+            if queued:
+                yield f"event: queue\ndata: {codec.dumps({'position': 0})}\n\n"
+
             logger.warning(f"Processing streaming chat request: {prompt}")
             agent = Manus()
 
             async for chunk in agent.run_stream(prompt):
                 print("chunk...", chunk)
                 # 直接发送原始文本，不进行 JSON 编码
-                chunk_json = json.dumps(chunk)
+                chunk_json = codec.dumps(chunk)
                 yield f"data: {chunk_json}\n\n"
 
             # 发送处理完成事件
-            complete_data = json.dumps({"status": "success"})
+            complete_data = codec.dumps({"status": "success"})
             yield f"event: complete\ndata: {complete_data}\n\n"
 
             logger.info("Streaming chat request processing completed.")
         except Exception as e:
             error_message = str(e)
             logger.error(f"Error processing streaming chat request: {error_message}")
-            error_data = json.dumps({"error": error_message})
+            error_data = codec.dumps({"error": error_message})
             yield f"event: error\ndata: {error_data}\n\n"
+        finally:
+            # 客户端断开时同样会执行，释放名额或退出队列
+            ticket.release()
 
     return StreamingResponse(
         event_generator(),
+        # 生成器尚未开始就被取消时 finally 不会执行，这里兜底释放（release 可重复调用）
+        background=BackgroundTask(ticket.release),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -941,27 +995,78 @@ async def chat_stream(prompt: str):
 
 
 @app.post("/api/chat", response_model=PromptResponse)
-async def chat(request: PromptRequest):
+async def chat(request: PromptRequest, http_request: Request):
     """提供聊天的常规响应端点"""
     if not request.prompt.strip():
         logger.warning("Empty prompt provided.")
         raise HTTPException(status_code=400, detail="Empty prompt provided")
 
     try:
-        logger.warning(f"Processing chat request: {request.prompt}")
-        agent = Manus()
-        result = await agent.run(request.prompt)
+        async with admit_session(http_request):
+            logger.warning(f"Processing chat request: {request.prompt}")
+            agent = Manus()
+            result = await agent.run(request.prompt)
 
         logger.info("Chat request processing completed.")
         return PromptResponse(message=result, status="success")
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error processing chat request: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/jobs")
+async def submit_job(request: Request):
+    """提交批量任务，请求体为 JSONL，每行一个问题"""
+    body = (await request.body()).decode("utf-8")
+    try:
+        prompts = parse_prompts(body)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not prompts:
+        raise HTTPException(status_code=400, detail="No prompts provided")
+
+    job_id = await request.app.state.jobs.submit(prompts)
+    return await request.app.state.jobs.store.status(job_id)
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str, request: Request):
+    """查询批量任务进度"""
+    status = await request.app.state.jobs.store.status(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return status
+
+
+@app.get("/api/jobs/{job_id}/results")
+async def stream_job_results(
+    job_id: str, request: Request, offset: int = 0, follow: bool = True
+):
+    """以 JSONL 流式返回任务结果；follow 为真时持续推送直到任务结束"""
+    jobs = request.app.state.jobs
+    if await jobs.store.status(job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return StreamingResponse(
+        jobs.stream_results(job_id, offset=max(offset, 0), follow=follow),
+        media_type="application/x-ndjson",
+    )
+
+
+@app.delete("/api/jobs/{job_id}")
+async def cancel_job(job_id: str, request: Request):
+    """取消任务中尚未开始的问题"""
+    jobs = request.app.state.jobs
+    if await jobs.store.status(job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    await jobs.store.cancel(job_id)
+    return await jobs.store.status(job_id)
+
+
 @app.get("/health")
-async def health_check():
-    return {"status": "healthy"}
+async def health_check(request: Request):
+    return {"status": "healthy", "sessions": request.app.state.admission.stats()}
 
 
 if __name__ == "__main__":
@@ -81,6 +81,42 @@ class TestAsyncDockerizedTerminal:
         assert "First" in cmd1
         assert "Second" in cmd2
 
+    @pytest.mark.asyncio
+    async def test_recovers_after_timeout(self, docker_container):
+        """Test that the session stays usable after a timed-out command."""
+        terminal = AsyncDockerizedTerminal(docker_container, default_timeout=1)
+        await terminal.init()
+        try:
+            with pytest.raises(TimeoutError):
+                await terminal.run_command("sleep 5")
+            assert await terminal.run_command("echo 'after'") == "after"
+        finally:
+            await terminal.close()
+
+    @pytest.mark.asyncio
+    async def test_stream_command(self, terminal):
+        """Test that output is streamed in chunks as it is produced."""
+        chunks = [
+            chunk
+            async for chunk in terminal.stream_command(
+                "for i in 1 2 3; do echo $i; sleep 0.2; done"
+            )
+        ]
+        assert len(chunks) > 1
+        assert "".join(chunks).split() == ["1", "2", "3"]
+
+    @pytest.mark.asyncio
+    async def test_exit_code(self, terminal):
+        """Test that the session reports the exit code of each command."""
+        assert await terminal.session.run("false") == (1, "")
+        assert await terminal.session.run("echo 'ok'") == (0, "ok")
+
+    @pytest.mark.asyncio
+    async def test_run_batch(self, terminal):
+        """Test that a batch reports output and exit code per command."""
+        results = await terminal.run_batch(["echo 'a'", "false", "echo $TEST_VAR"])
+        assert results == [(0, "a"), (1, ""), (0, "test_value")]
+
     @pytest.mark.asyncio
     async def test_session_cleanup(self, docker_container):
         """Test proper cleanup of resources."""
@@ -46,6 +46,21 @@ async def test_sandbox_file_operations(sandbox):
     assert content.strip() == test_content
 
 
+@pytest.mark.asyncio
+async def test_sandbox_large_file_operations(sandbox, tmp_path):
+    """Tests that files above the small-file threshold stream through tar."""
+    test_content = "x" * (DockerSandbox.SMALL_FILE_THRESHOLD * 4)
+    await sandbox.write_file("/workspace/nested/large.txt", test_content)
+    assert await sandbox.read_file("/workspace/nested/large.txt") == test_content
+
+    local_copy = tmp_path / "large.txt"
+    await sandbox.copy_from("/workspace/nested/large.txt", str(local_copy))
+    assert local_copy.read_text() == test_content
+
+    await sandbox.copy_to(str(local_copy), "/workspace/copied/large.txt")
+    assert await sandbox.read_file("/workspace/copied/large.txt") == test_content
+
+
 @pytest.mark.asyncio
 async def test_sandbox_python_execution(sandbox):
     """Tests Python code execution in sandbox."""
@@ -137,6 +152,25 @@ async def test_sandbox_cleanup(sandbox_config):
     assert not any(c.id == container_id for c in containers)
 
 
+@pytest.mark.asyncio
+async def test_sandbox_reset(sandbox_config):
+    """Tests that reset wipes the work dir and keeps the container."""
+    sandbox = DockerSandbox(sandbox_config)
+    await sandbox.create()
+    try:
+        await sandbox.write_file("/workspace/test.txt", "test")
+        await sandbox.run_command("cd /tmp")
+        container_id = sandbox.container.id
+
+        await sandbox.reset()
+
+        assert sandbox.container.id == container_id
+        assert (await sandbox.run_command("pwd")).strip() == "/workspace"
+        assert (await sandbox.run_command("ls -A")).strip() == ""
+    finally:
+        await sandbox.cleanup()
+
+
 @pytest.mark.asyncio
 async def test_sandbox_error_handling():
     """Tests error handling with invalid configuration."""
@@ -134,5 +134,37 @@ async def test_manager_cleanup(manager):
     assert not manager._last_used
 
 
+@pytest.mark.asyncio
+async def test_sandbox_pool():
+    """Tests leasing sandboxes from a pre-warmed pool."""
+    manager = SandboxManager(max_sandboxes=2, pool_size=1)
+    try:
+        await manager.pool.warm_up()
+        assert manager.get_stats()["pool"]["ready"] == 1
+
+        sandbox_id = await manager.create_sandbox()
+        stats = manager.get_stats()["pool"]
+        assert stats["hits"] == 1
+        assert stats["misses"] == 0
+
+        # The leased sandbox counts against the pool size
+        await manager.pool.warm_up()
+        assert manager.get_stats()["pool"]["ready"] == 0
+
+        sandbox = await manager.get_sandbox(sandbox_id)
+        result = await sandbox.run_command("echo 'test'")
+        assert result.strip() == "test"
+
+        # Released sandboxes are reset and reused, not destroyed
+        await manager.delete_sandbox(sandbox_id)
+        stats = manager.get_stats()["pool"]
+        assert stats["ready"] == 1
+        assert stats["resets"] == 1
+        assert stats["destroyed"] == 0
+    finally:
+        await manager.cleanup()
+
+    assert manager.get_stats()["pool"]["ready"] == 0
+
 if __name__ == "__main__":
     pytest.main(["-v", __file__])
@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+from app.admission import AdmissionController, ConcurrencyLimit, QueueFull
+
+
+@pytest.mark.asyncio
+async def test_sessions_queue_in_order_and_report_positions():
+    controller = AdmissionController(max_sessions=1, max_queue=2)
+    first = controller.enqueue()
+    second, third = controller.enqueue(), controller.enqueue()
+    assert first.admitted and (second.position, third.position) == (1, 2)
+
+    positions = []
+
+    async def watch():
+        async for position in third.wait():
+            positions.append(position)
+
+    watcher = asyncio.create_task(watch())
+    await asyncio.sleep(0)
+    first.release()
+    await asyncio.sleep(0)
+    assert second.admitted and third.position == 1
+    second.release()
+    await watcher
+    assert positions == [2, 1]
+    assert third.admitted and controller.stats()["active"] == 1
+
+
+@pytest.mark.asyncio
+async def test_full_queue_is_rejected_with_retry_after():
+    controller = AdmissionController(max_sessions=2, max_queue=1, retry_after=20)
+    tickets = [controller.enqueue() for _ in range(3)]
+    with pytest.raises(QueueFull) as error:
+        controller.enqueue()
+    # The queued session and this one need one more round of both slots
+    assert error.value.retry_after == 20
+
+    # Leaving the queue frees the place without taking a slot
+    tickets[2].release()
+    assert controller.stats() == {"active": 2, "queued": 0, "max_sessions": 2, "max_queue": 1}
+    assert not controller.enqueue().admitted
+
+
+@pytest.mark.asyncio
+async def test_cancelled_wait_leaves_the_queue():
+    controller = AdmissionController(max_sessions=1, max_queue=1)
+    running = controller.enqueue()
+
+    async def session():
+        async with controller.enqueue():
+            pass
+
+    task = asyncio.create_task(session())
+    await asyncio.sleep(0)
+    assert controller.queued == 1
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert controller.queued == 0
+    running.release()
+    assert controller.active == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit_caps_calls_in_flight():
+    limit = ConcurrencyLimit(2)
+    in_flight = peak = 0
+
+    async def call():
+        nonlocal in_flight, peak
+        async with limit:
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+    await asyncio.gather(*(call() for _ in range(6)))
+    assert peak == 2
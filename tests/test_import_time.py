@@ -0,0 +1,24 @@
+import os
+
+import pytest
+
+from examples.benchmarks.import_time import BUDGETS, LAZY_DEPENDENCIES, import_profile
+
+
+@pytest.mark.parametrize("module", ["app.agent.manus", "app.tool", "app.mcp.server"])
+def test_heavy_dependencies_are_lazy(module):
+    profile = import_profile(module)
+    assert [name for name in LAZY_DEPENDENCIES if name in profile] == []
+
+
+# Wall-clock budgets depend on the machine and its disk cache, so they are
+# only checked on request
+@pytest.mark.skipif(
+    not os.environ.get("IMPORT_TIME_BUDGET"),
+    reason="set IMPORT_TIME_BUDGET=1 to check import-time budgets",
+)
+@pytest.mark.parametrize("module,budget", BUDGETS.items())
+def test_import_time_budget(module, budget):
+    # Best of three runs, so a busy machine does not fail the budget
+    best = min(import_profile(module)[module][1] for _ in range(3)) / 1e6
+    assert best <= budget, f"importing {module} took {best:.2f}s (budget {budget}s)"
@@ -0,0 +1,183 @@
+import json
+import random
+import re
+from pathlib import Path
+
+import pytest
+
+from app import tool_call_parser
+from app.tool_call_parser import ToolCallParser, parse_tool_calls
+
+
+TRAJECTORY = Path(__file__).resolve().parent.parent / "train_data.json"
+
+
+def _recorded_steps():
+    """(content, [(name, arguments dict)]) for each assistant step of the trajectory."""
+    messages = json.loads(TRAJECTORY.read_text(encoding="utf-8"))
+    steps = []
+    for message in messages:
+        if message["role"] != "assistant":
+            continue
+        calls = [
+            (call["function"]["name"], json.loads(call["function"]["arguments"]))
+            for call in message.get("tool_calls") or []
+        ]
+        steps.append((message.get("content") or "", calls))
+    return steps
+
+
+STEPS = _recorded_steps()
+
+
+def _fenced(content, calls):
+    items = [{"function": name, "parameters": args} for name, args in calls]
+    return f"{content}\n```json\n{json.dumps(items, ensure_ascii=False, indent=2)}\n```\n"
+
+
+def _fenced_each(content, calls):
+    blocks = "".join(
+        f"\n```json {json.dumps({'function': name, 'parameters': args}, ensure_ascii=False)}```\n"
+        for name, args in calls
+    )
+    return content + blocks
+
+
+def _bare(content, calls):
+    items = [{"parameters": args, "function": name} for name, args in calls]
+    return f"{content}\n{json.dumps(items, ensure_ascii=False)}"
+
+
+def _tagged(content, calls):
+    tags = "".join(
+        f"\n<tool_call>\n{json.dumps({'name': name, 'arguments': args}, ensure_ascii=False)}\n</tool_call>"
+        for name, args in calls
+    )
+    return content + tags
+
+
+FORMATS = [_fenced, _fenced_each, _bare, _tagged]
+
+RECORDED = [
+    (fmt(content, calls), content.strip(), calls)
+    for content, calls in STEPS
+    if calls
+    for fmt in FORMATS
+]
+
+
+def _decoded(calls):
+    return [(call.name, json.loads(call.arguments)) for call in calls]
+
+
+def _legacy_fallback(text):
+    """The regex extraction ask_tool used before the parser."""
+    calls = []
+    for block in re.findall(r"```json\s*([\s\S]*?)\s*```", text):
+        data = json.loads(block.strip())
+        for item in [data] if isinstance(data, dict) else data:
+            calls.append((item["function"], item["parameters"]))
+    return calls
+
+
+def test_plain_content_has_no_calls():
+    for content, _ in STEPS:
+        result = parse_tool_calls(content)
+        assert result.calls == []
+        assert result.content == content.strip()
+
+
+@pytest.mark.parametrize("text,content,calls", RECORDED)
+def test_recorded_outputs(text, content, calls):
+    result = parse_tool_calls(text)
+    assert _decoded(result.calls) == calls
+    assert result.content == content
+
+
+@pytest.mark.parametrize("fmt", [_fenced, _fenced_each])
+def test_matches_legacy_fallback(fmt):
+    for content, calls in STEPS:
+        text = fmt(content, calls)
+        assert _decoded(parse_tool_calls(text).calls) == _legacy_fallback(text)
+
+
+def test_non_call_json_is_kept():
+    text = 'Result:\n```json\n{"name": "广州塔"}\n```\n```python\n{"function": "x", "parameters": {}}\n```'
+    result = parse_tool_calls(text)
+    assert result.calls == []
+    assert result.content == text
+
+
+def test_fuzz_streaming_matches_one_shot():
+    rng = random.Random(0)
+    for text, _, _ in RECORDED:
+        expected = parse_tool_calls(text)
+        for _ in range(5):
+            parser = ToolCallParser()
+            streamed = []
+            position = 0
+            while position < len(text):
+                size = rng.choice([1, 2, 3, 7, 16, 64, 512])
+                streamed += parser.feed(text[position:position + size])
+                position += size
+            streamed += parser.close()
+            assert streamed == expected.calls
+            assert parser.result() == expected
+
+
+def test_fuzz_mutated_outputs_never_raise():
+    rng = random.Random(1)
+    alphabet = ['{', '}', '[', ']', '"', ':', ',', '`', '```', '<tool_call>', '</tool_call>', '\n', 'x']
+    for text, _, _ in RECORDED:
+        for _ in range(20):
+            chars = list(text)
+            for _ in range(rng.randint(1, 8)):
+                index = rng.randrange(len(chars))
+                if rng.random() < 0.5:
+                    chars[index] = rng.choice(alphabet)
+                else:
+                    del chars[index]
+            mutated = "".join(chars)
+            if rng.random() < 0.3:
+                mutated = mutated[: rng.randrange(len(mutated))]
+            result = parse_tool_calls(mutated)
+            for call in result.calls:
+                json.loads(call.arguments)
+            assert len(result.content) <= len(mutated)
+
+
+class _CountingDecoder(json.JSONDecoder):
+    """Decoder recording the text each raw_decode call could examine."""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+        self.scanned = 0
+
+    def raw_decode(self, s, idx=0):
+        self.calls += 1
+        self.scanned += len(s) - idx
+        return super().raw_decode(s, idx)
+
+
+def test_streaming_decode_work_is_linear(monkeypatch):
+    text = "".join(text for text, _, _ in RECORDED)
+
+    def stream(copies):
+        decoder = _CountingDecoder()
+        monkeypatch.setattr(tool_call_parser, "_decoder", decoder)
+        document = text * copies
+        parser = ToolCallParser()
+        for position in range(0, len(document), 8):
+            parser.feed(document[position:position + 8])
+        parser.close()
+        return decoder, len(parser.calls)
+
+    small, small_calls = stream(1)
+    large, large_calls = stream(8)
+    assert large_calls == 8 * small_calls
+    # Re-decoding the buffer on every chunk would grow these quadratically,
+    # about 64 times for 8 times the input; chunk boundaries falling
+    # differently account for a little more than 8 times
+    assert large.calls < 2 * 8 * small.calls
+    assert large.scanned < 2 * 8 * small.scanned
@@ -0,0 +1,40 @@
+import pytest
+
+from app.tool.travel_render import HOTEL_SPEC, RESULT_STORE
+from app.tool.travel_results import TravelResults
+from app.tool.travel_table import TravelTable
+
+
+def _hotels(distances):
+    columns = ("酒店名称", "平均价格", "距离")
+    rows = [(f"酒店{i}", 300 + i, distance) for i, distance in enumerate(distances)]
+    return RESULT_STORE.put(HOTEL_SPEC, TravelTable(columns, rows))
+
+
+@pytest.mark.asyncio
+async def test_distance_filter_compares_mixed_units_in_kilometres():
+    result_id = _hotels(["800米", "1.9公里", "2.5公里", "距您直线3000米"])
+    text = await TravelResults().execute(
+        result_id, filter_column="距离", max_value=2, columns=["酒店名称", "距离"]
+    )
+    assert "800米" in text and "1.9公里" in text
+    assert "2.5公里" not in text and "3000米" not in text
+
+
+@pytest.mark.asyncio
+async def test_distance_filter_min_value_uses_the_same_unit():
+    result_id = _hotels(["800米", "1.9公里", "2.5公里"])
+    text = await TravelResults().execute(
+        result_id, filter_column="距离", min_value=1, columns=["酒店名称", "距离"]
+    )
+    assert "800米" not in text
+    assert "1.9公里" in text and "2.5公里" in text
+
+
+@pytest.mark.asyncio
+async def test_plain_numeric_filter_is_unscaled():
+    result_id = _hotels(["800米", "1.9公里", "2.5公里"])
+    text = await TravelResults().execute(
+        result_id, filter_column="平均价格", max_value=301, columns=["酒店名称"]
+    )
+    assert "酒店0" in text and "酒店1" in text and "酒店2" not in text
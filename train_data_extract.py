@@ -1,15 +1,190 @@
+import os
 import re
-from pathlib import Path
-from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 
-def extract_raw_logs(log_file_path, query_file_path, output_file="raw_logs.txt"):
+try:
+    # 可选的 C 实现，未安装时使用下面的纯 Python 自动机
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# 编译正则表达式匹配train_data部分
+TRAIN_DATA_PATTERN = re.compile(r'train_data:(\[{.*?}\])', re.DOTALL)
+
+# 每个并行任务处理的字节数上下限
+CHUNK_SIZE = 256 * 1024 * 1024
+MIN_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+class QueryMatcher:
+    """
+    Aho-Corasick 多模式匹配：一次扫描文本，返回其中出现的、在查询列表中
+    排在最前面的查询序号（与逐条 `query in text` 后 break 的结果一致）
+    """
+
+    def __init__(self, queries):
+        self.queries = queries
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for index, query in enumerate(queries):
+                # 重复的查询保留最靠前的序号
+                if query not in self._automaton:
+                    self._automaton.add_word(query, index)
+            self._automaton.make_automaton()
+            return
+
+        self._automaton = None
+        # goto[state] 为字符到下一状态的映射，best[state] 为该状态（含失配链）
+        # 能匹配到的最小查询序号，无匹配时为 len(queries)
+        none = len(queries)
+        self._goto = [{}]
+        self._best = [none]
+        for index, query in enumerate(queries):
+            state = 0
+            for ch in query:
+                next_state = self._goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][ch] = next_state
+                    self._goto.append({})
+                    self._best.append(none)
+                state = next_state
+            self._best[state] = min(self._best[state], index)
+
+        # 按层次遍历建立失配指针，并沿失配链合并 best
+        self._fail = [0] * len(self._goto)
+        frontier = list(self._goto[0].values())
+        while frontier:
+            next_frontier = []
+            for state in frontier:
+                for ch, child in self._goto[state].items():
+                    fail = self._fail[state]
+                    while fail and ch not in self._goto[fail]:
+                        fail = self._fail[fail]
+                    self._fail[child] = self._goto[fail].get(ch, 0)
+                    self._best[child] = min(self._best[child], self._best[self._fail[child]])
+                    next_frontier.append(child)
+            frontier = next_frontier
+
+    def first_match(self, text):
+        """返回 text 中出现的排序最靠前的查询序号，没有匹配时返回 None"""
+        if self._automaton is not None:
+            best = min((index for _, index in self._automaton.iter(text)), default=None)
+            return best
+
+        goto, fail, best_of = self._goto, self._fail, self._best
+        root = goto[0]
+        none = len(self.queries)
+        best = none
+        state = 0
+        for ch in text:
+            # 大部分字符不属于任何查询，在根节点直接跳过
+            if not state:
+                state = root.get(ch, 0)
+                if not state:
+                    continue
+            else:
+                next_state = goto[state].get(ch)
+                while next_state is None and state:
+                    state = fail[state]
+                    next_state = goto[state].get(ch)
+                state = next_state or 0
+            if best_of[state] < best:
+                best = best_of[state]
+                if best == 0:
+                    break
+        return None if best == none else best
+
+
+def split_ranges(log_file_paths, chunk_size=CHUNK_SIZE):
+    """把日志文件切分为 (文件序号, 路径, 起始字节, 结束字节) 的任务列表"""
+    ranges = []
+    for file_index, path in enumerate(log_file_paths):
+        size = os.path.getsize(path)
+        for start in range(0, max(size, 1), chunk_size):
+            ranges.append((file_index, path, start, min(start + chunk_size, size)))
+    return ranges
+
+
+_matcher = None
+
+
+def _init_worker(queries):
+    # 每个进程只构建一次自动机
+    global _matcher
+    _matcher = QueryMatcher(queries)
+
+
+def scan_range(task, marker):
+    """
+    扫描一个字节范围内起始的所有日志行
+
+    返回 {查询序号: [匹配条数, 首次匹配位置, 最长行长度, 最长行位置, 最长行]}，
+    每个查询只保留当前最长的一行
+    """
+    file_index, path, start, end = task
+    results = {}
+    with open(path, 'rb') as log_file:
+        if start:
+            # 从上一个换行之后开始，跨越边界的行归前一个范围
+            log_file.seek(start - 1)
+            log_file.readline()
+        position = log_file.tell()
+        while position < end:
+            raw = log_file.readline()
+            if not raw:
+                break
+            line_position = (file_index, position)
+            position += len(raw)
+            # 检查是否包含train_data
+            if b'train_data' not in raw:
+                continue
+            line = raw.decode('utf-8', errors='replace')
+            match = TRAIN_DATA_PATTERN.search(line)
+            if not match:
+                continue
+            train_data_str = match.group(1)
+            if marker not in train_data_str:
+                continue
+            index = _matcher.first_match(train_data_str)
+            if index is None:
+                continue
+
+            entry = results.get(index)
+            if entry is None:
+                results[index] = [1, line_position, len(line), line_position, line]
+                continue
+            entry[0] += 1
+            # 长度相同时保留最早出现的一行
+            if len(line) > entry[2]:
+                entry[2:] = [len(line), line_position, line]
+    return results
+
+
+def merge_results(total, partial):
+    for index, entry in partial.items():
+        current = total.get(index)
+        if current is None:
+            total[index] = entry
+            continue
+        current[0] += entry[0]
+        current[1] = min(current[1], entry[1])
+        if (-entry[2], entry[3]) < (-current[2], current[3]):
+            current[2:] = entry[2:]
+
+
+def extract_raw_logs(log_file_path, query_file_path, output_file="raw_logs.txt",
+                     marker="你是OpenManus", workers=None, chunk_size=None):
     """
     从日志文件中提取包含特定查询的原始日志行
 
     参数:
-        log_file_path: 日志文件路径
+        log_file_path: 日志文件路径，或多个日志分片的路径列表
         query_file_path: 查询文本文件路径(每行一个查询)
         output_file: 输出文件路径
+        marker: train_data 中必须包含的系统提示片段
+        workers: 并行进程数，默认使用全部 CPU，1 表示在当前进程中处理
+        chunk_size: 每个并行任务处理的字节数，默认按文件总大小和进程数计算
     """
     # 加载查询列表
     with open(query_file_path, 'r', encoding='utf-8') as f:
@@ -17,37 +192,38 @@ def extract_raw_logs(log_file_path, query_file_path, output_file="raw_logs.txt")
 
     print(f"已加载 {len(queries)} 条查询条件")
 
-    # 存储结果 {query: [log_lines]}
-    query_results = defaultdict(list)
+    paths = [log_file_path] if isinstance(log_file_path, (str, os.PathLike)) else list(log_file_path)
+    workers = workers or os.cpu_count() or 1
+    if chunk_size is None:
+        # 每个进程约分到 4 个任务，兼顾负载均衡和调度开销
+        total_size = sum(os.path.getsize(path) for path in paths)
+        chunk_size = min(CHUNK_SIZE, max(MIN_CHUNK_SIZE, total_size // (workers * 4) + 1))
+    tasks = split_ranges(paths, chunk_size)
 
-    # 编译正则表达式匹配train_data部分
-    pattern = re.compile(r'train_data:(\[{.*?}\])', re.DOTALL)
+    # 存储结果 {查询序号: [匹配条数, 首次匹配位置, 最长行长度, 最长行位置, 最长行]}
+    query_results = {}
+    if workers == 1 or len(tasks) == 1:
+        _init_worker(queries)
+        for task in tasks:
+            merge_results(query_results, scan_range(task, marker))
+    else:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(tasks)),
+            initializer=_init_worker,
+            initargs=(queries,),
+        ) as executor:
+            for partial in executor.map(scan_range, tasks, [marker] * len(tasks)):
+                merge_results(query_results, partial)
 
-    with open(log_file_path, 'r', encoding='utf-8') as log_file:
-        for line in log_file:
-            # 检查是否包含train_data
-            if 'train_data' in line:
-                # 提取train_data内容
-                match = pattern.search(line)
-                if match:
-                    train_data_str = match.group(1)
-                    # 检查每个查询是否在train_data中
-                    if "你是OpenManus" in train_data_str:
-                        for query in queries:
-                            if query in train_data_str:
-                                query_results[query].append(line)
-                                break
-
-    print(f"匹配到 {sum(len(v) for v in query_results.values())} 条日志记录")
-
-    # 写入输出文件
+    print(f"匹配到 {sum(entry[0] for entry in query_results.values())} 条日志记录")
+
+    # 写入输出文件，按每个查询首次出现的位置排序
     with open(output_file, 'w', encoding='utf-8') as out_file:
-        for query, log_lines in query_results.items():
-            out_file.write(f"=== 查询: {query} ===\n")
-            out_file.write(f"=== 匹配到 {len(log_lines)} 条记录 ===\n\n")
+        for index, entry in sorted(query_results.items(), key=lambda item: item[1][1]):
+            out_file.write(f"=== 查询: {queries[index]} ===\n")
+            out_file.write(f"=== 匹配到 {entry[0]} 条记录 ===\n\n")
             # 只保留最长的记录
-            longest_line = max(log_lines, key=len)
-            out_file.write(longest_line)
+            out_file.write(entry[4])
             out_file.write("\n" + "="*80 + "\n\n")
 
     print(f"原始日志已保存到: {output_file}")
@@ -56,10 +232,11 @@ if __name__ == "__main__":
     import argparse
 
     parser = argparse.ArgumentParser(description='提取包含特定查询的原始日志行')
-    parser.add_argument('log_file', help='日志文件路径')
+    parser.add_argument('log_file', nargs='+', help='日志文件路径，可传入多个日志分片')
     parser.add_argument('query_file', help='查询文本文件路径')
     parser.add_argument('-o', '--output', default="raw_logs_0707_gaode.txt", help='输出文件路径')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='并行进程数，默认使用全部 CPU')
 
     args = parser.parse_args()
 
-    extract_raw_logs(args.log_file, args.query_file, args.output)
+    extract_raw_logs(args.log_file, args.query_file, args.output, workers=args.workers)